@@ -1,21 +1,120 @@
-from flask import Flask, request, jsonify, Blueprint
+from flask import Flask, request, jsonify, Blueprint, Response, current_app
 from flask_cors import CORS
+import atexit
+import functools
 import sys
+from collections import OrderedDict
 import os
+import threading
+import time
 
 # Adicionar o diretório pai ao path para importar services
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from services.leaderboard_service import LeaderboardService
+from services.columnar_store import ColumnarStorage
+from services.leaderboard_service import DEFAULT_HISTORY_LIMIT, LeaderboardService
+from services.notifier import Notifier
+from services.platform_aggregates import BUCKET_SECONDS
+from services.progress_store import ProgressStore
+from services.rank_stream import RankStream
+from services.response_cache import ResponseCache
+from services.session_store import DEFAULT_COMPLETED_TTL, DEFAULT_IDLE_TTL, DEFAULT_MAX_SESSIONS, SessionStore
+from services.shared_memory_storage import DEFAULT_CAPACITY, SharedMemoryStorage
+from services.sqlite_storage import SQLiteStorage
+from services.user_store import HashPoolFull, UserStore
 
 app = Blueprint('api', __name__)
 CORS(app)  # Habilitar CORS
 
 # Inicializar serviços
-leaderboard_service = LeaderboardService()
-
-# Simulação de banco de dados de usuários
-users = []
+# LEADERBOARD_STORAGE=sqlite usa o backend SQLite em LEADERBOARD_SQLITE_PATH;
+# LEADERBOARD_STORAGE=columnar guarda os jogadores em colunas compactas (menos memória por jogador).
+# LEADERBOARD_STORAGE=shm guarda o leaderboard no segmento de memória compartilhada LEADERBOARD_SHM_NAME
+# (criado com LEADERBOARD_SHM_CAPACITY jogadores): todos os workers do servidor veem o mesmo leaderboard
+# (jogadores, estatísticas, rankings, conquistas e agregados). Usuários, progresso, sessões de jogo,
+# matchmaking, torneios, temporadas, usuários ativos e jobs de backfill continuam por processo: com
+# mais de um processo servindo o segmento, as rotas deles (@process_local) respondem 503 em vez de
+# respostas diferentes conforme o worker. Para elas, sirva com um único processo (ex.: gunicorn -w 1
+# com threads, ou python asgi.py).
+# Nos armazenamentos em memória, LEADERBOARD_DATA_DIR ativa o log de eventos com snapshots.
+# LEADERBOARD_GLICKO2=1 mantém também ratings Glicko-2 (períodos diários em lote)
+# LEADERBOARD_WRITE_SHARDS: filas/threads escritoras dos resultados de partidas (padrão: núcleos)
+glicko2_enabled = os.environ.get('LEADERBOARD_GLICKO2') == '1'
+write_shards = int(os.environ.get('LEADERBOARD_WRITE_SHARDS', os.cpu_count() or 1))
+if os.environ.get('LEADERBOARD_STORAGE') == 'sqlite':
+    leaderboard_service = LeaderboardService(
+        storage=SQLiteStorage(os.environ.get('LEADERBOARD_SQLITE_PATH', 'leaderboard.db')),
+        glicko2=glicko2_enabled,
+        write_shards=write_shards,
+    )
+elif os.environ.get('LEADERBOARD_STORAGE') == 'shm':
+    leaderboard_service = LeaderboardService(
+        storage=SharedMemoryStorage(
+            os.environ.get('LEADERBOARD_SHM_NAME', 'odyssey-leaderboard'),
+            capacity=int(os.environ.get('LEADERBOARD_SHM_CAPACITY', DEFAULT_CAPACITY)),
+        ),
+        glicko2=glicko2_enabled,
+        write_shards=write_shards,
+    )
+else:
+    leaderboard_service = LeaderboardService(
+        data_dir=os.environ.get('LEADERBOARD_DATA_DIR'),
+        fsync_mode=os.environ.get('LEADERBOARD_FSYNC', 'batch'),
+        snapshot_every=int(os.environ.get('LEADERBOARD_SNAPSHOT_EVERY', 100000)),
+        storage=ColumnarStorage() if os.environ.get('LEADERBOARD_STORAGE') == 'columnar' else None,
+        glicko2=glicko2_enabled,
+        write_shards=write_shards,
+        history_limit=int(os.environ.get('LEADERBOARD_HISTORY_LIMIT', DEFAULT_HISTORY_LIMIT)),
+    )
+atexit.register(leaderboard_service.close)
+
+# Processos que servem o segmento compartilhado (LEADERBOARD_STORAGE=shm); cada worker se
+# registra na primeira requisição, então o processo mestre de um servidor com --preload não conta
+shared_storage = leaderboard_service.storage if leaderboard_service.storage.shared else None
+
+@app.before_request
+def register_worker():
+    if shared_storage is not None:
+        shared_storage.attach_process()
+
+def process_local(route):
+    # Rotas com estado só deste processo: recusadas quando outro processo serve o mesmo leaderboard
+    @functools.wraps(route)
+    def checked(*args, **kwargs):
+        if shared_storage is not None and shared_storage.shared_with_other_processes():
+            return jsonify({
+                "message": "Rota indisponível com vários processos em LEADERBOARD_STORAGE=shm: "
+                           "este estado não é compartilhado entre os workers",
+            }), 503
+        return route(*args, **kwargs)
+    return checked
+
+# Respostas serializadas dos rankings, por versão (ETag / 304 Not Modified)
+response_cache = ResponseCache(int(os.environ.get('LEADERBOARD_CACHE_ENTRIES', 1024)))
+
+# Diferenças de ranking por Server-Sent Events, coalescidas a cada LEADERBOARD_STREAM_INTERVAL segundos
+rank_stream = RankStream(leaderboard_service, float(os.environ.get('LEADERBOARD_STREAM_INTERVAL', 0.25)))
+atexit.register(rank_stream.close)
+
+# Usuários indexados por nome, com senhas em hash scrypt calculado num pool limitado:
+# USER_HASH_WORKERS threads (padrão: núcleos) e até USER_HASH_QUEUE hashes na fila
+# (padrão: 4 por thread); com a fila cheia, /register e /login respondem 503
+user_store = UserStore(
+    hash_workers=int(os.environ.get('USER_HASH_WORKERS', 0)) or None,
+    max_pending=int(os.environ['USER_HASH_QUEUE']) if 'USER_HASH_QUEUE' in os.environ else None,
+)
+atexit.register(user_store.close)
+
+# Sessões de jogo por ID e por usuário, com expiração: ativas sem atividade por
+# SESSION_IDLE_TTL segundos viram "abandoned", finalizadas saem após SESSION_COMPLETED_TTL
+# e no máximo SESSION_MAX ficam em memória. SESSION_ARCHIVE_DIR grava as que saem num log
+game_sessions = SessionStore(
+    idle_ttl=float(os.environ.get('SESSION_IDLE_TTL', DEFAULT_IDLE_TTL)),
+    completed_ttl=float(os.environ.get('SESSION_COMPLETED_TTL', DEFAULT_COMPLETED_TTL)),
+    max_sessions=int(os.environ.get('SESSION_MAX', DEFAULT_MAX_SESSIONS)),
+    archive_dir=os.environ.get('SESSION_ARCHIVE_DIR'),
+)
+atexit.register(game_sessions.close)
 
 # Simulação de dados de jogos e progresso
 games = [
@@ -31,8 +130,19 @@ games = [
     {"id": 10, "name": "Royal Game of Ur", "description": "Corrida real da Mesopotâmia.", "category": "board_game"},
 ]
 
-progress = []  # Simulação de progresso do usuário em jogos
-game_sessions = []  # Simulação de sessões de jogo ativas
+# Limite de resultados aceitos por requisição de lote
+MAX_BATCH_RESULTS = 10000
+# Tamanho máximo de uma página de ranking (?limit) e da janela ao redor de um jogador (?radius)
+MAX_LEADERBOARD_LIMIT = 500
+MAX_LEADERBOARD_RADIUS = 100
+
+progress = ProgressStore()  # progresso do usuário em jogos, por (userId, gameId)
+# Usuário -> (instante, ID da sessão criada pelo matchmaking), até ser consultada, em
+# ordem de pareamento; com match_notifier.condition. Pareamentos não consultados saem
+# depois de SESSION_IDLE_TTL, quando a própria sessão já teria expirado
+matched_sessions = OrderedDict()
+match_notifier = Notifier()  # acorda quem espera o pareamento (GET /matchmaking/<userId>?wait=s)
+MAX_MATCHMAKING_WAIT = 30
 
 @app.route('/')
 def home():
@@ -40,6 +150,7 @@ def home():
 
 # Rota de registro de usuário
 @app.route('/register', methods=['POST'])
+@process_local
 def register():
     data = request.get_json()
     username = data.get('username')
@@ -48,11 +159,13 @@ def register():
     if not username or not password:
         return jsonify({"message": "Nome de usuário e senha são obrigatórios."}), 400
 
-    if any(user['username'] == username for user in users):
+    try:
+        new_user = user_store.register(username, password)
+    except ValueError:
         return jsonify({"message": "Nome de usuário já existe."}), 409
+    except HashPoolFull as e:
+        return jsonify({"message": "Servidor ocupado", "error": str(e)}), 503, {"Retry-After": "1"}
 
-    new_user = {"id": len(users) + 1, "username": username, "password": password}
-    users.append(new_user)
     return jsonify({
         "message": "Usuário registrado com sucesso!",
         "user": {"id": new_user["id"], "username": new_user["username"]}
@@ -60,6 +173,7 @@ def register():
 
 # Rota de login de usuário
 @app.route('/login', methods=['POST'])
+@process_local
 def login():
     data = request.get_json()
     username = data.get('username')
@@ -68,7 +182,10 @@ def login():
     if not username or not password:
         return jsonify({"message": "Nome de usuário e senha são obrigatórios."}), 400
 
-    user = next((u for u in users if u['username'] == username and u['password'] == password), None)
+    try:
+        user = user_store.authenticate(username, password)
+    except HashPoolFull as e:
+        return jsonify({"message": "Servidor ocupado", "error": str(e)}), 503, {"Retry-After": "1"}
 
     if not user:
         return jsonify({"message": "Credenciais inválidas."}), 401
@@ -80,8 +197,9 @@ def login():
 
 # Rota de perfil de usuário
 @app.route('/profile/<username>')
+@process_local
 def get_profile(username):
-    user = next((u for u in users if u['username'] == username), None)
+    user = user_store.get(username)
 
     if not user:
         return jsonify({"message": "Usuário não encontrado."}), 404
@@ -111,52 +229,127 @@ def get_game(game_id):
 
 # Rota para obter o progresso de um usuário em um jogo específico
 @app.route('/progress/<int:user_id>/<int:game_id>')
+@process_local
 def get_progress(user_id, game_id):
-    user_progress = next((p for p in progress if p['userId'] == user_id and p['gameId'] == game_id), None)
+    user_progress = progress.get(user_id, game_id)
 
     if not user_progress:
         return jsonify({"message": "Progresso não encontrado para este usuário e jogo."}), 404
 
     return jsonify(user_progress), 200
 
+# Progresso de um usuário em todos os jogos (sincronização do app numa só requisição)
+@app.route('/progress/<int:user_id>')
+@process_local
+def get_user_progress(user_id):
+    return jsonify({"userId": user_id, "progress": progress.for_user(user_id)}), 200
+
 # Rota para atualizar o progresso de um usuário em um jogo
+# Com "version", só se aplica se for maior que a versão gravada (last-writer-wins)
 @app.route('/progress', methods=['POST'])
+@process_local
 def update_progress():
     data = request.get_json()
-    user_id = data.get('userId')
-    game_id = data.get('gameId')
-    score = data.get('score')
-    level = data.get('level')
-    status = data.get('status')
-
-    if not user_id or not game_id:
-        return jsonify({"message": "ID do usuário e ID do jogo são obrigatórios."}), 400
-
-    user_progress = next((p for p in progress if p['userId'] == user_id and p['gameId'] == game_id), None)
-
-    if user_progress:
-        # Atualiza o progresso existente
-        if score is not None:
-            user_progress['score'] = score
-        if level is not None:
-            user_progress['level'] = level
-        if status is not None:
-            user_progress['status'] = status
-        return jsonify({"message": "Progresso atualizado com sucesso!", "progress": user_progress}), 200
-    else:
-        # Cria um novo progresso
-        new_progress = {
-            "userId": user_id,
-            "gameId": game_id,
-            "score": score or 0,
-            "level": level or 1,
-            "status": status or "started"
-        }
-        progress.append(new_progress)
-        return jsonify({"message": "Progresso criado com sucesso!", "progress": new_progress}), 201
+    result = progress.upsert(data)
+
+    if "error" in result:
+        return jsonify({"message": f"{result['error']}."}), 400
+    if result["status"] == "stale":
+        return jsonify({"message": "Já existe progresso mais recente.", "progress": result["progress"]}), 409
+    if result["status"] == "updated":
+        return jsonify({"message": "Progresso atualizado com sucesso!", "progress": result["progress"]}), 200
+    return jsonify({"message": "Progresso criado com sucesso!", "progress": result["progress"]}), 201
+
+# Várias atualizações de progresso numa requisição: {"updates": [{userId, gameId, score,
+# level, status, version?}, ...]}, aplicadas na ordem, cada uma com o seu resultado
+# (created, updated, stale ou error)
+@app.route('/progress/bulk', methods=['POST'])
+@process_local
+def bulk_update_progress():
+    data = request.get_json(silent=True)
+    updates = data.get('updates') if isinstance(data, dict) else None
+
+    if not isinstance(updates, list):
+        return jsonify({"message": "Dados obrigatórios: updates (lista de atualizações)"}), 400
+    if len(updates) > MAX_BATCH_RESULTS:
+        return jsonify({"message": f"Máximo de {MAX_BATCH_RESULTS} atualizações por lote"}), 400
+
+    results = progress.bulk_upsert(updates)
+    return jsonify({
+        "message": "Progresso sincronizado",
+        "applied": sum(1 for r in results if r.get("status") in ("created", "updated")),
+        "stale": sum(1 for r in results if r.get("status") == "stale"),
+        "failed": sum(1 for r in results if "error" in r),
+        "results": results,
+    }), 200
+
+def create_game_session(user_id, game, mode, **extra):
+    new_session = game_sessions.create(user_id, game['id'], mode, **extra)
+    leaderboard_service.record_activity(new_session['userId'], game['name'])
+    return new_session
+
+def on_match(match):
+    # Cada par formado vira imediatamente uma sessão para cada jogador, com o adversário
+    game = next((g for g in games if g['name'] == match['game']), None)
+    first, second = match['players']
+    sessions = {
+        player['playerId']: create_game_session(
+            player['playerId'], game, match['mode'],
+            matchId=match['matchId'], opponentId=opponent['playerId'], opponentRating=opponent['rating'],
+            waitSeconds=player['waitSeconds'],
+        )
+        for player, opponent in ((first, second), (second, first))
+    }
+    with match_notifier.condition:
+        now = time.monotonic()
+        for user_id, session in sessions.items():
+            matched_sessions.pop(user_id, None)
+            matched_sessions[user_id] = (now, session['id'])
+        expire_matched_sessions(now)
+        match_notifier.notify_all()
+
+def expire_matched_sessions(now):
+    # Chamado com match_notifier.condition adquirido; os mais antigos ficam no início
+    while matched_sessions and next(iter(matched_sessions.values()))[0] <= now - game_sessions.idle_ttl:
+        matched_sessions.popitem(last=False)
+
+def take_matched_session(user_id):
+    # Chamado com match_notifier.condition adquirido; None se não há ou se a sessão já expirou
+    matched = matched_sessions.pop(user_id, None)
+    return game_sessions.get(matched[1]) if matched is not None else None
+
+def match_pending(user_id):
+    # Ainda na fila e sem sessão pareada (chamado com match_notifier.condition adquirido)
+    return user_id not in matched_sessions and leaderboard_service.matchmaker.status(user_id) is not None
+
+def matchmaking_wait_seconds():
+    return min(max(float(request.args.get('wait', 0)), 0), MAX_MATCHMAKING_WAIT)
+
+# Pareamento em passadas periódicas numa thread própria (MATCHMAKING_INTERVAL segundos)
+leaderboard_service.matchmaker.on_match = on_match
+matchmaking_stop = threading.Event()
+threading.Thread(
+    target=leaderboard_service.matchmaker.run,
+    args=(float(os.environ.get('MATCHMAKING_INTERVAL', 0.25)), matchmaking_stop),
+    name="matchmaking", daemon=True,
+).start()
+atexit.register(matchmaking_stop.set)
+
+# Prazos dos torneios (início no startDate, encerramento no endDate) aplicados numa
+# thread própria a cada TOURNAMENT_SCHEDULER_INTERVAL segundos, com o lock de escrita
+tournament_scheduler_stop = threading.Event()
+threading.Thread(
+    target=leaderboard_service.run_tournament_scheduler,
+    args=(float(os.environ.get('TOURNAMENT_SCHEDULER_INTERVAL', 1)), tournament_scheduler_stop),
+    name="tournament-scheduler", daemon=True,
+).start()
+atexit.register(tournament_scheduler_stop.set)
 
 # Rota para iniciar uma nova sessão de jogo
+# Com "matchmaking": true o jogador entra na fila do jogo/modo e a sessão é criada
+# quando o adversário for encontrado (consultar GET /matchmaking/<userId>)
 @app.route('/game/start', methods=['POST'])
+@process_local
 def start_game():
     data = request.get_json()
     user_id = data.get('userId')
@@ -170,21 +363,60 @@ def start_game():
     if not game:
         return jsonify({"message": "Jogo não encontrado."}), 404
 
-    new_session = {
-        "id": len(game_sessions) + 1,
-        "userId": user_id,
-        "gameId": game_id,
-        "mode": mode,
-        "startTime": "2025-01-01T00:00:00Z",  # Em produção seria datetime.now()
-        "status": "active"
-    }
-    game_sessions.append(new_session)
+    if data.get('matchmaking'):
+        try:
+            with match_notifier.condition:
+                matched_sessions.pop(str(user_id), None)
+            ticket = leaderboard_service.enqueue_for_match(str(user_id), game['name'], mode)
+        except ValueError as e:
+            return jsonify({"message": "Não foi possível entrar na fila", "error": str(e)}), 409
+        return jsonify({"message": "Procurando adversário...", "status": "waiting", "ticket": ticket}), 202
+
+    new_session = create_game_session(user_id, game, mode)
     return jsonify({"message": "Sessão de jogo iniciada!", "session": new_session}), 201
 
+# Estado do matchmaking de um usuário: aguardando (com a janela de rating atual) ou pareado.
+# ?wait=s (até MAX_MATCHMAKING_WAIT) segura a resposta até o pareamento em vez de re-consultar
+@app.route('/matchmaking/<user_id>')
+@process_local
+def get_matchmaking_status(user_id):
+    try:
+        wait = matchmaking_wait_seconds()
+    except ValueError as e:
+        return jsonify({"message": "Parâmetro wait inválido", "error": str(e)}), 400
+    deadline = time.monotonic() + wait
+    with match_notifier.condition:
+        while match_pending(user_id) and time.monotonic() < deadline:
+            match_notifier.wait(deadline - time.monotonic())
+        expire_matched_sessions(time.monotonic())
+        session = take_matched_session(user_id)
+    if session is not None:
+        return jsonify({"status": "matched", "session": session}), 200
+    ticket = leaderboard_service.matchmaker.status(user_id)
+    if ticket is None:
+        return jsonify({"message": "Usuário não está na fila"}), 404
+    return jsonify({"status": "waiting", "ticket": ticket}), 200
+
+# Sair da fila
+@app.route('/matchmaking/<user_id>', methods=['DELETE'])
+@process_local
+def cancel_matchmaking(user_id):
+    if not leaderboard_service.matchmaker.cancel(user_id):
+        return jsonify({"message": "Usuário não está na fila"}), 404
+    with match_notifier.condition:
+        match_notifier.notify_all()  # quem esperava com ?wait= responde 404 agora
+    return jsonify({"message": "Saiu da fila"}), 200
+
+@app.route('/matchmaking/stats')
+@process_local
+def get_matchmaking_stats():
+    return jsonify(leaderboard_service.matchmaker.stats()), 200
+
 # Rota para obter o estado de uma sessão de jogo
 @app.route('/game/session/<int:session_id>')
+@process_local
 def get_session(session_id):
-    session = next((s for s in game_sessions if s['id'] == session_id), None)
+    session = game_sessions.get(session_id)
 
     if not session:
         return jsonify({"message": "Sessão de jogo não encontrada."}), 404
@@ -197,37 +429,108 @@ def get_session(session_id):
 
 # Rota para finalizar uma sessão de jogo
 @app.route('/game/end/<int:session_id>', methods=['POST'])
+@process_local
 def end_game(session_id):
-    session = next((s for s in game_sessions if s['id'] == session_id), None)
+    session = game_sessions.end(session_id)
 
     if not session:
         return jsonify({"message": "Sessão de jogo não encontrada."}), 404
 
-    session['status'] = "completed"
-    session['endTime'] = "2025-01-01T01:00:00Z"  # Em produção seria datetime.now()
+    game = next((g for g in games if g['id'] == session['gameId']), None)
+    leaderboard_service.record_activity(session['userId'], game['name'] if game else None)
     return jsonify({"message": "Sessão de jogo finalizada!", "session": session}), 200
 
+# Sessões de um usuário ainda em memória (ativas ou finalizadas há pouco)
+@app.route('/game/sessions/<user_id>')
+@process_local
+def get_user_sessions(user_id):
+    return jsonify({"userId": user_id, "sessions": game_sessions.for_user(user_id)}), 200
+
+@app.route('/game/sessions/stats')
+@process_local
+def get_session_stats():
+    return jsonify(game_sessions.stats()), 200
+
 # ===== ROTAS DO SISTEMA DE LEADERBOARD E PONTUAÇÃO =====
 
+def cached_json(endpoint, params, version, build):
+    # Serializa uma vez por versão; If-None-Match com o ETag atual recebe 304 sem corpo
+    etag, body = response_cache.get(endpoint, params, version, lambda: current_app.json.dumps(build()).encode())
+    if etag in request.headers.get('If-None-Match', ''):
+        response_cache.record_not_modified(body)
+        return Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return Response(body, status=200, mimetype='application/json', headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+def leaderboard_page_args():
+    # ?limit=N a partir do topo, ?cursor=<nextCursor> para a página seguinte
+    # ou ?around=<player_id>&radius=k para as posições vizinhas de um jogador.
+    # Páginas limitadas: são lidas com o lock de leitura e guardadas no cache de respostas
+    limit = int(request.args.get('limit', 50))
+    radius = int(request.args.get('radius', 5))
+    if not 1 <= limit <= MAX_LEADERBOARD_LIMIT or not 0 <= radius <= MAX_LEADERBOARD_RADIUS:
+        raise ValueError(f"limit deve estar entre 1 e {MAX_LEADERBOARD_LIMIT} "
+                         f"e radius entre 0 e {MAX_LEADERBOARD_RADIUS}")
+    return limit, request.args.get('cursor'), request.args.get('around'), radius
+
 # Obter ranking global
 @app.route('/leaderboard/global')
 def get_global_leaderboard():
     try:
-        limit = int(request.args.get('limit', 50))
-        leaderboard = leaderboard_service.get_global_leaderboard(limit)
-        return jsonify(leaderboard), 200
+        page_args = leaderboard_page_args()
+        return cached_json('global', page_args, leaderboard_service.ranking_version('global'),
+                           lambda: leaderboard_service.get_global_leaderboard(*page_args))
+    except ValueError as e:
+        return jsonify({"message": "Parâmetros de paginação inválidos", "error": str(e)}), 400
     except Exception as e:
         return jsonify({"message": "Erro ao obter ranking global", "error": str(e)}), 500
 
 # Obter ranking por jogo
 @app.route('/leaderboard/game/<game_name>')
 def get_game_leaderboard(game_name):
+    # Jogo inexistente é 404; os demais ValueError vêm dos parâmetros de paginação (400)
+    if not leaderboard_service.storage.has_game(game_name):
+        return jsonify({"message": "Erro ao obter ranking do jogo", "error": f"Jogo {game_name} não encontrado"}), 404
     try:
-        limit = int(request.args.get('limit', 50))
-        leaderboard = leaderboard_service.get_game_leaderboard(game_name, limit)
-        return jsonify(leaderboard), 200
+        page_args = leaderboard_page_args()
+        return cached_json('game', (game_name, *page_args), leaderboard_service.ranking_version(f'game:{game_name}'),
+                           lambda: leaderboard_service.get_game_leaderboard(game_name, *page_args))
+    except ValueError as e:
+        return jsonify({"message": "Parâmetros de paginação inválidos", "error": str(e)}), 400
     except Exception as e:
-        return jsonify({"message": "Erro ao obter ranking do jogo", "error": str(e)}), 404
+        return jsonify({"message": "Erro ao obter ranking do jogo", "error": str(e)}), 500
+
+# Acompanhar mudanças de ranking (text/event-stream) em vez de re-consultar:
+# ?view=global&limit=N (padrão), ?view=game&game=<nome>&limit=N ou
+# ?view=around&player=<id>&radius=k[&game=<nome>]. O primeiro evento (snapshot) traz a
+# view completa; os seguintes (diff), só quem mudou de posição ou rating e quem saiu
+@app.route('/leaderboard/stream')
+def stream_leaderboard():
+    try:
+        key = RankStream.view_key(
+            request.args.get('view', 'global'),
+            request.args.get('game'),
+            int(request.args.get('limit', 10)),
+            request.args.get('player'),
+            int(request.args.get('radius', 5)),
+        )
+    except ValueError as e:
+        return jsonify({"message": "Parâmetros inválidos", "error": str(e)}), 400
+    try:
+        subscription = rank_stream.subscribe(key)
+    except ValueError as e:
+        return jsonify({"message": "Ranking não encontrado", "error": str(e)}), 404
+    response = Response(
+        subscription.events(request.headers.get('Last-Event-ID')),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(subscription.close)
+    return response
+
+# Views e assinantes dos streams de ranking
+@app.route('/leaderboard/stream/stats')
+def get_stream_stats():
+    return jsonify(rank_stream.stats()), 200
 
 # Obter estatísticas de um jogador
 @app.route('/player/<player_id>/stats')
@@ -250,7 +553,10 @@ def update_player_stats(player_id):
                 "message": "Dados obrigatórios: gameName (string) e won (boolean)"
             }), 400
 
-        result = leaderboard_service.update_player_after_game(player_id, game_result)
+        # Aplicado pela escritora do shard do jogador, num micro-lote com outras requisições
+        result = leaderboard_service.submit_game_result(player_id, game_result).result()
+        if "error" in result:
+            raise ValueError(result["error"])
         return jsonify({
             "message": "Estatísticas atualizadas com sucesso",
             **result
@@ -258,23 +564,88 @@ def update_player_stats(player_id):
     except Exception as e:
         return jsonify({"message": "Erro ao atualizar estatísticas", "error": str(e)}), 400
 
+def batch_item_result(game_result, future):
+    # O erro de um item fica na resposta dele: os demais já podem ter sido aplicados
+    try:
+        return {key: value for key, value in future.result().items() if key != "player"}
+    except Exception as e:
+        player_id = str(game_result.get("playerId", "")) if isinstance(game_result, dict) else ""
+        return {"playerId": player_id, "error": str(e)}
+
+# Atualizar estatísticas de várias partidas em uma única requisição
+@app.route('/players/game-results', methods=['POST'])
+def update_players_stats_batch():
+    try:
+        data = request.get_json()
+        game_results = data.get('results') if isinstance(data, dict) else None
+
+        if not isinstance(game_results, list):
+            return jsonify({"message": "Dados obrigatórios: results (lista de resultados)"}), 400
+        if len(game_results) > MAX_BATCH_RESULTS:
+            return jsonify({"message": f"Máximo de {MAX_BATCH_RESULTS} resultados por lote"}), 400
+
+        futures = leaderboard_service.submit_game_results(game_results)
+        results = [batch_item_result(result, future) for result, future in zip(game_results, futures)]
+        return jsonify({
+            "message": "Estatísticas atualizadas com sucesso",
+            "processed": sum(1 for r in results if "error" not in r),
+            "failed": sum(1 for r in results if "error" in r),
+            "results": results,
+        }), 200
+    except Exception as e:
+        return jsonify({"message": "Erro ao atualizar estatísticas", "error": str(e)}), 400
+
 # Obter estatísticas gerais da plataforma
 @app.route('/platform/stats')
 def get_platform_stats():
     try:
-        stats = leaderboard_service.get_platform_stats()
-        return jsonify(stats), 200
+        # activePlayers muda com o tempo (janela em buckets de uma hora), não só com mutações
+        version = (leaderboard_service.ranking_version('platform'), int(time.time() // BUCKET_SECONDS))
+        return cached_json('platform', None, version, leaderboard_service.get_platform_stats)
     except Exception as e:
         return jsonify({"message": "Erro ao obter estatísticas da plataforma", "error": str(e)}), 500
 
+# Usuários ativos distintos (estimativa HyperLogLog): ?days=N para uma janela específica,
+# sem days retorna diário/semanal/mensal; ?game=<nome> filtra por jogo
+@app.route('/platform/active-users')
+@process_local
+def get_active_users():
+    try:
+        days = request.args.get('days')
+        active_users = leaderboard_service.get_active_users(int(days) if days else None, request.args.get('game'))
+        return jsonify(active_users), 200
+    except ValueError as e:
+        return jsonify({"message": "Janela inválida", "error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"message": "Erro ao obter usuários ativos", "error": str(e)}), 500
+
+# Métricas do cache de respostas dos rankings
+@app.route('/platform/cache-stats')
+def get_cache_stats():
+    return jsonify(response_cache.stats()), 200
+
+# Fechar agora o período de rating Glicko-2 (normalmente fechado na virada do dia)
+@app.route('/ratings/period/close', methods=['POST'])
+@process_local
+def close_rating_period():
+    try:
+        result = leaderboard_service.close_rating_period()
+        return jsonify({"message": "Período de rating fechado", **result}), 200
+    except ValueError as e:
+        return jsonify({"message": "Glicko-2 desabilitado", "error": str(e)}), 409
+
 # Obter ranking sazonal
 @app.route('/leaderboard/seasonal')
+@process_local
 def get_seasonal_ranking():
     try:
         season = request.args.get('season', 'current')
         game = request.args.get('game')
-        ranking = leaderboard_service.get_seasonal_ranking(season, game)
-        return jsonify(ranking), 200
+        version = (leaderboard_service.ranking_version('seasonal'), leaderboard_service.ranking_version(f'game:{game}'))
+        return cached_json('seasonal', (season, game), version,
+                           lambda: leaderboard_service.get_seasonal_ranking(season, game))
+    except ValueError as e:
+        return jsonify({"message": "Temporada não encontrada", "error": str(e)}), 404
     except Exception as e:
         return jsonify({"message": "Erro ao obter ranking sazonal", "error": str(e)}), 500
 
@@ -282,6 +653,7 @@ def get_seasonal_ranking():
 
 # Criar torneio
 @app.route('/tournaments', methods=['POST'])
+@process_local
 def create_tournament():
     try:
         tournament = leaderboard_service.create_tournament(request.get_json())
@@ -294,6 +666,7 @@ def create_tournament():
 
 # Obter torneios ativos
 @app.route('/tournaments/active')
+@process_local
 def get_active_tournaments():
     try:
         tournaments = leaderboard_service.get_active_tournaments()
@@ -303,6 +676,7 @@ def get_active_tournaments():
 
 # Inscrever jogador em torneio
 @app.route('/tournaments/<tournament_id>/register', methods=['POST'])
+@process_local
 def register_in_tournament(tournament_id):
     try:
         data = request.get_json()
@@ -319,23 +693,73 @@ def register_in_tournament(tournament_id):
     except Exception as e:
         return jsonify({"message": "Erro ao inscrever jogador", "error": str(e)}), 400
 
+# Iniciar torneio: encerra as inscrições e gera a chave ou a primeira rodada
+@app.route('/tournaments/<tournament_id>/start', methods=['POST'])
+@process_local
+def start_tournament(tournament_id):
+    try:
+        tournament = leaderboard_service.start_tournament(tournament_id)
+        return jsonify({
+            "message": "Torneio iniciado",
+            "tournament": leaderboard_service.get_tournament_matches(tournament["id"])
+        }), 200
+    except Exception as e:
+        return jsonify({"message": "Erro ao iniciar torneio", "error": str(e)}), 400
+
+# Partidas do torneio (opcionalmente de uma rodada)
+@app.route('/tournaments/<tournament_id>/matches')
+@process_local
+def get_tournament_matches(tournament_id):
+    try:
+        round_number = request.args.get('round', type=int)
+        return jsonify(leaderboard_service.get_tournament_matches(tournament_id, round_number)), 200
+    except ValueError as e:
+        return jsonify({"message": "Torneio não encontrado", "error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"message": "Erro ao obter partidas", "error": str(e)}), 500
+
+# Registrar resultado de uma partida do torneio (winnerId nulo = empate, fora das eliminatórias)
+@app.route('/tournaments/<tournament_id>/matches/<int:match_id>/result', methods=['POST'])
+@process_local
+def report_tournament_match(tournament_id, match_id):
+    try:
+        data = request.get_json() or {}
+        match = leaderboard_service.report_match_result(tournament_id, match_id, data.get('winnerId'))
+        return jsonify({
+            "message": "Resultado registrado",
+            "match": match
+        }), 200
+    except Exception as e:
+        return jsonify({"message": "Erro ao registrar resultado", "error": str(e)}), 400
+
 # ===== ROTAS DE CONQUISTAS =====
 
 # Obter todas as conquistas disponíveis
 @app.route('/achievements')
 def get_achievements():
-    achievements = [
-        {"id": 'first_win', "name": 'Primeira Vitória', "description": 'Ganhe sua primeira partida', "icon": '🏆', "rarity": 'common'},
-        {"id": 'win_streak_5', "name": 'Sequência de 5', "description": 'Ganhe 5 partidas seguidas', "icon": '🔥', "rarity": 'uncommon'},
-        {"id": 'win_streak_10', "name": 'Sequência de 10', "description": 'Ganhe 10 partidas seguidas', "icon": '⚡', "rarity": 'rare'},
-        {"id": 'games_played_100', "name": 'Veterano', "description": 'Jogue 100 partidas', "icon": '🎖️', "rarity": 'uncommon'},
-        {"id": 'level_10', "name": 'Explorador', "description": 'Alcance o nível 10', "icon": '🌟', "rarity": 'common'},
-        {"id": 'level_20', "name": 'Aventureiro', "description": 'Alcance o nível 20', "icon": '⭐', "rarity": 'uncommon'},
-        {"id": 'master_senet', "name": 'Mestre do Senet', "description": 'Ganhe 10 partidas de Senet', "icon": '🏺', "rarity": 'rare'},
-        {"id": 'master_go', "name": 'Mestre do Go', "description": 'Ganhe 10 partidas de Go', "icon": '⚫', "rarity": 'rare'},
-        {"id": 'master_mancala', "name": 'Mestre do Mancala', "description": 'Ganhe 10 partidas de Mancala', "icon": '🌰', "rarity": 'rare'},
-        {"id": 'collector', "name": 'Colecionador', "description": 'Jogue todos os jogos disponíveis', "icon": '📚', "rarity": 'legendary'},
-    ]
-    
-    return jsonify(achievements), 200
+    return jsonify(leaderboard_service.achievements.public_catalog()), 200
+
+# Aplicar uma conquista a todos os jogadores existentes (job em segundo plano)
+@app.route('/achievements/<achievement_id>/backfill', methods=['POST'])
+@process_local
+def backfill_achievement(achievement_id):
+    try:
+        job = leaderboard_service.start_achievement_backfill(achievement_id)
+        return jsonify({
+            "message": "Backfill iniciado",
+            "job": job.to_dict()
+        }), 202
+    except ValueError as e:
+        return jsonify({"message": "Conquista não encontrada", "error": str(e)}), 404
+    except Exception as e:
+        return jsonify({"message": "Erro ao iniciar backfill", "error": str(e)}), 500
+
+# Progresso de um job de backfill
+@app.route('/achievements/backfill/<job_id>')
+@process_local
+def get_backfill_job(job_id):
+    try:
+        return jsonify(leaderboard_service.get_backfill_job(job_id)), 200
+    except ValueError as e:
+        return jsonify({"message": "Job não encontrado", "error": str(e)}), 404
 
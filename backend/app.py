@@ -16,6 +16,7 @@ def home():
 def health():
     return {"status": "healthy", "service": "The Odyssey of Games Backend"}
 
+# Modo asyncio (streams e long-polls sem uma thread por conexão): python asgi.py
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
 
@@ -0,0 +1,195 @@
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from app import app as flask_app
+from api.index import MAX_MATCHMAKING_WAIT, match_notifier, match_pending, rank_stream
+from services.asgi_server import serve
+from services.rank_stream import RankStream
+
+# Modo de servir asyncio (ASGI) com as mesmas rotas do app Flask (python asgi.py, ou
+# qualquer servidor ASGI: uvicorn asgi:app).
+# As rotas comuns rodam no próprio Flask, num pool limitado de ASGI_WORKERS threads; até
+# ASGI_MAX_PENDING requisições esperam por uma thread, as demais recebem 503 na hora.
+# As esperas longas não ocupam thread nenhuma: /api/leaderboard/stream (text/event-stream)
+# e GET /api/matchmaking/<userId>?wait=s são tratadas aqui como corrotinas. Parâmetros
+# inválidos e a resposta final do matchmaking continuam vindo das rotas Flask.
+
+ASGI_WORKERS = int(os.environ.get('ASGI_WORKERS', min(32, (os.cpu_count() or 1) + 4)))
+ASGI_MAX_PENDING = int(os.environ.get('ASGI_MAX_PENDING', 1024))
+STREAM_PATH = '/api/leaderboard/stream'
+MATCHMAKING_PREFIX = '/api/matchmaking/'
+
+
+def wsgi_environ(scope: Dict, body: bytes) -> Dict:
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope['http_version']}",
+        'REMOTE_ADDR': scope['client'][0] if scope.get('client') else '',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        key = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if key == 'CONTENT_TYPE':
+            environ[key] = value
+        elif key != 'CONTENT_LENGTH':
+            key = f'HTTP_{key}'
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class OdysseyASGI:
+    def __init__(self, wsgi_app, workers: int = ASGI_WORKERS, max_pending: int = ASGI_MAX_PENDING):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix='asgi-worker')
+        self.max_pending = max_pending
+        self.pending = 0
+
+    async def __call__(self, scope: Dict, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+        if scope['method'] == 'GET' and scope['path'] == STREAM_PATH:
+            if await self.stream(scope, receive, send):
+                return
+        elif scope['method'] == 'GET' and scope['path'].startswith(MATCHMAKING_PREFIX):
+            scope = await self.wait_for_match(scope)
+        await self.call_wsgi(scope, body, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def run_wsgi(self, environ: Dict) -> Tuple[int, List[Tuple[bytes, bytes]], bytes]:
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = headers
+
+        chunks = self.wsgi_app(environ, start_response)
+        try:
+            body = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+        headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                   for name, value in response['headers'] if name.lower() != 'content-length']
+        return response['status'], headers + [(b'content-length', str(len(body)).encode())], body
+
+    async def call_wsgi(self, scope: Dict, body: bytes, send):
+        # Fila limitada: com o pool ocupado e ASGI_MAX_PENDING esperando, 503 imediato
+        if self.pending >= self.max_pending:
+            await send({'type': 'http.response.start', 'status': 503,
+                        'headers': [(b'content-length', b'0'), (b'retry-after', b'1')]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        self.pending += 1
+        try:
+            status, headers, payload = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.run_wsgi, wsgi_environ(scope, body))
+        finally:
+            self.pending -= 1
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': payload})
+
+    async def stream(self, scope: Dict, receive, send) -> bool:
+        # False devolve a requisição à rota Flask, que responde 400/404 como no modo WSGI
+        args = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+        headers = dict(scope['headers'])
+        try:
+            key = RankStream.view_key(args.get('view', 'global'), args.get('game'), int(args.get('limit', 10)),
+                                      args.get('player'), int(args.get('radius', 5)))
+            # View já carregada: assina no próprio loop; senão a primeira leitura vai para o pool
+            subscription = rank_stream.subscribe_loaded(key) or await asyncio.get_running_loop().run_in_executor(
+                self.executor, rank_stream.subscribe, key)
+        except ValueError:
+            return False
+        response_headers = [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]
+        if b'origin' in headers:
+            response_headers.append((b'access-control-allow-origin', b'*'))  # como CORS(app)
+        last_event_id = headers.get(b'last-event-id')
+        events = subscription.async_events(last_event_id.decode('latin-1') if last_event_id else None)
+
+        async def pump():
+            await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+            async for chunk in events:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+
+        # Termina quando o cliente desconecta (ou o envio falha, com a conexão já fechada)
+        writer = asyncio.ensure_future(pump())
+        disconnect = asyncio.ensure_future(receive())
+        try:
+            await asyncio.wait({writer, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            writer.cancel()
+            disconnect.cancel()
+            await asyncio.gather(writer, disconnect, return_exceptions=True)
+            await events.aclose()
+            subscription.close()
+        return True
+
+    async def wait_for_match(self, scope: Dict) -> Dict:
+        # ?wait=s espera o pareamento numa corrotina; a rota Flask responde sem o wait
+        args = parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True)
+        try:
+            wait = min(max(float(dict(args).get('wait', 0)), 0), MAX_MATCHMAKING_WAIT)
+        except ValueError:
+            return scope
+        user_id = scope['path'][len(MATCHMAKING_PREFIX):]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + wait
+        while True:
+            remaining = deadline - loop.time()
+            with match_notifier.condition:
+                if remaining <= 0 or not match_pending(user_id):
+                    break
+                waiter = match_notifier.future()
+            await match_notifier.wait_async(waiter, remaining)
+        query = urlencode([(name, value) for name, value in args if name != 'wait'])
+        return dict(scope, query_string=query.encode('latin-1'))
+
+
+app = OdysseyASGI(flask_app)
+
+if __name__ == '__main__':
+    asyncio.run(serve(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000))))
@@ -0,0 +1,240 @@
+import asyncio
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Uso: python benchmarks/asgi_benchmark.py [conexões=1000,10000,50000] [requisições_de_sonda] [modos=wsgi,asgi]
+# Para cada número de conexões, sobe o servidor em cada modo num processo próprio:
+# WSGI (servidor com threads do Werkzeug, uma thread por conexão) e asyncio (asgi.py,
+# uma corrotina por conexão). Processos clientes abrem as conexões como assinantes de
+# /api/leaderboard/stream e as mantêm abertas. Com elas abertas, mede a memória e as
+# threads do servidor, a latência de requisições comuns (ranking global) e o tempo até
+# um resultado de partida chegar a todos os assinantes.
+# Cada processo tem no máximo RLIMIT_NOFILE descritores: acima disso as conexões são
+# limitadas ao que o servidor pode manter, e o resultado diz isso.
+
+STREAM_PATH = '/api/leaderboard/stream?view=global&limit=10'
+MARKER = b'"publishedAt":'
+DELIVERY_TIMEOUT = 60
+FD_RESERVE = 256
+CONNECT_CONCURRENCY = 256
+
+
+def raise_fd_limit() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+def serve(mode: str, port: int):
+    raise_fd_limit()
+    if mode == 'asgi':
+        from asgi import app
+        from services.asgi_server import serve as serve_asgi
+        asyncio.run(serve_asgi(app, '127.0.0.1', port, backlog=4096))
+    else:
+        from app import app
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', port, app, threaded=True)
+        server.socket.listen(4096)  # mesma fila de conexões nos dois modos
+        server.serve_forever()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+async def open_stream(port: int, local: str):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port, local_addr=(local, 0))
+    writer.write(f'GET {STREAM_PATH} HTTP/1.1\r\nHost: benchmark\r\n\r\n'.encode())
+    received = b''
+    while b'event: snapshot' not in received:
+        data = await reader.read(65536)
+        if not data:
+            raise ConnectionError('conexão fechada antes do snapshot')
+        received += data
+    return reader, writer
+
+
+async def listen(reader, latencies, delivered):
+    while True:
+        data = await reader.read(65536)
+        if not data:
+            return
+        marker = data.rfind(MARKER)
+        if marker >= 0 and b'event: diff' in data:
+            end = data.index(b'}', marker)
+            latencies.append(time.time() * 1000 - int(data[marker + len(MARKER):end]))
+            with delivered.get_lock():
+                delivered.value += 1
+
+
+async def hold_connections(count: int, port: int, local: str, pipe, delivered):
+    limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    opened = []
+    failed = 0
+
+    async def connect():
+        nonlocal failed
+        async with limit:
+            try:
+                opened.append(await asyncio.wait_for(open_stream(port, local), 60))
+            except (OSError, asyncio.TimeoutError):
+                failed += 1
+
+    await asyncio.gather(*(connect() for _ in range(count)))
+    pipe.send((len(opened), failed))
+    latencies = []
+    listeners = [asyncio.ensure_future(listen(reader, latencies, delivered)) for reader, _ in opened]
+    await asyncio.get_running_loop().run_in_executor(None, pipe.recv)
+    for listener in listeners:
+        listener.cancel()
+    for _, writer in opened:
+        writer.close()
+    pipe.send(latencies)
+
+
+def client(count: int, port: int, local: str, pipe, delivered):
+    raise_fd_limit()
+    asyncio.run(hold_connections(count, port, local, pipe, delivered))
+
+
+def server_status(pid: int):
+    fields = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            fields[name] = value.split()
+    return int(fields['VmRSS'][0]) / 1024, int(fields['Threads'][0])
+
+
+def free_port() -> int:
+    # Abaixo da faixa efêmera: as conexões dos clientes (e seus TIME_WAIT) não a ocupam
+    while True:
+        port = random.randrange(20000, 32000)
+        with socket.socket() as probe_socket:
+            try:
+                probe_socket.bind(('127.0.0.1', port))
+                return port
+            except OSError:
+                continue
+
+
+def start_server(mode: str) -> Tuple[subprocess.Popen, int]:
+    # Porta livre escolhida aqui; se outro socket a ocupar antes do servidor subir, tenta outra
+    for _ in range(3):
+        port = free_port()
+        log = tempfile.TemporaryFile()
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), 'serve', mode, str(port)],
+                                  cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  stdout=subprocess.DEVNULL, stderr=log)
+        while server.poll() is None:
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                return server, port
+            except OSError:
+                time.sleep(0.1)
+        log.seek(0)
+        error = log.read().decode(errors='replace')
+        if 'Address already in use' not in error:
+            raise RuntimeError(f'servidor saiu com código {server.returncode}:\n{error[-2000:]}')
+    raise RuntimeError('nenhuma porta livre para o servidor')
+
+
+def probe(port: int, requests: int):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    latencies, failures = [], 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        try:
+            connection.request('GET', '/api/leaderboard/global?limit=10')
+            response = connection.getresponse()
+            response.read()
+            if response.status != 200:
+                failures += 1
+        except OSError:
+            failures += 1
+            connection.close()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies, failures
+
+
+def post_winning_result(port: int):
+    # Vitória do líder contra um adversário muito mais forte: muda o rating do topo
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    connection.request('GET', '/api/leaderboard/global?limit=1')
+    leader = json.loads(connection.getresponse().read())['leaderboard'][0]['id']
+    connection.request('POST', f'/api/player/{leader}/game-result',
+                       body=json.dumps({"gameName": "Senet", "won": True, "opponentRating": 3000}),
+                       headers={"Content-Type": "application/json"})
+    connection.getresponse().read()
+
+
+def run(mode: str, connections: int, probes: int, fd_limit: int):
+    held = min(connections, fd_limit - FD_RESERVE)
+    server, port = start_server(mode)
+    client_process = None
+    try:
+        idle_rss, idle_threads = server_status(server.pid)
+        # Um processo cliente basta: as conexões já estão limitadas a RLIMIT_NOFILE
+        context = multiprocessing.get_context('fork')
+        delivered = context.Value('i', 0)
+        pipe, child = context.Pipe()
+        started = time.perf_counter()
+        client_process = context.Process(target=client, args=(held, port, '127.0.0.2', child, delivered), daemon=True)
+        client_process.start()
+        opened, failed = pipe.recv()
+        open_seconds = time.perf_counter() - started
+        rss, threads = server_status(server.pid)
+        latencies, failures = probe(port, probes)
+        post_winning_result(port)
+        deadline = time.monotonic() + DELIVERY_TIMEOUT
+        while delivered.value < opened and time.monotonic() < deadline:
+            time.sleep(0.1)
+        pipe.send('stop')
+        deliveries = pipe.recv()
+    finally:
+        if client_process is not None:
+            client_process.join(10)
+        server.terminate()
+        server.wait()
+
+    capped = f' (limitado por RLIMIT_NOFILE={fd_limit})' if held < connections else ''
+    print(f"  {mode:5}: {opened:,} de {held:,} conexões abertas{capped} em {open_seconds:.1f} s, {failed:,} falhas")
+    print(f"         servidor: {rss:,.0f} MB ({(rss - idle_rss) * 1024 / max(1, opened):,.1f} KB por conexão), "
+          f"{threads:,} threads (ocioso: {idle_threads})")
+    print(f"         GET /api/leaderboard/global com as conexões abertas: p50 {percentile(latencies, 0.5):.1f} ms, "
+          f"p99 {percentile(latencies, 0.99):.1f} ms, {failures} falhas")
+    print(f"         diferença entregue a {len(deliveries):,} de {opened:,} assinantes: p50 {percentile(deliveries, 0.5):,.0f} ms, "
+          f"p99 {percentile(deliveries, 0.99):,.0f} ms depois da publicação")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(sys.argv[2], int(sys.argv[3]))
+        sys.exit()
+    levels = [int(level) for level in (sys.argv[1] if len(sys.argv) > 1 else '1000,10000,50000').split(',')]
+    probes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    modes = (sys.argv[3] if len(sys.argv) > 3 else 'wsgi,asgi').split(',')
+    fd_limit = raise_fd_limit()
+    print(f"{os.cpu_count()} núcleo(s), RLIMIT_NOFILE={fd_limit}, {probes} requisições de sonda por medição")
+    for connections in levels:
+        print(f"{connections:,} conexões de /api/leaderboard/stream:")
+        if connections > fd_limit - FD_RESERVE:
+            print(f"  AVISO: acima do limite de descritores deste ambiente; são medidas "
+                  f"{fd_limit - FD_RESERVE:,} conexões, não {connections:,}")
+        for mode in modes:
+            run(mode, connections, probes, fd_limit)
@@ -0,0 +1,55 @@
+import os
+import random
+import sys
+import time
+
+from flask import Flask
+
+# Adicionar o diretório pai ao path para importar api e services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.index import app as api_blueprint, leaderboard_service
+
+# Uso: python benchmarks/batch_ingest_benchmark.py [resultados] [tamanho_do_lote]
+PLAYERS = 100_000
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
+
+
+def random_result() -> dict:
+    return {
+        "playerId": f"bench_{random.randrange(PLAYERS)}",
+        "gameName": random.choice(GAMES),
+        "won": random.random() < 0.5,
+        "gameTime": random.randint(120, 3600),
+        "opponentRating": random.randint(900, 2200),
+    }
+
+
+def run(total: int, batch_size: int):
+    app = Flask(__name__)
+    app.register_blueprint(api_blueprint, url_prefix='/api')
+    client = app.test_client()
+
+    for i in range(PLAYERS):
+        leaderboard_service.create_player({"id": f"bench_{i}", "rating": random.randint(1000, 2000)})
+    results = [random_result() for _ in range(total)]
+
+    start = time.perf_counter()
+    for result in results:
+        client.post(f"/api/player/{result['playerId']}/game-result", json=result)
+    single_rate = total / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for offset in range(0, total, batch_size):
+        client.post("/api/players/game-results", json={"results": results[offset:offset + batch_size]})
+    batch_rate = total / (time.perf_counter() - start)
+
+    print(f"por resultado: {single_rate:10,.0f} resultados/s")
+    print(f"em lote ({batch_size}): {batch_rate:10,.0f} resultados/s")
+    print(f"ganho: {batch_rate / single_rate:.1f}x")
+
+
+if __name__ == '__main__':
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    run(total, batch_size)
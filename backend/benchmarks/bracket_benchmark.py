@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import brackets
+
+# Uso: python benchmarks/bracket_benchmark.py [tamanhos separados por vírgula] [rodadas_suíço]
+# Para cada tamanho de campo: tempo para gerar a chave das eliminatórias, uma rodada de
+# round robin e cada rodada do suíço (com resultados aleatórios entre as rodadas),
+# e quantas revanches o pareamento suíço precisou aceitar.
+
+
+def make_tournament(kind: str, size: int, rounds: int = None):
+    return {
+        "type": kind,
+        "rounds": rounds,
+        "participants": [
+            {"playerId": f"p{i}", "playerRating": random.randint(800, 2400)} for i in range(size)
+        ],
+    }
+
+
+def play_round(tournament):
+    for match in tournament["matches"]:
+        if match["status"] == "ready":
+            winner = random.choice((match["player1"], match["player2"], None))
+            brackets.record_result(tournament, match["id"], winner)
+
+
+def run(size: int, swiss_rounds: int):
+    for kind in ("elimination", "double_elimination"):
+        tournament = make_tournament(kind, size)
+        start = time.perf_counter()
+        brackets.start(tournament)
+        elapsed = time.perf_counter() - start
+        print(f"  {kind:<19} chave com {len(tournament['matches']):,} partidas em {elapsed * 1000:8.1f} ms")
+
+    tournament = make_tournament("round_robin", size)
+    start = time.perf_counter()
+    brackets.start(tournament)
+    elapsed = time.perf_counter() - start
+    print(f"  {'round_robin':<19} rodada 1 ({tournament['pendingMatches']:,} partidas) em {elapsed * 1000:8.1f} ms")
+
+    tournament = make_tournament("swiss", size, swiss_rounds)
+    start = time.perf_counter()
+    brackets.start(tournament)
+    timings = [time.perf_counter() - start]
+    while True:
+        play_round(tournament)  # o último resultado da rodada gera a próxima
+        if tournament["currentRound"] == len(timings):
+            break
+        # Tempo do pareamento isolado: refaz a rodada corrente a partir do mesmo estado
+        standings = tournament["standings"]
+        entries = [(player_id, s["score"], s["rating"]) for player_id, s in standings.items()]
+        opponents = {player_id: set(s["opponents"]) for player_id, s in standings.items()}
+        had_bye = {player_id for player_id, s in standings.items() if s["byes"]}
+        start = time.perf_counter()
+        brackets.swiss_pairings(entries, opponents, had_bye)
+        timings.append(time.perf_counter() - start)
+    pairs = [frozenset((m["player1"], m["player2"])) for m in tournament["matches"] if m["player2"] is not None]
+    rematches = len(pairs) - len(set(pairs))
+    print(f"  {'swiss':<19} {len(timings)} rodadas, pior pareamento {max(timings) * 1000:8.1f} ms, "
+          f"média {sum(timings) / len(timings) * 1000:.1f} ms, revanches: {rematches}")
+
+
+if __name__ == '__main__':
+    sizes = [int(s) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else [100, 1_000, 10_000, 100_000]
+    swiss_rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 9
+    random.seed(42)
+    for size in sizes:
+        print(f"{size:,} participantes:")
+        run(size, swiss_rounds)
@@ -0,0 +1,121 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.glicko2 import (
+    CONVERGENCE, DEFAULT_RATING, DEFAULT_TAU, OPPONENT_DEVIATION, SCALE, Glicko2Table, rating_period,
+)
+
+# Uso: python benchmarks/glicko_benchmark.py [jogadores] [partidas] [amostra_escalar]
+# Um período de rating ("noturno") com `partidas` resultados entre `jogadores`:
+# tempo para registrar os resultados e para fechar o período em lote, comparado com a
+# implementação escalar passo a passo do artigo do Glicko-2 (medida numa amostra de
+# jogadores e extrapolada), que também serve de verificação dos valores.
+
+
+def scalar_update(rating, deviation, volatility, results, tau=DEFAULT_TAU):
+    # Glickman, passos 2 a 8, um jogador por vez
+    mu = (rating - DEFAULT_RATING) / SCALE
+    phi = deviation / SCALE
+    v_inverse = 0.0
+    improvement = 0.0
+    for opponent_rating, opponent_deviation, score in results:
+        g = 1 / math.sqrt(1 + 3 * (opponent_deviation / SCALE) ** 2 / math.pi ** 2)
+        expected = 1 / (1 + math.exp(-g * (mu - (opponent_rating - DEFAULT_RATING) / SCALE)))
+        v_inverse += g ** 2 * expected * (1 - expected)
+        improvement += g * (score - expected)
+    v = 1 / v_inverse
+    delta = v * improvement
+    a = math.log(volatility ** 2)
+
+    def f(x):
+        ex = math.exp(x)
+        return ex * (delta ** 2 - phi ** 2 - v - ex) / (2 * (phi ** 2 + v + ex) ** 2) - (x - a) / tau ** 2
+
+    A = a
+    if delta ** 2 > phi ** 2 + v:
+        B = math.log(delta ** 2 - phi ** 2 - v)
+    else:
+        k = 1
+        while f(a - k * tau) < 0:
+            k += 1
+        B = a - k * tau
+    fA, fB = f(A), f(B)
+    while abs(B - A) > CONVERGENCE:
+        C = A + (A - B) * fA / (fB - fA)
+        fC = f(C)
+        if fC * fB <= 0:
+            A, fA = B, fB
+        else:
+            fA /= 2
+        B, fB = C, fC
+    sigma = math.exp(A / 2)
+    phi_star = math.sqrt(phi ** 2 + sigma ** 2)
+    new_phi = 1 / math.sqrt(1 / phi_star ** 2 + 1 / v)
+    new_mu = mu + new_phi ** 2 * improvement
+    return new_mu * SCALE + DEFAULT_RATING, min(new_phi * SCALE, 350.0), sigma
+
+
+def run(players: int, games: int, sample: int):
+    rng = np.random.default_rng(7)
+    player_ids = [f"p{i}" for i in range(players)]
+    table = Glicko2Table()
+    for player_id in player_ids:
+        table.row(player_id)
+    table.rating[:players] = rng.normal(1500, 250, players)
+    table.deviation[:players] = rng.uniform(50, 350, players)
+    initial = (table.rating[:players].copy(), table.deviation[:players].copy(), table.volatility[:players].copy())
+
+    rows = rng.integers(0, players, games)
+    opponent_ratings = rng.normal(1500, 250, games)
+    scores = (rng.random(games) < 0.5).astype(np.float64)
+
+    start = time.perf_counter()
+    table.record_many([player_ids[row] for row in rows.tolist()], opponent_ratings, scores)
+    recorded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table.close_period()
+    closed = time.perf_counter() - start
+    print(f"{players:,} jogadores, {games:,} partidas no período")
+    print(f"  registrar resultados: {recorded:.2f} s")
+    print(f"  fechar o período (vetorizado): {closed:.2f} s")
+
+    # Referência escalar numa amostra de jogadores que jogaram
+    by_player = {}
+    sample_rows = set(np.unique(rows)[:sample].tolist())
+    for row, opponent_rating, score in zip(rows.tolist(), opponent_ratings.tolist(), scores.tolist()):
+        if row in sample_rows:
+            by_player.setdefault(row, []).append((opponent_rating, OPPONENT_DEVIATION, score))
+    start = time.perf_counter()
+    expected = {row: scalar_update(initial[0][row], initial[1][row], initial[2][row], results)
+                for row, results in by_player.items()}
+    scalar = time.perf_counter() - start
+    sampled_games = sum(map(len, by_player.values()))
+    estimate = scalar / sampled_games * games
+    print(f"  escalar: {scalar:.2f} s para {sampled_games:,} partidas de {len(by_player):,} jogadores "
+          f"→ ~{estimate:.0f} s para o período inteiro ({estimate / closed:.0f}x)")
+
+    error = max(max(abs(expected[row][0] - table.rating[row]), abs(expected[row][1] - table.deviation[row]))
+                for row in expected)
+    print(f"  maior diferença vetorizado x escalar (rating/desvio): {error:.2e}")
+
+    # Exemplo do artigo: 1500/200 contra 1400/30 (vitória), 1550/100 e 1700/300 (derrotas)
+    rating, deviation, volatility = rating_period(
+        np.array([1500.0]), np.array([200.0]), np.array([0.06]), np.zeros(3, dtype=np.int64),
+        np.array([1400.0, 1550.0, 1700.0]), np.array([30.0, 100.0, 300.0]), np.array([1.0, 0.0, 0.0]))
+    print(f"  exemplo do artigo: {rating[0]:.2f} / {deviation[0]:.2f} / {volatility[0]:.5f} "
+          f"(esperado 1464.06 / 151.52 / 0.05999)")
+
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000_000
+    sample = int(sys.argv[3]) if len(sys.argv) > 3 else 20_000
+    run(players, games, sample)
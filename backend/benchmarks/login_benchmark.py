@@ -0,0 +1,123 @@
+import os
+import random
+import sys
+import threading
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.user_store import HashPoolFull, UserStore
+
+# Uso: python benchmarks/login_benchmark.py [segundos] [logins_legítimos_por_segundo] [threads_atacantes]
+# Carga no formato de credential stuffing: `threads_atacantes` threads (como threads de
+# requisição de um servidor WSGI) tentam logins com nomes vazados, quase todos
+# inexistentes ou com a senha errada, a 0,5x, 1x e 2x da capacidade de hash medida,
+# enquanto um cliente legítimo faz logins corretos na taxa dada. Compara o pool com a
+# fila limitada da API (padrão) com a mesma fila sem limite, e reporta a latência dos
+# logins legítimos (p50/p99) e quantos recebem 503 (HashPoolFull).
+# Antes, confere que cadastros simultâneos do mesmo nome geram um único usuário.
+
+LEGIT_USERS = 16
+UNBOUNDED = 10 ** 6
+
+
+def check_concurrent_registration():
+    store = UserStore(max_pending=16)
+    results = []
+
+    def register(i: int):
+        try:
+            results.append(store.register("mesmo-nome", f"senha{i}")["id"])
+        except ValueError:
+            results.append(None)
+
+    threads = [threading.Thread(target=register, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(result is not None for result in results) == 1, results
+    ids = {store.register(f"u{i}", "x")["id"] for i in range(4)}
+    assert len(ids) == 4 and not ids & set(results), (ids, results)
+    store.close()
+    print("cadastros simultâneos: um único usuário por nome, IDs sem repetição")
+
+
+def measure_capacity(store: UserStore) -> float:
+    started = time.perf_counter()
+    for _ in range(10):
+        store.authenticate("ninguém", "x")
+    return store.hash_workers * 10 / (time.perf_counter() - started)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def run(label: str, max_pending, attack_rate: float, seconds: float, legit_rate: float, attackers: int):
+    store = UserStore(max_pending=max_pending)
+    for i in range(LEGIT_USERS):
+        store.register(f"jogador{i}", f"senha-correta-{i}")
+    stop = threading.Event()
+    attempts = [0] * attackers
+
+    def attacker(index: int):
+        # Chegadas em ritmo fixo (não esperam a resposta anterior para a próxima tentativa)
+        rng = random.Random(index)
+        interval = attackers / attack_rate
+        next_attempt = time.perf_counter() + rng.random() * interval
+        while not stop.wait(max(0.0, next_attempt - time.perf_counter())):
+            next_attempt += interval
+            # 1 em 10 nomes vazados existe aqui, sempre com a senha errada
+            if rng.random() < 0.1:
+                username = f"jogador{rng.randrange(LEGIT_USERS)}"
+            else:
+                username = f"vazado{rng.randrange(10 ** 6)}"
+            try:
+                assert store.authenticate(username, "senha123") is None
+            except HashPoolFull:
+                pass
+            attempts[index] += 1
+
+    threads = [threading.Thread(target=attacker, args=(i,), daemon=True) for i in range(attackers)]
+    for thread in threads:
+        thread.start()
+    latencies, busy = [], 0
+    rng = random.Random(-1)
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        i = rng.randrange(LEGIT_USERS)
+        started = time.perf_counter()
+        try:
+            assert store.authenticate(f"jogador{i}", f"senha-correta-{i}") is not None
+            latencies.append((time.perf_counter() - started) * 1000)
+        except HashPoolFull:
+            busy += 1
+        time.sleep(max(0.0, 1 / legit_rate - (time.perf_counter() - started)))
+    stop.set()
+    for thread in threads:
+        thread.join()
+    store.close()
+    total = len(latencies) + busy
+    print(f"    {label}: login legítimo p50 {percentile(latencies, 0.5):,.0f} ms, "
+          f"p99 {percentile(latencies, 0.99):,.0f} ms, {busy} de {total} com 503; "
+          f"{store.rejected:,} de {sum(attempts):,} tentativas de ataque recusadas")
+
+
+if __name__ == '__main__':
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    legit_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 2
+    attackers = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    check_concurrent_registration()
+    probe = UserStore()
+    capacity = measure_capacity(probe)
+    print(f"{probe.hash_workers} thread(s) de hash, capacidade ~{capacity:.0f} hashes/s; {attackers} threads "
+          f"atacantes, {legit_rate:g} logins legítimos/s, {seconds:g} s por medição")
+    for factor in (0.5, 1, 2):
+        print(f"  ataque a {factor:g}x da capacidade ({capacity * factor:.0f} tentativas/s):")
+        run(f"fila limitada ({probe.hash_workers * 4})", None, capacity * factor, seconds, legit_rate, attackers)
+        run("fila sem limite   ", UNBOUNDED, capacity * factor, seconds, legit_rate, attackers)
+    probe.close()
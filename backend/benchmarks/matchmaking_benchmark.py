@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.matchmaking import Matchmaker
+
+# Uso: python benchmarks/matchmaking_benchmark.py [fila_pico] [chegadas_por_segundo] [segundos_simulados]
+# 1) Pico: `fila_pico` jogadores entram na fila de uma vez; mede o custo de entrar na fila
+#    e de cada pareamento na passada seguinte.
+# 2) Simulação em tempo simulado: chegadas de Poisson com ratings ~ N(1500, 350) e uma
+#    passada de pareamento a cada 0,25 s; distribuições do tempo de espera e da
+#    diferença de rating, no geral e para quem está nas caudas do rating.
+
+PASS_INTERVAL = 0.25
+
+
+def percentiles(values, label, unit):
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        print(f"  {label}: sem dados")
+        return
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    print(f"  {label}: p50 {p50:.2f}{unit}  p90 {p90:.2f}{unit}  p99 {p99:.2f}{unit}  máx {values.max():.2f}{unit}")
+
+
+def spike(size: int, rng):
+    matchmaker = Matchmaker()
+    ratings = np.clip(rng.normal(1500, 350, size), 100, 3000).astype(int).tolist()
+    now = 1_000_000.0
+    start = time.perf_counter()
+    for i, rating in enumerate(ratings):
+        matchmaker.enqueue(f"p{i}", "Go", "ranked", rating, now)
+    enqueue = (time.perf_counter() - start) / size
+    print(f"pico de {size:,} jogadores na fila:")
+    print(f"  entrar na fila: {enqueue * 1e6:.1f} µs por jogador")
+
+    start = time.perf_counter()
+    matches = matchmaker.match_pass(now + PASS_INTERVAL)
+    elapsed = time.perf_counter() - start
+    print(f"  passada: {len(matches):,} pares em {elapsed * 1000:.0f} ms "
+          f"({elapsed / max(1, len(matches)) * 1e6:.1f} µs por par), {len(matchmaker.tickets):,} ainda na fila")
+
+
+def simulate(rate: float, seconds: float, rng):
+    matchmaker = Matchmaker()
+    waits, gaps, tail_waits, tail_gaps = [], [], [], []
+    players = 0
+    now = 0.0
+    pass_time = 0.0
+    while now < seconds:
+        arrivals = rng.poisson(rate * PASS_INTERVAL)
+        ratings = np.clip(rng.normal(1500, 350, arrivals), 100, 3000).astype(int).tolist()
+        offsets = np.sort(rng.uniform(0, PASS_INTERVAL, arrivals)).tolist()
+        for rating, offset in zip(ratings, offsets):
+            matchmaker.enqueue(f"p{players}", "Go", "ranked", rating, now + offset)
+            players += 1
+        now += PASS_INTERVAL
+        start = time.perf_counter()
+        for match in matchmaker.match_pass(now):
+            gaps.append(match["ratingGap"])
+            for player in match["players"]:
+                waits.append(player["waitSeconds"])
+                if abs(player["rating"] - 1500) > 700:
+                    tail_waits.append(player["waitSeconds"])
+                    tail_gaps.append(match["ratingGap"])
+        pass_time += time.perf_counter() - start
+
+    print(f"simulação: {players:,} jogadores em {seconds:.0f} s simulados ({rate:,.0f} chegadas/s)")
+    print(f"  pareados {len(waits):,}, ainda na fila {len(matchmaker.tickets):,}, "
+          f"tempo real de pareamento {pass_time:.2f} s")
+    percentiles(waits, "espera (todos)", " s")
+    percentiles(gaps, "diferença de rating (todos)", "")
+    percentiles(tail_waits, "espera (|rating - 1500| > 700)", " s")
+    percentiles(tail_gaps, "diferença de rating (|rating - 1500| > 700)", "")
+
+
+if __name__ == '__main__':
+    spike_size = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 300
+    rng = np.random.default_rng(42)
+    spike(spike_size, rng)
+    simulate(rate, seconds, rng)
@@ -0,0 +1,73 @@
+import gc
+import os
+import random
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.columnar_store import ColumnarStorage
+from services.storage import MemoryStorage
+
+# Uso: python benchmarks/memory_benchmark.py [jogadores]
+# Mede com tracemalloc os bytes por jogador do armazenamento de jogadores:
+# dicts por jogador (MemoryStorage) contra colunas compactas (ColumnarStorage).
+# O índice de ranking global é medido separadamente, pois é igual nos dois backends.
+AVATARS = ['👑', '🎯', '🌍', '🧘', '👨‍🔬', '⚔️', '🏛️', '🐉']
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
+ACHIEVEMENTS = ['first_win', 'win_streak_5', 'win_streak_10', 'games_played_100', 'level_10', 'level_20']
+
+
+def random_player(i: int, now: datetime):
+    games_played = random.randint(0, 3000)
+    return {
+        "id": f"p{i}",
+        "name": f"Jogador {i}",
+        "avatar": random.choice(AVATARS),
+        "level": random.randint(1, 60),
+        "experience": random.randint(0, 60000),
+        "gamesPlayed": games_played,
+        "gamesWon": random.randint(0, games_played),
+        "currentStreak": random.randint(0, 10),
+        "bestStreak": random.randint(0, 30),
+        "favoriteGame": random.choice(GAMES),
+        "joinDate": now - timedelta(days=random.randint(0, 1000)),
+        "lastActive": now - timedelta(seconds=random.randint(0, 10**7)),
+        "achievements": random.sample(ACHIEVEMENTS, random.randint(0, len(ACHIEVEMENTS))),
+        "rating": random.randint(800, 2400),
+    }
+
+
+def measure(storage_class, players: int):
+    random.seed(42)
+    now = datetime.now()
+    gc.collect()
+    tracemalloc.start()
+    storage = storage_class()
+    storage.deferred_indexing = True
+    for i in range(players):
+        storage.add_player(random_player(i, now))
+    gc.collect()
+    players_bytes = tracemalloc.get_traced_memory()[0]
+    storage.deferred_indexing = False
+    storage.rebuild_indexes()
+    gc.collect()
+    total_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return players_bytes, total_bytes - players_bytes
+
+
+def run(players: int):
+    results = {}
+    for storage_class in (MemoryStorage, ColumnarStorage):
+        players_bytes, index_bytes = measure(storage_class, players)
+        results[storage_class.__name__] = players_bytes
+        print(f"{storage_class.__name__:<16} jogadores: {players_bytes / players:7.0f} bytes/jogador "
+              f"({players_bytes / 1e6:.1f} MB)  índice de ranking: {index_bytes / players:5.0f} bytes/jogador")
+    print(f"redução: {results['MemoryStorage'] / results['ColumnarStorage']:.1f}x")
+
+
+if __name__ == '__main__':
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
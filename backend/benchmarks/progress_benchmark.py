@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.progress_store import ProgressStore
+
+# Uso: python benchmarks/progress_benchmark.py [registros=1000,10000,100000] [operações] [tamanho_do_lote]
+# Para cada tamanho da tabela de progresso, compara a lista anterior (varredura com
+# next() a cada leitura/gravação) com o ProgressStore indexado por (userId, gameId):
+# tempo por leitura, por gravação e para listar o progresso de um usuário.
+# Depois compara, pela API (cliente de teste do Flask), `tamanho_do_lote` POST
+# /api/progress individuais com um único POST /api/progress/bulk com as mesmas
+# atualizações.
+
+GAMES_PER_USER = 10
+
+
+def fill(records: int):
+    rows = [{"userId": user, "gameId": game, "score": 0, "level": 1, "status": "started"}
+            for user in range(1, records // GAMES_PER_USER + 1) for game in range(1, GAMES_PER_USER + 1)]
+    store = ProgressStore()
+    store.bulk_upsert(rows)
+    return [dict(row) for row in rows], store
+
+
+def list_upsert(table, update):
+    # Caminho anterior da rota POST /progress
+    row = next((p for p in table if p['userId'] == update['userId'] and p['gameId'] == update['gameId']), None)
+    if row:
+        row['score'] = update['score']
+    else:
+        table.append(dict(update))
+
+
+def timed(function, operations) -> float:
+    started = time.perf_counter()
+    for operation in operations:
+        function(operation)
+    return (time.perf_counter() - started) / len(operations) * 1e6
+
+
+def compare_lookups(records: int, operations: int):
+    table, store = fill(records)
+    users = records // GAMES_PER_USER
+    keys = [(random.randint(1, users), random.randint(1, GAMES_PER_USER)) for _ in range(operations)]
+    updates = [{"userId": user, "gameId": game, "score": random.randint(0, 1000)} for user, game in keys]
+    list_read = timed(lambda key: next(p for p in table if p['userId'] == key[0] and p['gameId'] == key[1]), keys)
+    store_read = timed(lambda key: store.get(*key), keys)
+    list_write = timed(lambda update: list_upsert(table, update), updates)
+    store_write = timed(store.upsert, updates)
+    list_user = timed(lambda key: [p for p in table if p['userId'] == key[0]], keys)
+    store_user = timed(lambda key: store.for_user(key[0]), keys)
+    assert len(store) == records
+    print(f"{records:,} registros ({operations} operações de cada):")
+    print(f"  leitura:           lista {list_read:10,.1f} µs   índice {store_read:6.2f} µs")
+    print(f"  gravação:          lista {list_write:10,.1f} µs   índice {store_write:6.2f} µs")
+    print(f"  todos do usuário:  lista {list_user:10,.1f} µs   índice {store_user:6.2f} µs")
+
+
+def compare_bulk(batch: int):
+    import api.index as api
+    from app import app
+    client = app.test_client()
+    updates = [{"userId": 1_000_000 + i // GAMES_PER_USER, "gameId": i % GAMES_PER_USER + 1, "score": i}
+               for i in range(batch)]
+
+    api.progress = ProgressStore()
+    started = time.perf_counter()
+    for update in updates:
+        assert client.post('/api/progress', json=update).status_code == 201
+    single = time.perf_counter() - started
+
+    api.progress = ProgressStore()
+    started = time.perf_counter()
+    response = client.post('/api/progress/bulk', json={"updates": updates})
+    bulk = time.perf_counter() - started
+    assert response.json['applied'] == batch
+
+    print(f"{batch:,} atualizações pela API:")
+    print(f"  POST /api/progress individuais: {single * 1000:8,.1f} ms ({single / batch * 1e6:,.0f} µs cada)")
+    print(f"  POST /api/progress/bulk:        {bulk * 1000:8,.1f} ms ({bulk / batch * 1e6:,.0f} µs cada), "
+          f"{single / bulk:.0f}x mais rápido")
+
+
+if __name__ == '__main__':
+    levels = [int(level) for level in (sys.argv[1] if len(sys.argv) > 1 else '1000,10000,100000').split(',')]
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    batch = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    random.seed(42)
+    for records in levels:
+        compare_lookups(records, operations)
+    compare_bulk(batch)
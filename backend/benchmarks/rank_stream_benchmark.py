@@ -0,0 +1,95 @@
+import os
+import random
+import resource
+import sys
+import threading
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+from services.rank_stream import RankStream
+
+# Uso: python benchmarks/rank_stream_benchmark.py [assinantes] [segundos] [resultados_por_segundo] [jogadores]
+# `assinantes` threads (uma por conexão SSE, como no servidor WSGI com threads) consomem
+# o corpo de Subscription.events() de 25 views (top-10 global, top-10 de 4 jogos e 20
+# janelas ao redor de jogadores) enquanto uma thread aplica resultados de partidas.
+# Mede quadros serializados vs entregues, a latência de entrega (publishedAt -> leitura)
+# e compara as leituras do publicador com as de clientes re-consultando a cada segundo.
+
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga']
+MARKER = b'"publishedAt":'
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0
+
+
+if __name__ == '__main__':
+    subscribers = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    rate = float(sys.argv[3]) if len(sys.argv) > 3 else 200
+    players = int(sys.argv[4]) if len(sys.argv) > 4 else 10_000
+
+    service = LeaderboardService()
+    for i in range(players):
+        service.create_player({"id": f"p{i}", "rating": random.randint(1000, 2000)})
+    stream = RankStream(service)
+    keys = [RankStream.view_key("global", limit=10)]
+    keys += [RankStream.view_key("game", game=game, limit=10) for game in GAMES]
+    keys += [RankStream.view_key("around", player_id=f"p{random.randrange(players)}", radius=5) for _ in range(20)]
+
+    delivered = [0] * subscribers
+    latencies = [[] for _ in range(subscribers)]
+    connected = threading.Barrier(subscribers + 1)
+
+    def subscriber(index: int):
+        events = stream.subscribe(keys[index % len(keys)]).events()
+        next(events)
+        connected.wait()
+        for chunk in events:
+            marker = chunk.rfind(MARKER)
+            if marker >= 0:
+                end = chunk.index(b"}", marker)
+                latencies[index].append(time.time() * 1000 - int(chunk[marker + len(MARKER):end]))
+                delivered[index] += chunk.count(b"\nevent: ")
+
+    # Pilhas pequenas: cada conexão só guarda o gerador e alguns contadores
+    threading.stack_size(256 * 1024)
+    started = time.perf_counter()
+    threads = [threading.Thread(target=subscriber, args=(i,), daemon=True) for i in range(subscribers)]
+    for thread in threads:
+        thread.start()
+    connected.wait()
+    print(f"{subscribers:,} assinantes em {len(keys)} views conectados em {time.perf_counter() - started:.1f} s; "
+          f"{rate:g} resultados/s por {seconds:g} s, {players:,} jogadores")
+
+    rng = random.Random(1)
+    writes = 0
+    cpu_before = time.process_time()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        service.update_player_after_game(f"p{rng.randrange(players)}", {
+            "gameName": rng.choice(GAMES), "won": rng.random() < 0.5, "opponentRating": rng.randint(800, 2400),
+        })
+        writes += 1
+        time.sleep(1 / rate)
+    cpu = time.process_time() - cpu_before
+    time.sleep(stream.interval * 2)
+    stats = stream.stats()
+    stream.close()
+
+    all_latencies = [latency for values in latencies for latency in values]
+    frames = sum(delivered)
+    print(f"  {writes:,} resultados; {stats['refreshes']:,} releituras de views, "
+          f"{stats['framesPublished']:,} quadros serializados, {frames:,} entregues "
+          f"({frames / max(1, stats['framesPublished']):,.0f} entregas por serialização)")
+    print(f"  latência de entrega: p50 {percentile(all_latencies, 0.5):.0f} ms, "
+          f"p99 {percentile(all_latencies, 0.99):.0f} ms depois da publicação (a coalescência soma até "
+          f"{stream.interval * 1000:.0f} ms)")
+    print(f"  leituras de ranking: {stats['refreshes'] / seconds:,.1f}/s pelo publicador vs "
+          f"{subscribers:,}/s com cada cliente re-consultando a cada segundo")
+    print(f"  CPU do processo: {cpu / seconds:.0%} de um núcleo; memória máxima "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
@@ -0,0 +1,56 @@
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ranking_index import RankingIndex
+
+# Uso: python benchmarks/ranking_benchmark.py [tamanhos...]
+# Ex.: python benchmarks/ranking_benchmark.py 10000 100000 1000000 10000000
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+OPERATIONS = 2_000
+
+
+def build_index(size: int) -> RankingIndex:
+    index = RankingIndex()
+    index.rebuild(
+        (str(i), random.randint(800, 2800), random.randint(0, 50_000)) for i in range(size)
+    )
+    return index
+
+
+def measure(operation, samples) -> float:
+    # Latência média em microssegundos
+    start = time.perf_counter()
+    for sample in samples:
+        operation(sample)
+    return (time.perf_counter() - start) / len(samples) * 1e6
+
+
+def run(size: int):
+    build_start = time.perf_counter()
+    index = build_index(size)
+    build_time = time.perf_counter() - build_start
+
+    ids = [str(random.randrange(size)) for _ in range(OPERATIONS)]
+    offsets = [random.randrange(max(1, size - 50)) for _ in range(OPERATIONS)]
+
+    top_us = measure(lambda _: index.top(50), range(OPERATIONS))
+    rank_us = measure(index.rank, ids)
+    range_us = measure(lambda offset: index.range(offset, 50), offsets)
+    update_us = measure(
+        lambda player_id: index.update(player_id, random.randint(800, 2800), random.randint(0, 50_000)),
+        ids,
+    )
+
+    print(f"{size:>11,} | {build_time:8.2f}s | {top_us:8.1f} | {rank_us:8.1f} | {range_us:9.1f} | {update_us:8.1f}")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print("  jogadores |  criação | top50 µs |  rank µs | k..k+50 µs | update µs")
+    for size in sizes:
+        run(size)
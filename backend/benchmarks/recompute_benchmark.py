@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.match_history import PLAYER_BASELINE_FIELDS, MatchHistory
+from services.rating_recompute import DEFAULT_WORKERS, recompute
+
+# Uso: python benchmarks/recompute_benchmark.py [jogadores] [partidas] [processos]
+# Histórico sintético (jogadores com atividade desigual, 9 jogos com ranking e um sem)
+# recalculado com 1 processo (vazão por núcleo) e com `processos` processos.
+
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
+
+
+def build_history(players: int, matches: int, rng) -> MatchHistory:
+    history = MatchHistory()
+    history.player_ids = [f"p{i}" for i in range(players)]
+    history.player_index = {player_id: i for i, player_id in enumerate(history.player_ids)}
+    history.game_names = GAMES + ["Unknown"]
+    history.game_index = {game: i for i, game in enumerate(history.game_names)}
+    baselines = np.zeros((players, len(PLAYER_BASELINE_FIELDS)), dtype=np.int64)
+    baselines[:, 0] = 1200
+    baselines[:, 2] = 1
+    history.baselines.frombytes(baselines.tobytes())
+
+    # Atividade ~ Zipf: poucos jogadores com milhares de partidas, a maioria com poucas
+    weights = 1 / np.arange(1, players + 1) ** 0.8
+    history.players.frombytes(rng.choice(players, matches, p=weights / weights.sum()).astype(np.intc).tobytes())
+    history.games.frombytes(rng.integers(0, len(history.game_names), matches).astype(np.intc).tobytes())
+    history.won.frombytes((rng.random(matches) < 0.5).astype(np.int8).tobytes())
+    history.game_times.frombytes(rng.integers(60, 3600, matches).astype(np.float64).tobytes())
+    history.opponent_ratings.frombytes(rng.normal(1500, 300, matches).round().tobytes())
+    history.timestamps.frombytes(np.arange(matches, dtype=np.float64).tobytes())
+    return history
+
+
+def run(history: MatchHistory, workers: int):
+    start = time.perf_counter()
+    result = recompute(history, GAMES, 32, 800, 1500, workers=workers)
+    elapsed = time.perf_counter() - start
+    rate = len(history) / elapsed
+    print(f"  {workers} processo(s): {elapsed:.2f} s, {rate / 1e6:.2f} M partidas/s "
+          f"({rate / workers / 1e6:.2f} M/s por processo), {len(result['players']):,} jogadores, "
+          f"{len(result['entries']):,} entradas por jogo")
+    return result
+
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    matches = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_WORKERS
+    history = build_history(players, matches, np.random.default_rng(3))
+    print(f"{players:,} jogadores, {matches:,} partidas")
+    single = run(history, 1)
+    if workers > 1:
+        parallel = run(history, workers)
+        order = np.argsort(parallel["players"])
+        assert np.array_equal(parallel["players"][order], single["players"])
+        assert np.array_equal(parallel["state"][order], single["state"])
+        print("  resultados idênticos com 1 e com vários processos")
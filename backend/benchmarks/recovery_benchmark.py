@@ -0,0 +1,65 @@
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+
+# Uso: python benchmarks/recovery_benchmark.py [jogadores] [eventos_na_cauda]
+# Mede o tempo de reinício: carregar o snapshot mais recente + reaplicar a cauda do log.
+# Eventos anteriores ao snapshot não são reaplicados, então o total histórico de eventos
+# não influencia o tempo de reinício; apenas o tamanho do estado e o tamanho da cauda.
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
+CHUNK = 5_000
+
+
+def random_results(players: int, count: int):
+    return [{
+        "playerId": f"p{random.randrange(players)}",
+        "gameName": random.choice(GAMES),
+        "won": random.random() < 0.5,
+        "gameTime": random.randint(120, 3600),
+        "opponentRating": random.randint(900, 2200),
+    } for _ in range(count)]
+
+
+def directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def run(players: int, tail_events: int):
+    data_dir = tempfile.mkdtemp(prefix="leaderboard-recovery-")
+    try:
+        service = LeaderboardService(data_dir=data_dir, fsync_mode="batch", snapshot_every=10**12)
+        start = time.perf_counter()
+        for i in range(players):
+            service.create_player({"id": f"p{i}", "rating": random.randint(1000, 2000)})
+        service.snapshot()
+        print(f"população: {players:,} jogadores em {time.perf_counter() - start:.1f}s "
+              f"(snapshot: {directory_size(data_dir) / 1e6:.1f} MB)")
+
+        start = time.perf_counter()
+        for offset in range(0, tail_events, CHUNK):
+            service.update_players_after_games(random_results(players, min(CHUNK, tail_events - offset)))
+        service.close()
+        elapsed = time.perf_counter() - start
+        print(f"cauda: {tail_events:,} eventos gravados em {elapsed:.1f}s ({tail_events / elapsed:,.0f} eventos/s)")
+
+        start = time.perf_counter()
+        restored = LeaderboardService(data_dir=data_dir)
+        elapsed = time.perf_counter() - start
+        restored.close()
+        print(f"reinício (snapshot + cauda): {elapsed:.2f}s")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    tail_events = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+    run(players, tail_events)
@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+
+from api.index import app as api, leaderboard_service, response_cache
+
+# Uso: python benchmarks/response_cache_benchmark.py [jogadores] [requisições] [leituras_por_escrita]
+# Simula o polling do LeaderboardScreen: clientes pedem /leaderboard/global repetidamente
+# (metade com If-None-Match) enquanto resultados de partidas chegam a cada N leituras.
+# Compara com a serialização completa a cada requisição (comportamento anterior).
+
+
+def run(players: int, requests: int, reads_per_write: int):
+    for i in range(players):
+        leaderboard_service.create_player({"id": f"bench{i}", "rating": random.randint(1000, 2000)})
+
+    app = Flask(__name__)
+    app.register_blueprint(api, url_prefix='/api')
+
+    @app.route('/uncached/global')
+    def uncached_global():
+        return jsonify(leaderboard_service.get_global_leaderboard(50)), 200
+
+    client = app.test_client()
+
+    start = time.perf_counter()
+    for i in range(requests):
+        if i % reads_per_write == 0:
+            leaderboard_service.update_player_after_game(f"bench{random.randrange(players)}", {"gameName": "Go", "won": True})
+        client.get('/uncached/global')
+    uncached = requests / (time.perf_counter() - start)
+
+    etag = None
+    start = time.perf_counter()
+    for i in range(requests):
+        if i % reads_per_write == 0:
+            leaderboard_service.update_player_after_game(f"bench{random.randrange(players)}", {"gameName": "Go", "won": True})
+        headers = {"If-None-Match": etag} if etag and i % 2 else {}
+        response = client.get('/api/leaderboard/global', headers=headers)
+        etag = response.headers["ETag"]
+    cached = requests / (time.perf_counter() - start)
+
+    stats = response_cache.stats()
+    print(f"sem cache: {uncached:,.0f} req/s")
+    print(f"com cache: {cached:,.0f} req/s ({cached / uncached:.1f}x)")
+    print(f"taxa de acerto: {stats['hitRate']:.1%}, respostas 304: {stats['notModified']:,}, "
+          f"bytes servidos do cache: {stats['bytesServedFromCache'] / 1e6:.1f} MB, "
+          f"bytes não enviados: {stats['bytesNotSent'] / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    players = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    reads_per_write = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    run(players, requests, reads_per_write)
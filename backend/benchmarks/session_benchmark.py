@@ -0,0 +1,107 @@
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.session_store import SessionStore, read_archive
+
+# Uso: python benchmarks/session_benchmark.py [sessões_por_dia=1000000] [usuários=100000]
+# Simula um dia de sessões com relógio acelerado: as sessões começam em instantes
+# uniformes ao longo de 24 h, recebem algumas consultas e 80% são finalizadas (as demais
+# são abandonadas e expiram por inatividade). Compara a lista anterior (busca por
+# varredura com next(), nada é removido) com o SessionStore (TTLs padrão, timer wheel
+# e arquivo das sessões que saem): sessões em memória, memória e tempo por consulta.
+# A lista só é simulada até LIST_LIMIT sessões (a busca linear não terminaria o dia) e a
+# memória dela no fim do dia é estimada proporcionalmente. A memória do SessionStore é
+# medida (tracemalloc) recriando o pico de sessões num store novo, fora da simulação.
+
+DAY = 24 * 60 * 60
+LIST_LIMIT = 100000
+LOOKUPS = 200
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def lookup_us(find, ids) -> float:
+    sample = random.sample(ids, min(LOOKUPS, len(ids)))
+    started = time.perf_counter()
+    for session_id in sample:
+        find(session_id)
+    return (time.perf_counter() - started) / len(sample) * 1e6
+
+
+def run_list(sessions: int, users: int):
+    # Caminho anterior de api/index.py
+    game_sessions = []
+    tracemalloc.start()
+    for _ in range(min(sessions, LIST_LIMIT)):
+        game_sessions.append({"id": len(game_sessions) + 1, "userId": random.randint(1, users), "gameId": 1,
+                              "mode": "pvp", "startTime": "2025-01-01T00:00:00Z", "status": "active"})
+    memory = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    ids = [session["id"] for session in game_sessions]
+    latency = lookup_us(lambda session_id: next((s for s in game_sessions if s['id'] == session_id), None), ids)
+    print(f"  lista: {len(game_sessions):,} sessões em memória ({memory:,.1f} MB), consulta {latency:,.1f} µs; "
+          f"no fim do dia: {sessions:,} sessões (~{memory * sessions / len(game_sessions):,.0f} MB)")
+
+
+def store_memory(count: int, users: int) -> float:
+    store = SessionStore(clock=FakeClock())
+    tracemalloc.start()
+    for _ in range(count):
+        store.create(random.randint(1, users), 1, "pvp")
+    memory = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    return memory
+
+
+def run_store(sessions: int, users: int):
+    clock = FakeClock()
+    archive = tempfile.mkdtemp()
+    store = SessionStore(archive_dir=archive, clock=clock)
+    starts = sorted(random.uniform(0, DAY) for _ in range(sessions))
+    pending = []  # (instante, ID, finaliza?)
+    peak_sessions = 0
+    latencies = []
+    started = time.perf_counter()
+    for number, start in enumerate(starts, 1):
+        clock.now = start
+        while pending and pending[0][0] <= start:
+            _, session_id, finish = heapq.heappop(pending)
+            store.get(session_id)
+            if finish:
+                store.end(session_id)
+        session = store.create(random.randint(1, users), 1, "pvp")
+        heapq.heappush(pending, (start + random.uniform(60, 900), session["id"], random.random() < 0.8))
+        if number % (sessions // 24 or 1) == 0:
+            peak_sessions = max(peak_sessions, len(store))
+            latencies.append(lookup_us(store.get, list(store.by_id)))
+    elapsed = time.perf_counter() - started
+    store.close()
+    archived = sum(1 for _ in read_archive(archive))
+    stats = store.stats()
+    print(f"  SessionStore: pico de {peak_sessions:,} sessões em memória ({store_memory(peak_sessions, users):,.1f} MB), "
+          f"consulta {min(latencies):.2f}-{max(latencies):.2f} µs ao longo do dia")
+    print(f"                {sessions / elapsed:,.0f} criações/s simuladas, {stats['expired']:,} expiradas, "
+          f"{stats['evicted']:,} removidas pelo limite, {archived:,} no arquivo")
+
+
+if __name__ == '__main__':
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    users = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    random.seed(42)
+    print(f"{sessions:,} sessões em 24 h ({sessions / DAY:,.1f}/s), {users:,} usuários:")
+    run_list(sessions, users)
+    run_store(sessions, users)
@@ -0,0 +1,110 @@
+import multiprocessing
+import os
+import random
+import sys
+import time
+from typing import Tuple
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+from services.shared_memory_storage import SharedMemoryStorage
+
+# Uso: python benchmarks/shared_memory_benchmark.py [processos] [segundos] [jogadores] [fração_de_escritas]
+# Simula workers de um servidor WSGI pré-carregado (fork depois de montar o serviço, como
+# gunicorn --preload) sobre um único SharedMemoryStorage: cada processo faz requisições
+# (ranking global, ranking por jogo, ao redor de um jogador, perfil e, na fração pedida,
+# resultados de partidas) pelo tempo dado. Mede a vazão com 1, 2, 4... processos até
+# `processos` e confere que nenhum resultado gravado por um processo se perde.
+# Leituras seguram o lock compartilhado e rodam em paralelo; só as escritas se serializam.
+# A fração do tempo gasta em escritas com 1 processo dá o limite de Amdahl da aceleração
+# (útil quando a máquina tem menos núcleos que processos e a medição não pode mostrá-la).
+
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga']
+
+
+def worker(service: LeaderboardService, seed: int, seconds: float, players: int, write_fraction: float,
+           start, results):
+    service.storage.after_fork()
+    rng = random.Random(seed)
+    reads = writes = 0
+    write_seconds = 0.0
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        player_id = f"p{rng.randrange(players)}"
+        if rng.random() < write_fraction:
+            started = time.perf_counter()
+            service.update_player_after_game(player_id, {
+                "gameName": rng.choice(GAMES), "won": rng.random() < 0.5,
+                "gameTime": rng.randint(60, 3000), "opponentRating": rng.randint(800, 2400),
+            })
+            write_seconds += time.perf_counter() - started
+            writes += 1
+            continue
+        request = rng.randrange(4)
+        if request == 0:
+            service.get_global_leaderboard(limit=50)
+        elif request == 1:
+            service.get_game_leaderboard(rng.choice(GAMES), limit=20)
+        elif request == 2:
+            service.get_global_leaderboard(around=player_id, radius=5)
+        else:
+            service.get_player_stats(player_id)
+        reads += 1
+    results.put((reads, writes, write_seconds))
+
+
+def run(service: LeaderboardService, processes: int, seconds: float, players: int,
+        write_fraction: float) -> Tuple[float, float]:
+    context = multiprocessing.get_context("fork")
+    start = context.Event()
+    results = context.Queue()
+    before = sum(player["gamesPlayed"] for player in service.storage.iter_players())
+    workers = [context.Process(target=worker, args=(service, seed, seconds, players, write_fraction, start, results))
+               for seed in range(processes)]
+    for process in workers:
+        process.start()
+    start.set()
+    counts = [results.get() for _ in workers]
+    for process in workers:
+        process.join()
+
+    reads = sum(count[0] for count in counts)
+    writes = sum(count[1] for count in counts)
+    serial = sum(count[2] for count in counts) / (seconds * processes)
+    applied = sum(player["gamesPlayed"] for player in service.storage.iter_players()) - before
+    assert applied == writes, (applied, writes)
+    rate = (reads + writes) / seconds
+    print(f"  {processes} processo(s): {rate:,.0f} requisições/s ({rate / processes:,.0f} por processo), "
+          f"{writes:,} escritas, nenhuma perdida")
+    return rate, serial
+
+
+if __name__ == '__main__':
+    max_processes = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    players = int(sys.argv[3]) if len(sys.argv) > 3 else 50_000
+    write_fraction = float(sys.argv[4]) if len(sys.argv) > 4 else 0.05
+
+    storage = SharedMemoryStorage(f"odyssey-benchmark-{os.getpid()}", capacity=players + 16)
+    try:
+        service = LeaderboardService(storage=storage)
+        for i in range(players):
+            service.create_player({"id": f"p{i}", "rating": random.randint(1000, 2000)})
+        print(f"{players:,} jogadores, {write_fraction:.0%} de escritas, {seconds:g} s por medição, "
+              f"{os.cpu_count()} núcleo(s)")
+        baseline = serial = None
+        for processes in sorted({1 << i for i in range(max_processes.bit_length())} | {max_processes}):
+            rate, fraction = run(service, processes, seconds, players, write_fraction)
+            if baseline is None:
+                baseline, serial = rate, fraction
+                print(f"    fração serial (escritas): {serial:.1%}")
+                continue
+            bound = 1 / (serial + (1 - serial) / processes)
+            print(f"    aceleração: {rate / baseline:.2f}x medida, {bound:.2f}x pelo limite de Amdahl "
+                  f"com {processes} núcleos livres")
+        service.close()
+    finally:
+        storage.destroy()
@@ -0,0 +1,68 @@
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+from services.sqlite_storage import SQLiteStorage
+
+# Uso: python benchmarks/storage_benchmark.py [tamanhos...]
+# Compara o armazenamento em memória com o SQLite nas consultas do leaderboard
+DEFAULT_SIZES = [10_000, 100_000]
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
+REPEATS = 200
+
+
+def populate(service: LeaderboardService, size: int):
+    now = datetime.now()
+    with service.storage.transaction():
+        for i in range(size):
+            experience = random.randint(0, 30_000)
+            service.create_player({
+                "id": f"p{i}",
+                "rating": random.randint(800, 2600),
+                "experience": experience,
+                "level": experience // 1000 + 1,
+                "lastActive": now - timedelta(days=random.randint(0, 30)),
+            })
+        for _ in range(size):
+            service.update_player_after_game(f"p{random.randrange(size)}", {
+                "gameName": random.choice(GAMES),
+                "won": random.random() < 0.5,
+            })
+
+
+def measure(operation) -> float:
+    # Latência média em milissegundos
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        operation()
+    return (time.perf_counter() - start) / REPEATS * 1e3
+
+
+def run(name: str, service: LeaderboardService, size: int):
+    populate(service, size)
+    ids = [f"p{random.randrange(size)}" for _ in range(REPEATS)]
+    global_ms = measure(lambda: service.get_global_leaderboard(50))
+    stats_ms = measure(lambda: service.get_player_stats(random.choice(ids)))
+    platform_ms = measure(service.get_platform_stats)
+    update_ms = measure(lambda: service.update_player_after_game(
+        random.choice(ids), {"gameName": random.choice(GAMES), "won": random.random() < 0.5}
+    ))
+    print(f"{name:>8} | {size:>9,} | {global_ms:9.3f} | {stats_ms:9.3f} | {platform_ms:9.3f} | {update_ms:9.3f}")
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    print(" backend | jogadores | global ms |  stats ms | platf. ms | update ms")
+    for size in sizes:
+        run("memória", LeaderboardService(), size)
+        with tempfile.TemporaryDirectory() as directory:
+            service = LeaderboardService(storage=SQLiteStorage(os.path.join(directory, "leaderboard.db")))
+            run("sqlite", service, size)
+            service.close()
@@ -0,0 +1,73 @@
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+
+# Uso: python benchmarks/tournament_registration_benchmark.py [inscrições] [vagas] [threads]
+# 1) Estresse: todas as inscrições (com 10% de pedidos repetidos) disparadas de várias
+#    threads contra um torneio com `vagas` lugares; nenhum torneio pode passar do limite
+#    nem ter inscrito duplicado.
+# 2) Escala: custo por inscrição à medida que o torneio cresce (deve ficar constante).
+
+
+def stress(service: LeaderboardService, player_ids, max_players: int, threads: int):
+    tournament = service.create_tournament({"name": "Estresse", "game": "Go", "maxPlayers": max_players})
+    requests = player_ids + random.sample(player_ids, len(player_ids) // 10)
+    random.shuffle(requests)
+
+    def register(player_id):
+        try:
+            service.register_player_in_tournament(tournament["id"], player_id)
+            return "ok"
+        except ValueError as e:
+            return str(e)
+
+    # Troca de thread bem mais frequente que o padrão, para expor corridas
+    sys.setswitchinterval(1e-5)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        outcomes = list(pool.map(register, requests, chunksize=64))
+    elapsed = time.perf_counter() - start
+    sys.setswitchinterval(0.005)
+
+    participants = [p["playerId"] for p in tournament["participants"]]
+    accepted = outcomes.count("ok")
+    print(f"{len(requests):,} pedidos em {threads} threads: {elapsed:.2f} s ({len(requests) / elapsed:,.0f}/s)")
+    print(f"  aceitos {accepted:,}, lotado {outcomes.count('Torneio lotado'):,}, "
+          f"duplicados {outcomes.count('Jogador já inscrito'):,}")
+    print(f"  inscritos {len(participants):,} / {max_players:,} vagas, distintos {len(set(participants)):,}")
+    assert accepted == len(participants) == min(max_players, len(player_ids))
+    assert len(set(participants)) == len(participants)
+    print("  OK: sem estouro de vagas nem duplicidade")
+
+
+def scaling(service: LeaderboardService, player_ids, step: int):
+    tournament = service.create_tournament({"name": "Escala", "game": "Go", "maxPlayers": len(player_ids)})
+    print("custo por inscrição conforme o torneio cresce:")
+    for start in range(0, len(player_ids), step):
+        block = player_ids[start:start + step]
+        t0 = time.perf_counter()
+        for player_id in block:
+            service.register_player_in_tournament(tournament["id"], player_id)
+        per_registration = (time.perf_counter() - t0) / len(block)
+        print(f"  {start:>9,} → {start + len(block):>9,} inscritos: {per_registration * 1e6:6.1f} µs")
+
+
+if __name__ == '__main__':
+    registrations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_players = int(sys.argv[2]) if len(sys.argv) > 2 else registrations // 2
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+
+    service = LeaderboardService()
+    player_ids = [f"bench{i}" for i in range(registrations)]
+    for player_id in player_ids:
+        service.create_player({"id": player_id, "name": player_id})
+
+    stress(service, player_ids, max_players, threads)
+    scaling(service, player_ids, max(1, registrations // 5))
@@ -0,0 +1,62 @@
+import os
+import random
+import sys
+import threading
+import time
+
+# Adicionar o diretório pai ao path para importar services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.leaderboard_service import LeaderboardService
+
+# Uso: python benchmarks/write_pipeline_benchmark.py [threads] [resultados_por_thread] [jogadores] [shards]
+# `threads` threads de requisição enviam resultados de partidas, um por vez, como o
+# servidor WSGI faria: (1) cada uma aplica o seu com update_player_after_game (escrita
+# exclusiva por resultado); (2) cada uma enfileira no pipeline e espera o Future.
+# Confere que nenhum incremento de gamesPlayed se perde.
+
+GAMES = ['Senet', 'Go', 'Mancala', 'Chaturanga']
+
+
+def run(label: str, service: LeaderboardService, threads: int, per_thread: int, players: int, queued: bool):
+    before = sum(player["gamesPlayed"] for player in service.storage.iter_players())
+
+    def client(seed: int):
+        rng = random.Random(seed)
+        for _ in range(per_thread):
+            player_id = f"p{rng.randrange(players)}"
+            result = {"gameName": rng.choice(GAMES), "won": rng.random() < 0.5,
+                      "gameTime": rng.randint(60, 3000), "opponentRating": rng.randint(800, 2400)}
+            if queued:
+                service.submit_game_result(player_id, result).result()
+            else:
+                service.update_player_after_game(player_id, result)
+
+    workers = [threading.Thread(target=client, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    total = threads * per_thread
+    applied = sum(player["gamesPlayed"] for player in service.storage.iter_players()) - before
+    assert applied == total, (applied, total)
+    print(f"  {label}: {total / elapsed:,.0f} resultados/s ({elapsed:.2f} s), nenhum incremento perdido")
+
+
+if __name__ == '__main__':
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    players = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+    shards = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count() or 1
+
+    service = LeaderboardService(write_shards=shards)
+    for i in range(players):
+        service.create_player({"id": f"p{i}"})
+    print(f"{threads} threads x {per_thread} resultados, {players:,} jogadores, {shards} shard(s)")
+    run("escrita direta por requisição", service, threads, per_thread, players, queued=False)
+    run("fila por jogador + micro-lotes", service, threads, per_thread, players, queued=True)
+    print(f"  pipeline: {service.writes.stats()}")
+    service.close()
@@ -0,0 +1,80 @@
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+# Backfill de uma conquista sobre toda a população de jogadores, sem bloquear a API.
+# A thread do job varre a população em trechos (regra contra o perfil e as entradas por
+# jogo), cada trecho com o lock de leitura do serviço, e concede os candidatos em
+# subtrechos pequenos (cada um um evento no log), cedendo a vez às requisições entre eles.
+# Não há processos filhos: um fork do processo da API herdaria locks tomados pelas
+# outras threads (fila de escrita, matchmaking, stream de ranking, pool de hash).
+
+DEFAULT_CHUNK_SIZE = 5_000
+DEFAULT_APPLY_CHUNK_SIZE = 1_000
+
+
+class BackfillJob:
+    def __init__(self, service, achievement_id: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 apply_chunk_size: int = DEFAULT_APPLY_CHUNK_SIZE):
+        self.id = uuid.uuid4().hex[:12]
+        self.service = service
+        self.achievement_id = achievement_id
+        self.chunk_size = chunk_size
+        self.apply_chunk_size = apply_chunk_size
+
+        self.status = "pending"
+        self.total = 0
+        self.scanned = 0
+        self.granted = 0
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self._thread = threading.Thread(target=self._run, name=f"achievement-backfill-{self.id}", daemon=True)
+
+    def start(self) -> "BackfillJob":
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def running(self) -> bool:
+        return self.status in ("pending", "running")
+
+    def _run(self):
+        self.status = "running"
+        self.started_at = datetime.now()
+        try:
+            player_ids = self.service.storage.player_ids()
+            self.total = len(player_ids)
+            for offset in range(0, len(player_ids), self.chunk_size):
+                scanned = player_ids[offset:offset + self.chunk_size]
+                candidates = self.service.achievement_candidates(self.achievement_id, scanned)
+                time.sleep(0)
+                for start in range(0, len(candidates), self.apply_chunk_size):
+                    self.granted += self.service.grant_achievement(
+                        self.achievement_id, candidates[start:start + self.apply_chunk_size])
+                    time.sleep(0)  # cede o GIL às requisições entre subtrechos
+                self.scanned += len(scanned)
+            self.status = "completed"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+        finally:
+            self.finished_at = datetime.now()
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "achievementId": self.achievement_id,
+            "status": self.status,
+            "totalPlayers": self.total,
+            "scannedPlayers": self.scanned,
+            "grantedPlayers": self.granted,
+            "progress": self.scanned / self.total if self.total else (1.0 if self.status == "completed" else 0.0),
+            "error": self.error,
+            "startedAt": self.started_at.isoformat() if self.started_at else None,
+            "finishedAt": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,184 @@
+import asyncio
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+# Servidor HTTP/1.1 mínimo para aplicações ASGI, só com asyncio (sem dependências).
+# Cada conexão é uma corrotina: conexões ociosas ou de longa duração (keep-alive,
+# long-poll, text/event-stream) custam alguns KB, não uma thread. Suporta keep-alive,
+# corpos com Content-Length e respostas em partes (chunked) quando a aplicação não
+# informa o tamanho. Qualquer servidor ASGI (uvicorn, hypercorn) serve a mesma aplicação.
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 16 * 1024 * 1024
+READ_CHUNK = 64 * 1024
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int):
+        self.status = status
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, List[Tuple[bytes, bytes]], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+        raise _BadRequest(400)
+    method, target, version = parts
+    headers = []
+    size = len(line)
+    while True:
+        line = await reader.readline()
+        size += len(line)
+        if size > MAX_HEADER_BYTES:
+            raise _BadRequest(431)
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        headers.append((name.strip().lower(), value.strip()))
+    fields = dict(headers)
+    if b"chunked" in fields.get(b"transfer-encoding", b"").lower():
+        raise _BadRequest(411)
+    try:
+        length = int(fields.get(b"content-length", 0))
+    except ValueError:
+        raise _BadRequest(400)
+    if length > MAX_BODY_BYTES:
+        raise _BadRequest(413)
+    body = await reader.readexactly(length) if length else b""
+    return method, target, version, headers, body
+
+
+def _status_line(status: int) -> bytes:
+    try:
+        phrase = HTTPStatus(status).phrase
+    except ValueError:
+        phrase = ""
+    return f"HTTP/1.1 {status} {phrase}\r\n".encode("latin-1")
+
+
+async def _handle(app, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    server = writer.get_extra_info("sockname")
+    client = writer.get_extra_info("peername")
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except _BadRequest as e:
+                writer.write(_status_line(e.status) + b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+                await writer.drain()
+                return
+            if request is None:
+                return
+            method, target, version, headers, body = request
+            path, _, query = target.partition("?")
+            connection = dict(headers).get(b"connection", b"").lower()
+            keep_alive = connection != b"close" if version == "HTTP/1.1" else connection == b"keep-alive"
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0", "spec_version": "2.3"},
+                "http_version": version[5:],
+                "method": method,
+                "scheme": "http",
+                "path": unquote(path),
+                "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"),
+                "root_path": "",
+                "headers": headers,
+                "client": client[:2] if client else None,
+                "server": server[:2] if server else None,
+            }
+            state: Dict = {"received": False, "started": False, "chunked": False, "finished": False}
+
+            async def receive() -> Dict:
+                if not state["received"]:
+                    state["received"] = True
+                    return {"type": "http.request", "body": body, "more_body": False}
+                # Depois do corpo, só resta esperar o cliente fechar a conexão
+                while await reader.read(READ_CHUNK):
+                    pass
+                return {"type": "http.disconnect"}
+
+            async def send(message: Dict):
+                if message["type"] == "http.response.start":
+                    names = {name.lower() for name, _ in message.get("headers", [])}
+                    state["started"] = True
+                    state["chunked"] = b"content-length" not in names
+                    head = [_status_line(message["status"])]
+                    head += [name + b": " + value + b"\r\n" for name, value in message.get("headers", [])]
+                    if state["chunked"]:
+                        head.append(b"Transfer-Encoding: chunked\r\n")
+                    if not keep_alive:
+                        head.append(b"Connection: close\r\n")
+                    writer.write(b"".join(head) + b"\r\n")
+                elif message["type"] == "http.response.body":
+                    data = message.get("body", b"")
+                    more = message.get("more_body", False)
+                    if state["chunked"]:
+                        if data:
+                            writer.write(b"%x\r\n%b\r\n" % (len(data), data))
+                        if not more:
+                            writer.write(b"0\r\n\r\n")
+                    elif data:
+                        writer.write(data)
+                    state["finished"] = not more
+                    await writer.drain()
+
+            try:
+                await app(scope, receive, send)
+            except Exception:
+                if not state["started"]:
+                    writer.write(_status_line(500) + b"Content-Length: 0\r\nConnection: close\r\n\r\n")
+                    await writer.drain()
+                return
+            if not state["finished"] or not keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+class _Lifespan:
+    # Protocolo lifespan do ASGI (uma chamada da aplicação para startup e shutdown);
+    # aplicações que não o tratam são ignoradas
+    def __init__(self, app):
+        self.app = app
+        self.messages = asyncio.Queue()
+        self.replies = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        try:
+            await self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, self.messages.get, self.replies.put)
+        except Exception:
+            pass
+
+    async def event(self, name: str):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self._run())
+        if self.task.done():
+            return
+        await self.messages.put({"type": f"lifespan.{name}"})
+        reply = asyncio.ensure_future(self.replies.get())
+        await asyncio.wait({reply, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        if not reply.done():
+            reply.cancel()
+        elif reply.result()["type"].endswith(".failed"):
+            raise RuntimeError(reply.result().get("message", f"Falha no lifespan.{name}"))
+
+
+async def serve(app, host: str, port: int, backlog: int = 4096, ready: Optional[asyncio.Event] = None):
+    lifespan = _Lifespan(app)
+    await lifespan.event("startup")
+    server = await asyncio.start_server(lambda r, w: _handle(app, r, w), host, port,
+                                        backlog=backlog, limit=MAX_HEADER_BYTES)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await lifespan.event("shutdown")
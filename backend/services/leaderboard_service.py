@@ -1,18 +1,296 @@
+import functools
+import gc
+import math
+import os
+import pickle
 import random
+import threading
 import time
+import uuid
+from concurrent.futures import Future
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from services.achievement_backfill import BackfillJob
+from services.achievements import AchievementEngine, player_counters
+from services.activity_tracker import ActivityTracker
+from services import brackets
+from services.event_store import (
+    FSYNC_BATCH, EventLog, GameResultCodec, list_segments, load_latest_snapshot, read_segment,
+    remove_before, segment_path, write_snapshot,
+)
+from services.glicko2 import Glicko2Ratings
+from services.match_history import MatchHistory
+from services.matchmaking import Matchmaker
+from services.platform_aggregates import PlatformAggregates, StoredAggregates
+from services.rating_batch import elo_changes, expected_score, experience_gains, occurrence_waves
+from services.rating_recompute import DEFAULT_WORKERS, recompute
+from services.seasons import SeasonTracker, season_id_for
+from services.storage import MemoryStorage
+from services.tournament_scheduler import START, TournamentScheduler
+from services.write_pipeline import DEFAULT_SHARDS, ReadWriteLock, WritePipeline
+
+K_FACTOR = 32  # Fator K para mudança de rating
+MIN_RATING = 800
+INITIAL_GAME_RATING = 1500
+INITIAL_RATING = 1200
+MAX_GAME_TIME = 24 * 60 * 60  # segundos
+MAX_OPPONENT_RATING = 5000
+# Partidas mantidas no histórico de recálculo (~33 bytes cada) antes de compactar
+DEFAULT_HISTORY_LIMIT = 2_000_000
+
+# Tipos de evento do log de mutações
+EVENT_PLAYER_CREATED = 1
+EVENT_GAME_RESULT = 2
+EVENT_TOURNAMENT_CREATED = 3
+EVENT_TOURNAMENT_REGISTRATION = 4
+EVENT_ACHIEVEMENTS_GRANTED = 5
+EVENT_TOURNAMENT_STARTED = 6
+EVENT_TOURNAMENT_MATCH_RESULT = 7
+EVENT_TOURNAMENT_STATUS = 8
+EVENT_RATING_PERIOD_CLOSED = 9
+
+
+def _reads(method):
+    # Leitura de um estado consistente: nenhum lote de escrita pela metade
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.state_lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _writes(method):
+    # Escrita exclusiva; o registro no log e a aplicação acontecem na mesma ordem
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.state_lock.write():
+            return method(self, *args, **kwargs)
+    return locked
+
 
 class LeaderboardService:
-    def __init__(self):
-        # Simulação de banco de dados em memória
-        self.players: Dict[str, Dict] = {}
-        self.game_stats: Dict[str, Dict] = {}
+    def __init__(self, data_dir: Optional[str] = None, fsync_mode: str = FSYNC_BATCH,
+                 snapshot_every: int = 100_000, storage=None, glicko2: bool = False,
+                 write_shards: int = DEFAULT_SHARDS, history_limit: int = DEFAULT_HISTORY_LIMIT):
+        # Jogadores, estatísticas por jogo e índices de ranking ficam no backend de armazenamento
+        # (MemoryStorage por padrão; SQLiteStorage para consultas indexadas em disco;
+        # SharedMemoryStorage para vários processos servirem o mesmo leaderboard)
+        self.storage = storage if storage is not None else MemoryStorage()
         self.tournaments: Dict[str, Dict] = {}
-        self.seasonal_rankings: Dict[str, Dict] = {}
-        
-        # Inicializar dados de exemplo
-        self.initialize_example_data()
+        # Por torneio: ids dos inscritos (duplicidade em O(1)); reconstruídos a partir de
+        # self.tournaments. As mutações de torneios, como as demais, têm o lock de escrita
+        self.tournament_members: Dict[str, set] = {}
+        # Prazos (startDate/endDate) e índice por status: inscrição → ativo → encerrado
+        self.scheduler = TournamentScheduler()
+        # Filas de matchmaking (efêmeras: não passam pelo log de eventos)
+        self.matchmaker = Matchmaker()
+        # Glicko-2 opcional (rating, desvio e volatilidade global e por jogo), em períodos
+        # diários processados em lote; os rankings continuam pelo ELO
+        self.glicko = Glicko2Ratings() if glicko2 else None
+        # Histórico de partidas para recalcular ratings com outras regras (rating_recompute).
+        # Só com o armazenamento em memória, onde o snapshot o persiste: nos backends
+        # duráveis ele recomeçaria vazio a cada processo. Acima de history_limit partidas,
+        # as mais antigas são incorporadas ao ponto de partida (_compact_history)
+        self.history = MatchHistory() if not self.storage.durable else None
+        self.history_limit = history_limit
+        # Temporadas mensais; as encerradas ficam em arquivos em data_dir/seasons
+        self.seasons = SeasonTracker(os.path.join(data_dir, "seasons") if data_dir else None)
+
+        # Agregados de /platform/stats mantidos em O(1) por mutação; com armazenamento
+        # compartilhado entre processos, lidos dele (as escritas dos outros processos contam)
+        self.aggregates = StoredAggregates(self.storage) if self.storage.shared else PlatformAggregates()
+        # Usuários ativos distintos por dia (HyperLogLog), para DAU/WAU/MAU e por jogo
+        self.activity = ActivityTracker()
+        # Regras de conquistas compiladas; avaliadas só para os contadores alterados
+        self.achievements = AchievementEngine()
+        self.backfill_jobs: Dict[str, BackfillJob] = {}
+        # Versão monotônica por ranking ("global", "seasonal", "platform", "game:<nome>"),
+        # incrementada a cada mutação que pode mudar a resposta correspondente
+        self.ranking_versions: Dict[str, int] = {}
+        # Leituras compartilham o estado; lotes de escrita o têm com exclusividade.
+        # Resultados de partidas das requisições passam pela fila de escrita por jogador
+        self.state_lock = ReadWriteLock()
+        self.writes = WritePipeline(self._apply_write_batch, shards=write_shards)
+
+        # Persistência opcional: log de eventos + snapshots periódicos em data_dir
+        self.data_dir = data_dir
+        self.snapshot_every = snapshot_every
+        self.event_log: Optional[EventLog] = None
+        self._events_since_snapshot = 0
+
+        if data_dir:
+            if self.storage.durable:
+                raise ValueError("O log de eventos é usado apenas com o armazenamento em memória")
+            self._open_storage(fsync_mode)
+        else:
+            # Vários processos podem abrir o mesmo armazenamento ao mesmo tempo: dentro da
+            # transação, só o primeiro encontra o armazenamento vazio e gera os dados de exemplo
+            with self.storage.transaction():
+                populated = not self.storage.is_empty()
+                if not populated:
+                    self.initialize_example_data()
+            if populated:
+                # Backend durável já populado: agregados recalculados uma vez a partir do banco
+                self.aggregates.rebuild(self.storage)
+
+    # ===== PERSISTÊNCIA =====
+
+    def _open_storage(self, fsync_mode: str):
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        # A recuperação cria milhões de objetos de uma vez; o coletor cíclico só
+        # reexaminaria o heap recém-carregado, então fica pausado até o fim
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._recover(fsync_mode)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _recover(self, fsync_mode: str):
+        # Carregar o snapshot mais recente e reaplicar apenas a cauda do log.
+        # Durante a recuperação os índices não são mantidos evento a evento;
+        # são reconstruídos em lote uma única vez ao final
+        snapshot_segment, state = load_latest_snapshot(self.data_dir)
+        segments = list_segments(self.data_dir, snapshot_segment or 0)
+        self.storage.deferred_indexing = True
+        try:
+            if state is not None:
+                self._restore_state(state)
+            elif not segments:
+                self.initialize_example_data()
+
+            for segment in segments:
+                for event_type, payload in read_segment(segment_path(self.data_dir, segment)):
+                    self._apply_event(event_type, payload)
+        finally:
+            self.storage.deferred_indexing = False
+        self.storage.rebuild_indexes()
+        self._compact_history()
+
+        next_segment = segments[-1] + 1 if segments else (snapshot_segment or 0)
+        self.event_log = EventLog(self.data_dir, next_segment, fsync_mode=fsync_mode)
+        if state is None and not segments:
+            # Primeira execução: fixar os dados de exemplo gerados aleatoriamente
+            self.snapshot()
+
+    def snapshot(self):
+        # Com o lock de escrita: nenhuma mutação entre a rotação do log e a exportação do
+        # estado (ela entraria no snapshot e no segmento novo, e seria reaplicada)
+        with self.state_lock.write():
+            self._snapshot()
+
+    def _snapshot(self):
+        if self.event_log is None:
+            return
+        segment = self.event_log.rotate()
+        write_snapshot(self.data_dir, segment, self._export_state())
+        remove_before(self.data_dir, segment)
+        self._events_since_snapshot = 0
+
+    def close(self):
+        self.writes.close()
+        if self.event_log is not None:
+            self.event_log.close()
+            self.event_log = None
+        self.storage.close()
+
+    def _export_state(self) -> Dict:
+        return {
+            "storage": self.storage.export_state(),
+            "tournaments": self.tournaments,
+            "seasons": self.seasons.export_state(),
+            "activity": self.activity.export_state(),
+            "glicko": self.glicko.export_state() if self.glicko is not None else None,
+            "history": self.history.export_state(),
+        }
+
+    def _restore_state(self, state: Dict):
+        self.storage.import_state(state["storage"])
+        self.tournaments = state["tournaments"]
+        self._index_tournaments()
+        if "seasons" in state:
+            self.seasons.import_state(state["seasons"])
+        if "activity" in state:
+            self.activity.import_state(state["activity"])
+        if self.glicko is not None and state.get("glicko") is not None:
+            self.glicko.import_state(state["glicko"])
+        if "history" in state:
+            self.history.import_state(state["history"])
+        else:
+            # Snapshot anterior ao histórico de partidas: o histórico começa aqui
+            self.history.start_from(self.storage)
+        self.aggregates.rebuild(self.storage)
+
+    def _record(self, event_type: int, payload: bytes):
+        if self.event_log is not None:
+            self.event_log.append(event_type, payload)
+            self._events_since_snapshot += 1
+
+    def _maybe_snapshot(self):
+        # Chamado pelas mutações, já com o lock de escrita
+        self._compact_history()
+        if self.event_log is not None and self._events_since_snapshot >= self.snapshot_every:
+            self._snapshot()
+
+    def _apply_event(self, event_type: int, payload: bytes):
+        if event_type == EVENT_GAME_RESULT:
+            player_id, game_name, won, game_time, opponent_rating, timestamp = GameResultCodec.decode(payload)
+            game_result = {"gameName": game_name, "won": won, "gameTime": game_time, "opponentRating": opponent_rating}
+            self._apply_game_result(player_id, game_result, datetime.fromtimestamp(timestamp))
+        elif event_type == EVENT_PLAYER_CREATED:
+            self._apply_player_created(pickle.loads(payload))
+        elif event_type == EVENT_TOURNAMENT_CREATED:
+            self._apply_tournament_created(pickle.loads(payload))
+        elif event_type == EVENT_TOURNAMENT_REGISTRATION:
+            self._apply_tournament_registration(*pickle.loads(payload))
+        elif event_type == EVENT_ACHIEVEMENTS_GRANTED:
+            self._apply_achievements_granted(*pickle.loads(payload))
+        elif event_type == EVENT_TOURNAMENT_STARTED:
+            self._apply_tournament_started(*pickle.loads(payload))
+        elif event_type == EVENT_TOURNAMENT_MATCH_RESULT:
+            self._apply_tournament_match_result(*pickle.loads(payload))
+        elif event_type == EVENT_TOURNAMENT_STATUS:
+            self._apply_tournament_status(*pickle.loads(payload))
+        elif event_type == EVENT_RATING_PERIOD_CLOSED:
+            self._apply_rating_period_closed(datetime.fromtimestamp(pickle.loads(payload)))
+
+    @staticmethod
+    def _normalize_game_result(game_result: Dict) -> Dict:
+        # Valida e converte uma única vez, antes de gravar: o log recebe exatamente o que é
+        # aplicado (e reaplicado na recuperação). ValueError para resultados inválidos
+        if not isinstance(game_result, dict) or not game_result.get("gameName") or "won" not in game_result:
+            raise ValueError("Dados obrigatórios: gameName e won")
+        try:
+            game_time = float(game_result.get("gameTime", 900))  # 15 minutos padrão
+            opponent_rating = float(game_result.get("opponentRating", 1500))
+        except (TypeError, ValueError):
+            raise ValueError("gameTime e opponentRating devem ser números")
+        if not math.isfinite(game_time) or not math.isfinite(opponent_rating):
+            raise ValueError("gameTime e opponentRating devem ser números")
+        # Faixas plausíveis: fora delas, experiência e rating estourariam as colunas inteiras
+        if not 0 <= game_time <= MAX_GAME_TIME:
+            raise ValueError(f"gameTime deve estar entre 0 e {MAX_GAME_TIME} segundos")
+        if not 0 <= opponent_rating <= MAX_OPPONENT_RATING:
+            raise ValueError(f"opponentRating deve estar entre 0 e {MAX_OPPONENT_RATING}")
+        return {
+            "gameName": str(game_result["gameName"]),
+            "won": bool(game_result["won"]),
+            "gameTime": game_time,
+            "opponentRating": opponent_rating,
+        }
+
+    def _record_game_result(self, player_id: str, game_result: Dict, now: datetime):
+        # game_result já normalizado (_normalize_game_result)
+        if self.event_log is not None:
+            self._record(EVENT_GAME_RESULT, GameResultCodec.encode(
+                player_id, game_result["gameName"], game_result["won"], game_result["gameTime"],
+                game_result["opponentRating"], now.timestamp(),
+            ))
 
     def initialize_example_data(self):
         # Jogadores de exemplo
@@ -25,7 +303,7 @@ class LeaderboardService:
         ]
 
         for player in example_players:
-            self.players[player["id"]] = {
+            self.create_player({
                 **player,
                 "gamesPlayed": random.randint(50, 150),
                 "gamesWon": random.randint(20, 80),
@@ -36,17 +314,59 @@ class LeaderboardService:
                 "lastActive": datetime.now() - timedelta(days=random.randint(0, 7)),
                 "achievements": self.generate_random_achievements(),
                 "rating": random.randint(1200, 2000),
-            }
+            })
 
         # Estatísticas por jogo
         games = ['Senet', 'Go', 'Mancala', 'Chaturanga', 'Patolli', 'Hanafuda', 'NineMensMorris', 'Hnefatafl', 'Pachisi']
         for game in games:
-            self.game_stats[game] = {
+            stats = {
                 "totalGames": random.randint(5000, 15000),
                 "totalPlayers": random.randint(500, 1500),
                 "averageGameTime": random.randint(10, 30),  # minutos
-                "topPlayers": self.generate_top_players_for_game(game),
             }
+            self.storage.add_game(game, stats)
+            self.aggregates.game_added(game, stats["totalGames"])
+            self.generate_example_game_players(game, [player["id"] for player in example_players])
+        if self.history is not None:
+            self.history.start_from(self.storage)
+
+    @_writes
+    def create_player(self, player_data: Dict) -> Dict:
+        player_id = str(player_data["id"])
+        now = datetime.now()
+        player = {
+            "name": player_data.get("name", f"Jogador {player_id}"),
+            "avatar": player_data.get("avatar", '🎲'),
+            "level": 1,
+            "experience": 0,
+            "gamesPlayed": 0,
+            "gamesWon": 0,
+            "currentStreak": 0,
+            "bestStreak": 0,
+            "favoriteGame": None,
+            "joinDate": now,
+            "lastActive": now,
+            "achievements": [],
+            "rating": INITIAL_RATING,
+            **player_data,
+            "id": player_id,
+        }
+        # Verificação e inserção na mesma transação: com armazenamento compartilhado,
+        # outro processo criando o mesmo id espera em vez de sobrescrever este
+        with self.storage.transaction():
+            if self.storage.has_player(player_id):
+                raise ValueError("Jogador já existe")
+            self._record(EVENT_PLAYER_CREATED, pickle.dumps(player, protocol=pickle.HIGHEST_PROTOCOL))
+            self._apply_player_created(player)
+        self._maybe_snapshot()
+        return player
+
+    def _apply_player_created(self, player: Dict):
+        self.storage.add_player(player)
+        self.aggregates.player_added(player)
+        if self.history is not None:
+            self.history.add_player(player)
+        self._bump_versions("global", "platform")
 
     def generate_random_achievements(self) -> List[str]:
         all_achievements = [
@@ -56,101 +376,191 @@ class LeaderboardService:
         count = random.randint(2, 7)
         return random.sample(all_achievements, min(count, len(all_achievements)))
 
-    def generate_top_players_for_game(self, game: str) -> List[Dict]:
-        player_ids = list(self.players.keys())
+    def generate_example_game_players(self, game: str, player_ids: List[str]):
+        player_ids = list(player_ids)
         random.shuffle(player_ids)
-        
-        top_players = []
+
         for i, player_id in enumerate(player_ids[:10]):
-            player = self.players[player_id]
-            top_players.append({
-                "playerId": player_id,
+            entry = self._get_game_entry(game, self.storage.get_player(player_id))
+            entry["rating"] = 1500 - (i * 50) + random.randint(-50, 100)
+            entry["gamesPlayed"] = random.randint(20, 70)
+            win_rate = min(1.0, max(0.3, 0.9 - (i * 0.05) + (random.random() * 0.1)))
+            entry["gamesWon"] = round(entry["gamesPlayed"] * win_rate)
+            entry["winRate"] = entry["gamesWon"] / entry["gamesPlayed"]
+            self.storage.save_game_entry(game, entry)
+
+    def _get_game_entry(self, game: str, player: Dict) -> Dict:
+        # Cria a entrada do jogador no jogo na primeira partida
+        entry = self.storage.get_game_entry(game, player["id"])
+        if entry is None:
+            entry = {
+                "playerId": player["id"],
                 "playerName": player["name"],
-                "rating": 1500 - (i * 50) + random.randint(-50, 100),
-                "gamesPlayed": random.randint(20, 70),
-                "winRate": max(0.3, 0.9 - (i * 0.05) + (random.random() * 0.1)),
-            })
-        
-        return sorted(top_players, key=lambda x: x["rating"], reverse=True)
+                "rating": INITIAL_GAME_RATING,
+                "gamesPlayed": 0,
+                "gamesWon": 0,
+                "winRate": 0,
+            }
+            self.storage.add_game_entry(game, entry)
+        return entry
 
-    def get_global_leaderboard(self, limit: int = 50) -> Dict:
-        players = list(self.players.values())
-        
-        # Ordenar por rating, depois por experiência
-        players.sort(key=lambda x: (x["rating"], x["experience"]), reverse=True)
-        
+    def _game_leaderboard_entries(self, game: str, limit: int) -> List[Dict]:
+        return [
+            {"rank": i + 1, **entry}
+            for i, entry in enumerate(self.storage.top_game_entries(game, 0, limit))
+        ]
+
+    @staticmethod
+    def _rating_change(rating: int, opponent_rating: int, won: bool) -> int:
+        # Sistema ELO simplificado
+        actual_score = 1 if won else 0
+        return round(K_FACTOR * (actual_score - expected_score(rating, opponent_rating)))
+
+    @staticmethod
+    def _parse_cursor(cursor: str) -> Tuple[int, int, str]:
+        # Cursor = chave da última linha da página anterior: "<rating>:<desempate>:<id>"
+        try:
+            rating, tiebreak, member_id = cursor.split(":", 2)
+            return int(rating), int(tiebreak), member_id
+        except ValueError:
+            raise ValueError("Cursor inválido")
+
+    def _leaderboard_page(self, limit: int, cursor: Optional[str], around: Optional[str], radius: int,
+                          page_after, page_around, top) -> Tuple[int, List[Dict], bool]:
+        # Página a partir do topo, depois de um cursor ou ao redor de um jogador; só a fatia pedida
+        # (mais uma linha, para saber se há próxima página) é lida
+        if around is not None:
+            page = page_around(around, radius)
+            if page is None:
+                raise ValueError("Jogador não encontrado no ranking")
+            offset, rows = page
+            return offset, rows, True
+        if cursor:
+            rating, tiebreak, member_id = self._parse_cursor(cursor)
+            offset, rows = page_after(rating, tiebreak, member_id, limit + 1)
+        else:
+            offset, rows = 0, top(0, limit + 1)
+        return offset, rows[:limit], len(rows) > limit
+
+    @_reads
+    def get_global_leaderboard(self, limit: int = 50, cursor: Optional[str] = None,
+                               around: Optional[str] = None, radius: int = 5) -> Dict:
+        # O índice já mantém a ordem por rating, depois por experiência
+        offset, players, has_more = self._leaderboard_page(
+            limit, cursor, around, radius,
+            self.storage.players_after, self.storage.players_around, self.storage.top_players,
+        )
         leaderboard = []
-        for i, player in enumerate(players[:limit]):
+        for i, player in enumerate(players):
             win_rate = player["gamesWon"] / player["gamesPlayed"] if player["gamesPlayed"] > 0 else 0
             leaderboard.append({
-                "rank": i + 1,
+                "rank": offset + i + 1,
                 **player,
                 "winRate": win_rate,
             })
 
+        last = players[-1] if players and has_more else None
         return {
             "leaderboard": leaderboard,
-            "totalPlayers": len(self.players),
+            "totalPlayers": self.storage.count_players(),
+            "nextCursor": f"{last['rating']}:{last['experience']}:{last['id']}" if last else None,
             "lastUpdated": datetime.now().isoformat(),
         }
 
-    def get_game_leaderboard(self, game_name: str, limit: int = 50) -> Dict:
-        if game_name not in self.game_stats:
+    @_reads
+    def get_game_leaderboard(self, game_name: str, limit: int = 50, cursor: Optional[str] = None,
+                             around: Optional[str] = None, radius: int = 5) -> Dict:
+        if not self.storage.has_game(game_name):
             raise ValueError(f"Jogo {game_name} não encontrado")
 
-        game_stats = self.game_stats[game_name]
-        
+        game_stats = self.storage.get_game_stats(game_name)
+        offset, entries, has_more = self._leaderboard_page(
+            limit, cursor, around, radius,
+            lambda rating, games_played, player_id, count: self.storage.game_entries_after(
+                game_name, rating, games_played, player_id, count),
+            lambda player_id, count: self.storage.game_entries_around(game_name, player_id, count),
+            lambda start, count: self.storage.top_game_entries(game_name, start, count),
+        )
+        last = entries[-1] if entries and has_more else None
+
         return {
             "game": game_name,
-            "leaderboard": game_stats["topPlayers"][:limit],
+            "leaderboard": [{"rank": offset + i + 1, **entry} for i, entry in enumerate(entries)],
             "totalPlayers": game_stats["totalPlayers"],
             "totalGames": game_stats["totalGames"],
             "averageGameTime": game_stats["averageGameTime"],
+            "nextCursor": f"{last['rating']}:{last['gamesPlayed']}:{last['playerId']}" if last else None,
             "lastUpdated": datetime.now().isoformat(),
         }
 
+    @_reads
     def get_player_stats(self, player_id: str) -> Dict:
-        if player_id not in self.players:
+        player = self.storage.get_player(player_id)
+        if player is None:
             raise ValueError("Jogador não encontrado")
 
-        player = self.players[player_id]
+        # Posição no ranking global
+        global_rank = self.storage.player_rank(player_id) or 0
 
-        # Calcular posição no ranking global
-        all_players = sorted(self.players.values(), key=lambda x: x["rating"], reverse=True)
-        global_rank = next((i + 1 for i, p in enumerate(all_players) if p["id"] == player_id), 0)
-
-        # Calcular estatísticas por jogo
+        # Estatísticas por jogo a partir do índice reverso jogador -> jogos
         game_stats = {}
-        for game in self.game_stats.keys():
-            game_leaderboard = self.get_game_leaderboard(game)
-            player_in_game = next((p for p in game_leaderboard["leaderboard"] if p["playerId"] == player_id), None)
-            if player_in_game:
-                rank = game_leaderboard["leaderboard"].index(player_in_game) + 1
-                game_stats[game] = {
-                    "rank": rank,
-                    "rating": player_in_game["rating"],
-                    "gamesPlayed": player_in_game["gamesPlayed"],
-                    "winRate": player_in_game["winRate"],
-                }
+        for game, entry in self.storage.player_game_entries(player_id).items():
+            game_stats[game] = {
+                "rank": self.storage.game_rank(game, player_id),
+                "rating": entry["rating"],
+                "gamesPlayed": entry["gamesPlayed"],
+                "winRate": entry["winRate"],
+            }
 
         win_rate = player["gamesWon"] / player["gamesPlayed"] if player["gamesPlayed"] > 0 else 0
 
-        return {
+        stats = {
             **player,
             "globalRank": global_rank,
             "gameStats": game_stats,
             "winRate": win_rate,
         }
+        if self.glicko is not None:
+            stats["glicko"] = self.glicko.get(player_id)
+        return stats
+
+    @_writes
+    def close_rating_period(self) -> Dict:
+        # Fecha o período Glicko-2 em aberto agora (normalmente fechado na virada do dia)
+        if self.glicko is None:
+            raise ValueError("Glicko-2 não está habilitado")
+        now = datetime.now()
+        self._record(EVENT_RATING_PERIOD_CLOSED, pickle.dumps(now.timestamp(), protocol=pickle.HIGHEST_PROTOCOL))
+        games = self._apply_rating_period_closed(now)
+        self._maybe_snapshot()
+        return {"gamesProcessed": games, "periodStart": self.glicko.period_start.isoformat()}
+
+    def _apply_rating_period_closed(self, now: datetime) -> int:
+        if self.glicko is None:
+            return 0
+        return self.glicko.close_period(now.date())
 
+    @_writes
     def update_player_after_game(self, player_id: str, game_result: Dict) -> Dict:
-        if player_id not in self.players:
+        if not self.storage.has_player(player_id):
             raise ValueError("Jogador não encontrado")
+        game_result = self._normalize_game_result(game_result)
 
-        player = self.players[player_id]
+        now = datetime.now()
+        self._record_game_result(player_id, game_result, now)
+        with self.storage.transaction():
+            result = self._apply_game_result(player_id, game_result, now)
+        self._maybe_snapshot()
+        return result
+
+    def _apply_game_result(self, player_id: str, game_result: Dict, now: datetime) -> Dict:
+        self._maybe_rollover_season(now)
+        player = self.storage.get_player(player_id)
         game_name = game_result.get("gameName")
-        won = game_result.get("won")
-        game_time = game_result.get("gameTime", 900)  # 15 minutos padrão
-        opponent_rating = game_result.get("opponentRating", 1500)
+        self._bump_versions("global", "seasonal", "platform", f"game:{game_name}")
+        won = game_result["won"]
+        game_time = game_result["gameTime"]
+        opponent_rating = game_result["opponentRating"]
 
         # Atualizar estatísticas básicas
         player["gamesPlayed"] += 1
@@ -161,17 +571,30 @@ class LeaderboardService:
         else:
             player["currentStreak"] = 0
 
-        # Calcular mudança no rating (sistema ELO simplificado)
-        expected_score = 1 / (1 + pow(10, (opponent_rating - player["rating"]) / 400))
-        actual_score = 1 if won else 0
-        k_factor = 32  # Fator K para mudança de rating
-        rating_change = round(k_factor * (actual_score - expected_score))
-        
-        player["rating"] = max(800, player["rating"] + rating_change)
+        # Calcular mudança no rating
+        rating_change = self._rating_change(player["rating"], opponent_rating, won)
+        rating_before = player["rating"]
+        player["rating"] = max(MIN_RATING, player["rating"] + rating_change)
+        self.seasons.record_game(player_id, rating_before, player["rating"])
+
+        # Atualizar rating e ranking do jogo
+        # Contadores alterados por este resultado (entradas das regras de conquistas)
+        changed = {"gamesPlayed": player["gamesPlayed"]}
+        if won:
+            changed["gamesWon"] = player["gamesWon"]
+            changed["currentStreak"] = player["currentStreak"]
+
+        game_rating_change = 0
+        if self.storage.has_game(game_name):
+            game_rating_change, entry, created = self._update_game_entry(player, game_name, won, opponent_rating)
+            if won:
+                changed[f"gameWins:{game_name}"] = entry["gamesWon"]
+            if created:
+                changed["allGamesCovered"] = self._covers_all_games(player["id"])
 
         # Atualizar experiência
         base_exp = 100 if won else 25
-        time_bonus = max(0, 30 - (game_time // 60))  # Bônus por jogos rápidos
+        time_bonus = max(0, 30 - int(game_time // 60))  # Bônus por jogos rápidos
         streak_bonus = player["currentStreak"] * 10 if player["currentStreak"] > 1 else 0
         
         experience_gained = base_exp + time_bonus + streak_bonus
@@ -180,51 +603,363 @@ class LeaderboardService:
         # Verificar se subiu de nível
         new_level = (player["experience"] // 1000) + 1
         leveled_up = new_level > player["level"]
+        if leveled_up:
+            changed["level"] = new_level
+        self.aggregates.player_updated(player["level"], new_level, player["lastActive"], now)
         player["level"] = new_level
 
         # Atualizar última atividade
-        player["lastActive"] = datetime.now()
+        player["lastActive"] = now
+        self.activity.record(player_id, now, game_name)
+        if self.history is not None:
+            self.history.record(player_id, game_name, won, game_time, opponent_rating, now.timestamp())
+        if self.glicko is not None:
+            self.glicko.record(player_id, game_name if self.storage.has_game(game_name) else None,
+                               opponent_rating, bool(won), now)
 
         # Verificar conquistas
-        new_achievements = self.check_achievements(player)
+        new_achievements = self.check_achievements(player, changed)
+        self.storage.save_player(player)
 
         return {
-            "player": player,
+            "player": dict(player),
             "ratingChange": rating_change,
+            "gameRatingChange": game_rating_change,
             "experienceGained": experience_gained,
             "leveledUp": leveled_up,
             "newAchievements": new_achievements,
         }
 
-    def check_achievements(self, player: Dict) -> List[str]:
-        new_achievements = []
-        achievements = player.get("achievements", [])
+    @_writes
+    def update_players_after_games(self, game_results: List[Dict]) -> List[Dict]:
+        return self._update_players_after_games(game_results)
+
+    def submit_game_result(self, player_id: str, game_result: Dict) -> Future:
+        # Enfileira na escritora do shard do jogador; o Future resolve com a resposta do
+        # lote (a de update_players_after_games, mais o perfil "player" ao fim do lote)
+        return self.writes.submit(player_id, {**game_result, "playerId": player_id})
+
+    def submit_game_results(self, game_results: List[Dict]) -> List[Future]:
+        return self.writes.submit_many((str(result.get("playerId", "")) if isinstance(result, dict) else "", result)
+                                       for result in game_results)
+
+    @_writes
+    def _apply_write_batch(self, game_results: List[Dict]) -> List[Dict]:
+        responses = self._update_players_after_games(game_results)
+        for response in responses:
+            if "error" not in response:
+                response["player"] = dict(self.storage.get_player(response["playerId"]))
+        return responses
+
+    def _update_players_after_games(self, game_results: List[Dict]) -> List[Dict]:
+        # Ingestão em lote: mesma semântica de chamar update_player_after_game para cada
+        # resultado na ordem recebida, com a matemática de rating feita em arrays NumPy
+        # Todos os itens são validados e normalizados antes de qualquer gravação no log;
+        # os inválidos recebem o erro na própria resposta
+        responses: List[Any] = [None] * len(game_results)
+        game_results = list(game_results)
+        valid = []
+        for i, game_result in enumerate(game_results):
+            if not isinstance(game_result, dict):
+                responses[i] = {"playerId": "", "error": "Cada resultado deve ser um objeto"}
+                continue
+            player_id = str(game_result.get("playerId", ""))
+            if not self.storage.has_player(player_id):
+                responses[i] = {"playerId": player_id, "error": "Jogador não encontrado"}
+                continue
+            try:
+                game_results[i] = {**self._normalize_game_result(game_result), "playerId": player_id}
+            except ValueError as e:
+                responses[i] = {"playerId": player_id, "error": str(e)}
+                continue
+            valid.append(i)
+
+        now = datetime.now()
+        player_ids = [game_results[i]["playerId"] for i in valid]
+        for player_id, i in zip(player_ids, valid):
+            self._record_game_result(player_id, game_results[i], now)
+
+        self._maybe_rollover_season(now)
+        self._bump_versions("global", "seasonal", "platform",
+                            *{f"game:{game_results[i]['gameName']}" for i in valid})
+        with self.storage.transaction():
+            for wave in occurrence_waves(player_ids):
+                self._apply_result_wave([valid[j] for j in wave], game_results, responses, now)
+
+        self._maybe_snapshot()
+        return responses
 
-        # Conquistas de vitórias
-        if player["gamesWon"] >= 1 and 'first_win' not in achievements:
-            new_achievements.append('first_win')
-        if player["currentStreak"] >= 5 and 'win_streak_5' not in achievements:
-            new_achievements.append('win_streak_5')
-        if player["currentStreak"] >= 10 and 'win_streak_10' not in achievements:
-            new_achievements.append('win_streak_10')
+    def _apply_result_wave(self, indices: List[int], game_results: List[Dict], responses: List[Any], now: datetime):
+        # Cada jogador aparece no máximo uma vez por onda
+        results = [game_results[i] for i in indices]
+        players = self.storage.get_players([r["playerId"] for r in results])
 
-        # Conquistas de jogos
-        if player["gamesPlayed"] >= 100 and 'games_played_100' not in achievements:
-            new_achievements.append('games_played_100')
+        won = np.array([bool(r["won"]) for r in results])
+        game_times = np.array([r["gameTime"] for r in results], dtype=np.float64)
+        opponent_ratings = np.array([r["opponentRating"] for r in results], dtype=np.float64)
+        ratings = np.array([p["rating"] for p in players], dtype=np.float64)
 
-        # Conquistas de nível
-        if player["level"] >= 10 and 'level_10' not in achievements:
-            new_achievements.append('level_10')
-        if player["level"] >= 20 and 'level_20' not in achievements:
-            new_achievements.append('level_20')
+        # Sequências de vitórias
+        streaks = np.where(won, np.array([p["currentStreak"] for p in players]) + 1, 0)
+        best_streaks = np.maximum(np.array([p["bestStreak"] for p in players]), streaks)
 
-        # Adicionar novas conquistas
-        player["achievements"] = achievements + new_achievements
+        # Rating e experiência
+        rating_changes = elo_changes(ratings, opponent_ratings, won, K_FACTOR)
+        new_ratings = np.maximum(MIN_RATING, ratings.astype(np.int64) + rating_changes)
+        experience_gained = experience_gains(won, game_times, streaks)
+        experience = np.array([p["experience"] for p in players]) + experience_gained
+        levels = experience // 1000 + 1
 
-        return new_achievements
+        # Ratings por jogo
+        all_game_stats = self.storage.all_game_stats()
+        game_indices = [k for k, r in enumerate(results) if r["gameName"] in all_game_stats]
+        game_rating_changes = np.zeros(len(results), dtype=np.int64)
+        # Contadores de conquistas alterados por jogador, além dos do perfil
+        game_counters: List[Dict[str, int]] = [{} for _ in results]
+        if game_indices:
+            entries = []
+            for k in game_indices:
+                game_name = results[k]["gameName"]
+                stats = all_game_stats[game_name]
+                entry = self.storage.get_game_entry(game_name, players[k]["id"])
+                if entry is None:
+                    stats["totalPlayers"] += 1
+                    entry = self._get_game_entry(game_name, players[k])
+                    game_counters[k]["allGamesCovered"] = self._covers_all_games(players[k]["id"])
+                stats["totalGames"] += 1
+                self.aggregates.game_played(game_name)
+                entries.append(entry)
+            for game_name in {results[k]["gameName"] for k in game_indices}:
+                self.storage.save_game_stats(game_name, all_game_stats[game_name])
+            game_ratings = np.array([e["rating"] for e in entries], dtype=np.float64)
+            changes = elo_changes(game_ratings, opponent_ratings[game_indices], won[game_indices], K_FACTOR)
+            game_rating_changes[game_indices] = changes
+            new_game_ratings = np.maximum(MIN_RATING, game_ratings.astype(np.int64) + changes)
+            for k, entry, rating in zip(game_indices, entries, new_game_ratings.tolist()):
+                entry["rating"] = rating
+                entry["gamesPlayed"] += 1
+                if won[k]:
+                    entry["gamesWon"] += 1
+                    game_counters[k][f"gameWins:{results[k]['gameName']}"] = entry["gamesWon"]
+                entry["winRate"] = entry["gamesWon"] / entry["gamesPlayed"]
+                self.storage.save_game_entry(results[k]["gameName"], entry)
 
+        columns = zip(
+            indices, players, won.tolist(), streaks.tolist(), best_streaks.tolist(), new_ratings.tolist(),
+            rating_changes.tolist(), game_rating_changes.tolist(), experience.tolist(),
+            experience_gained.tolist(), levels.tolist(), game_counters,
+        )
+        for (i, player, player_won, streak, best_streak, rating, rating_change, game_rating_change, exp, exp_gained,
+             level, changed) in columns:
+            player["gamesPlayed"] += 1
+            changed["gamesPlayed"] = player["gamesPlayed"]
+            if player_won:
+                player["gamesWon"] += 1
+                changed["gamesWon"] = player["gamesWon"]
+                changed["currentStreak"] = streak
+            player["currentStreak"] = streak
+            player["bestStreak"] = best_streak
+            self.seasons.record_game(player["id"], player["rating"], rating)
+            player["rating"] = rating
+            player["experience"] = exp
+            leveled_up = level > player["level"]
+            if leveled_up:
+                changed["level"] = level
+            self.aggregates.player_updated(player["level"], level, player["lastActive"], now)
+            player["level"] = level
+            player["lastActive"] = now
+
+            responses[i] = {
+                "playerId": player["id"],
+                "rating": rating,
+                "ratingChange": rating_change,
+                "gameRatingChange": game_rating_change,
+                "experienceGained": exp_gained,
+                "leveledUp": leveled_up,
+                "newAchievements": self.check_achievements(player, changed),
+            }
+        self.storage.save_players(players)
+
+        players_by_game: Dict[str, List[str]] = {}
+        for result, player in zip(results, players):
+            players_by_game.setdefault(result["gameName"], []).append(player["id"])
+        for game_name, player_ids in players_by_game.items():
+            self.activity.record_many(player_ids, now, game_name)
+        if self.history is not None:
+            self.history.record_many([p["id"] for p in players], [r["gameName"] for r in results], won, game_times,
+                                     opponent_ratings, now.timestamp())
+        if self.glicko is not None:
+            self.glicko.record_many([p["id"] for p in players],
+                                    [r["gameName"] if r["gameName"] in all_game_stats else None for r in results],
+                                    opponent_ratings, won, now)
+
+    @_writes
+    def recompute_ratings(self, workers: int = DEFAULT_WORKERS) -> Dict:
+        # Reprocessa todo o histórico de partidas com as regras atuais (K_FACTOR, MIN_RATING,
+        # fórmula de experiência). O cálculo não toca o estado; o resultado é aplicado de uma
+        # vez ao final, seguido de um snapshot que o torna o novo estado persistido.
+        # Feito para rodar offline (python -m services.rating_recompute <data_dir>). Só com o
+        # armazenamento em memória: nos backends duráveis não há histórico persistido.
+        # Partidas já incorporadas ao ponto de partida (_compact_history) não são reprocessadas
+        if self.history is None:
+            raise ValueError("O recálculo de ratings exige o armazenamento em memória (histórico de partidas)")
+        started = time.perf_counter()
+        result = recompute(self.history, self.storage.all_game_stats(), K_FACTOR, MIN_RATING, INITIAL_GAME_RATING,
+                           workers=workers)
+        player_ids = self.history.player_ids
+        players = self.storage.get_players([player_ids[row] for row in result["players"].tolist()])
+        ratings_changed = 0
+        self.storage.deferred_indexing = True
+        try:
+            with self.storage.transaction():
+                for player, (rating, experience, level, played, won, streak, best_streak) in zip(
+                        players, result["state"].tolist()):
+                    ratings_changed += rating != player["rating"]
+                    self.aggregates.player_updated(player["level"], level, player["lastActive"], player["lastActive"])
+                    player.update(rating=rating, experience=experience, level=level, gamesPlayed=played,
+                                  gamesWon=won, currentStreak=streak, bestStreak=best_streak)
+                self.storage.save_players(players)
+
+                games = self.history.game_names
+                for player_row, game_row, (rating, played, won) in zip(
+                        result["entryPlayers"].tolist(), result["entryGames"].tolist(), result["entries"].tolist()):
+                    game_name = games[game_row]
+                    entry = self._get_game_entry(game_name, self.storage.get_player(player_ids[player_row]))
+                    entry.update(rating=rating, gamesPlayed=played, gamesWon=won, winRate=won / played if played else 0)
+                    self.storage.save_game_entry(game_name, entry)
+        finally:
+            self.storage.deferred_indexing = False
+        if not self.storage.durable:
+            self.storage.rebuild_indexes()
+        self._bump_versions("global", "platform", *(f"game:{game}" for game in self.storage.all_game_stats()))
+        self._snapshot()
+        return {
+            "matches": len(self.history),
+            "players": len(players),
+            "entries": len(result["entries"]),
+            "ratingsChanged": ratings_changed,
+            "seconds": time.perf_counter() - started,
+        }
+
+    def _compact_history(self):
+        # Acima de history_limit partidas, a metade mais antiga é recalculada uma vez e o
+        # resultado vira o novo ponto de partida; o histórico fica entre metade e o limite.
+        # As partidas incorporadas ficam com as regras vigentes neste momento
+        if self.history is None or len(self.history) <= self.history_limit:
+            return
+        count = len(self.history) - self.history_limit // 2
+        result = recompute(self.history.prefix(count), self.storage.all_game_stats(), K_FACTOR, MIN_RATING,
+                           INITIAL_GAME_RATING, workers=1)
+        self.history.fold(count, result)
+
+    def _update_game_entry(self, player: Dict, game_name: str, won: bool, opponent_rating: int) -> Tuple[int, Dict, bool]:
+        # Retorna a mudança de rating, a entrada atualizada e se ela foi criada agora
+        stats = self.storage.get_game_stats(game_name)
+        entry = self.storage.get_game_entry(game_name, player["id"])
+        created = entry is None
+        if created:
+            stats["totalPlayers"] += 1
+            entry = self._get_game_entry(game_name, player)
+        stats["totalGames"] += 1
+        self.aggregates.game_played(game_name)
+        self.storage.save_game_stats(game_name, stats)
+
+        rating_change = self._rating_change(entry["rating"], opponent_rating, won)
+        entry["rating"] = max(MIN_RATING, entry["rating"] + rating_change)
+        entry["gamesPlayed"] += 1
+        if won:
+            entry["gamesWon"] += 1
+        entry["winRate"] = entry["gamesWon"] / entry["gamesPlayed"]
+
+        self.storage.save_game_entry(game_name, entry)
+        return rating_change, entry, created
+
+    def _covers_all_games(self, player_id: str) -> int:
+        # Só muda quando o jogador estreia em um jogo
+        return int(len(self.storage.player_game_entries(player_id)) >= len(self.storage.all_game_stats()))
+
+    def check_achievements(self, player: Dict, changed: Optional[Dict[str, int]] = None) -> List[str]:
+        # Sem contadores alterados, avalia todas as regras a partir do perfil e das entradas por jogo
+        if changed is None:
+            changed = player_counters(player, self.storage.player_game_entries(player["id"]),
+                                      len(self.storage.all_game_stats()))
+        return self.achievements.evaluate(player, changed)
+
+    # ===== BACKFILL DE CONQUISTAS =====
+
+    @_reads
+    def achievement_candidates(self, achievement_id: str, player_ids: List[str]) -> List[str]:
+        # Jogadores do trecho que satisfazem a regra e ainda não têm a conquista (somente leitura)
+        rule = self.achievements.rule(achievement_id)
+        if rule is None:
+            raise ValueError("Conquista não encontrada")
+        bit = 1 << self.achievements.bits[achievement_id]
+        counter, threshold = rule["counter"], rule["threshold"]
+        total_games = len(self.storage.all_game_stats())
+        candidates = []
+        for player in self.storage.get_players(player_ids):
+            if player is None or self.achievements.player_mask(player) & bit:
+                continue
+            if counter.startswith("gameWins:") or counter == "allGamesCovered":
+                counters = player_counters(player, self.storage.player_game_entries(player["id"]), total_games)
+                value = counters.get(counter, 0)
+            else:
+                value = player[counter]
+            if value >= threshold:
+                candidates.append(player["id"])
+        return candidates
+
+    def start_achievement_backfill(self, achievement_id: str, **options) -> BackfillJob:
+        # Um job por conquista de cada vez; pedir de novo devolve o job em andamento
+        if self.achievements.rule(achievement_id) is None:
+            raise ValueError("Conquista não encontrada")
+        for job in self.backfill_jobs.values():
+            if job.achievement_id == achievement_id and job.running():
+                return job
+        job = BackfillJob(self, achievement_id, **options)
+        self.backfill_jobs[job.id] = job
+        return job.start()
+
+    def get_backfill_job(self, job_id: str) -> Dict:
+        job = self.backfill_jobs.get(job_id)
+        if job is None:
+            raise ValueError("Job de backfill não encontrado")
+        return job.to_dict()
+
+    @_writes
+    def grant_achievement(self, achievement_id: str, player_ids: List[str]) -> int:
+        if not player_ids:
+            return 0
+        self._record(EVENT_ACHIEVEMENTS_GRANTED,
+                     pickle.dumps((achievement_id, player_ids), protocol=pickle.HIGHEST_PROTOCOL))
+        granted = self._apply_achievements_granted(achievement_id, player_ids)
+        self._maybe_snapshot()
+        return granted
+
+    def _apply_achievements_granted(self, achievement_id: str, player_ids: List[str]) -> int:
+        bit = 1 << self.achievements.bits[achievement_id]
+        # Leitura e gravação na mesma transação: uma partida gravada por outro processo
+        # entre as duas seria desfeita pela gravação do perfil lido antes dela
+        with self.storage.transaction():
+            players = [p for p in self.storage.get_players(player_ids) if not self.achievements.player_mask(p) & bit]
+            for player in players:
+                self.achievements.grant(player, bit)
+            self.storage.save_players(players)
+        self._bump_versions("global")
+        return len(players)
+
+    @_writes
     def create_tournament(self, tournament_data: Dict) -> Dict:
-        tournament_id = f"tournament_{int(time.time())}"
+        if tournament_data.get("type", "elimination") not in brackets.TOURNAMENT_TYPES:
+            raise ValueError(f"Tipo de torneio inválido; use um de: {', '.join(brackets.TOURNAMENT_TYPES)}")
+        # Sufixo aleatório: dois torneios criados no mesmo segundo não colidem
+        tournament_id = f"tournament_{int(time.time())}_{uuid.uuid4().hex[:12]}"
+        # Datas opcionais em ISO 8601; padrão: começa em 1 dia e termina em 7
+        now = datetime.now()
+        start_date = tournament_data.get("startDate") or (now + timedelta(days=1)).isoformat()
+        end_date = tournament_data.get("endDate") or (now + timedelta(days=7)).isoformat()
+        if datetime.fromisoformat(end_date) <= datetime.fromisoformat(start_date):
+            raise ValueError("endDate deve ser posterior a startDate")
         tournament = {
             "id": tournament_id,
             "name": tournament_data["name"],
@@ -233,109 +968,288 @@ class LeaderboardService:
             "maxPlayers": tournament_data.get("maxPlayers", 16),
             "entryFee": tournament_data.get("entryFee", 0),
             "prizePool": tournament_data.get("prizePool", 0),
-            "startDate": (datetime.now() + timedelta(days=1)).isoformat(),
-            "endDate": (datetime.now() + timedelta(days=7)).isoformat(),
+            "startDate": start_date,
+            "endDate": end_date,
             "status": "registration",
             "participants": [],
             "matches": [],
+            # Rodadas do suíço (padrão: log2 dos participantes); demais formatos calculam no início
+            "rounds": tournament_data.get("rounds"),
+            "currentRound": 0,
+            "winner": None,
             "createdAt": datetime.now().isoformat(),
             "createdBy": tournament_data.get("createdBy", "unknown"),
         }
 
-        self.tournaments[tournament_id] = tournament
+        while tournament["id"] in self.tournaments:
+            tournament["id"] = f"tournament_{int(time.time())}_{uuid.uuid4().hex[:12]}"
+        self._record(EVENT_TOURNAMENT_CREATED, pickle.dumps(tournament, protocol=pickle.HIGHEST_PROTOCOL))
+        self._apply_tournament_created(tournament)
+        self._maybe_snapshot()
         return tournament
 
-    def get_active_tournaments(self) -> List[Dict]:
-        active_tournaments = []
-        for tournament in self.tournaments.values():
-            if tournament["status"] in ["registration", "active"]:
-                active_tournaments.append(tournament)
-        
-        return sorted(active_tournaments, key=lambda x: x["startDate"])
+    def _apply_tournament_created(self, tournament: Dict):
+        self.tournament_members[tournament["id"]] = {p["playerId"] for p in tournament["participants"]}
+        self.tournaments[tournament["id"]] = tournament
+        self.scheduler.add(tournament)
+        self._bump_versions("platform")
 
-    def register_player_in_tournament(self, tournament_id: str, player_id: str) -> Dict:
-        if tournament_id not in self.tournaments:
+    def _index_tournaments(self):
+        self.tournament_members = {
+            tournament_id: {p["playerId"] for p in tournament["participants"]}
+            for tournament_id, tournament in self.tournaments.items()
+        }
+        self.scheduler.rebuild(self.tournaments.values())
+
+    def _tournament(self, tournament_id: str) -> Dict:
+        tournament = self.tournaments.get(tournament_id)
+        if tournament is None:
             raise ValueError("Torneio não encontrado")
-        if player_id not in self.players:
-            raise ValueError("Jogador não encontrado")
+        return tournament
 
+    @_reads
+    def get_active_tournaments(self) -> List[Dict]:
+        # O(k) nos torneios em inscrição ou em andamento, já ordenados por startDate.
+        # Os prazos são aplicados pela thread de run_tournament_scheduler, não pela leitura
+        return self.scheduler.listing(("registration", "active"))
+
+    def run_tournament_scheduler(self, interval: float, stop: threading.Event):
+        # Laço da thread que aplica os prazos dos torneios
+        while not stop.wait(interval):
+            self.advance_tournaments()
+
+    @_writes
+    def advance_tournaments(self, now: Optional[datetime] = None):
+        # Aplica os prazos vencidos: no startDate o torneio começa (ou é cancelado com
+        # menos de 2 inscritos); no endDate é encerrado mesmo sem todos os resultados
+        for tournament_id, action in self.scheduler.due(now or datetime.now()):
+            tournament = self._tournament(tournament_id)
+            if action == START and len(tournament["participants"]) >= 2:
+                self._start_tournament(tournament_id)
+            else:
+                self._change_tournament_status(tournament_id, "cancelled" if action == START else "finished",
+                                               "registration" if action == START else "active")
+
+    def _change_tournament_status(self, tournament_id: str, status: str, expected: str):
+        tournament = self._tournament(tournament_id)
+        if tournament["status"] != expected:
+            return
+        now = datetime.now()
+        self._record(EVENT_TOURNAMENT_STATUS,
+                     pickle.dumps((tournament_id, status, now.isoformat()), protocol=pickle.HIGHEST_PROTOCOL))
+        self._apply_tournament_status(tournament_id, status, now.isoformat())
+        self._maybe_snapshot()
+
+    def _apply_tournament_status(self, tournament_id: str, status: str, changed_at: str):
         tournament = self.tournaments[tournament_id]
-        player = self.players[player_id]
+        self._set_tournament_status(tournament, status)
+        tournament[f"{status}At"] = changed_at  # finishedAt / cancelledAt
+
+    def _set_tournament_status(self, tournament: Dict, status: str):
+        old_status = tournament["status"]
+        tournament["status"] = status
+        self.scheduler.move(tournament, old_status)
+
+    @_writes
+    def register_player_in_tournament(self, tournament_id: str, player_id: str) -> Dict:
+        tournament = self._tournament(tournament_id)
+        player = self.storage.get_player(player_id)
+        if player is None:
+            raise ValueError("Jogador não encontrado")
+        participant = {
+            "playerId": player_id,
+            "playerName": player["name"],
+            "playerRating": player["rating"],
+            "registeredAt": datetime.now().isoformat(),
+        }
 
+        # Verificações e inscrição atômicas (lock de escrita); o evento é gravado antes de
+        # aplicar, então a ordem no log é a ordem de aplicação
         if tournament["status"] != "registration":
             raise ValueError("Inscrições encerradas")
         if len(tournament["participants"]) >= tournament["maxPlayers"]:
             raise ValueError("Torneio lotado")
-        if any(p["playerId"] == player_id for p in tournament["participants"]):
+        if player_id in self.tournament_members[tournament_id]:
             raise ValueError("Jogador já inscrito")
+        self._record(EVENT_TOURNAMENT_REGISTRATION,
+                     pickle.dumps((tournament_id, participant), protocol=pickle.HIGHEST_PROTOCOL))
+        self._apply_tournament_registration(tournament_id, participant)
+        self._maybe_snapshot()
 
-        tournament["participants"].append({
-            "playerId": player_id,
-            "playerName": player["name"],
-            "playerRating": player["rating"],
-            "registeredAt": datetime.now().isoformat(),
-        })
+        return tournament
 
+    def _apply_tournament_registration(self, tournament_id: str, participant: Dict):
+        # Idempotente: uma inscrição já presente (no snapshot e no log) não se repete
+        if participant["playerId"] in self.tournament_members[tournament_id]:
+            return
+        self.tournaments[tournament_id]["participants"].append(participant)
+        self.tournament_members[tournament_id].add(participant["playerId"])
+
+    @_writes
+    def start_tournament(self, tournament_id: str) -> Dict:
+        return self._start_tournament(tournament_id)
+
+    def _start_tournament(self, tournament_id: str) -> Dict:
+        # Encerra as inscrições e gera a chave ou a primeira rodada
+        tournament = self._tournament(tournament_id)
+        if tournament["status"] != "registration":
+            raise ValueError("Torneio já iniciado")
+        if len(tournament["participants"]) < 2:
+            raise ValueError("São necessários pelo menos 2 participantes")
+        now = datetime.now()
+        self._record(EVENT_TOURNAMENT_STARTED,
+                     pickle.dumps((tournament_id, now.isoformat()), protocol=pickle.HIGHEST_PROTOCOL))
+        self._apply_tournament_started(tournament_id, now.isoformat())
+        self._maybe_snapshot()
         return tournament
 
-    def get_platform_stats(self) -> Dict:
-        total_players = len(self.players)
-        total_games = sum(stats["totalGames"] for stats in self.game_stats.values())
-        
-        # Jogadores ativos (últimos 7 dias)
-        active_players = sum(1 for player in self.players.values() 
-                           if (datetime.now() - player["lastActive"]).days <= 7)
+    def _apply_tournament_started(self, tournament_id: str, started_at: str):
+        tournament = self.tournaments[tournament_id]
+        brackets.start(tournament)
+        self._set_tournament_status(tournament, "active")
+        tournament["startedAt"] = started_at
+
+    @_writes
+    def report_match_result(self, tournament_id: str, match_id: int, winner_id: Optional[str]) -> Dict:
+        tournament = self._tournament(tournament_id)
+        if tournament["status"] != "active":
+            raise ValueError("Torneio não está em andamento")
+        # Valida sem alterar o estado antes de gravar o evento
+        matches = tournament["matches"]
+        if not 0 <= match_id < len(matches) or matches[match_id]["status"] != "ready":
+            raise ValueError("Partida não está disponível para resultado")
+        if winner_id is None and tournament["type"] in brackets.ELIMINATION_TYPES:
+            raise ValueError("Eliminatórias não admitem empate")
+        if winner_id is not None and winner_id not in (matches[match_id]["player1"], matches[match_id]["player2"]):
+            raise ValueError("Vencedor não participa da partida")
 
-        # Top jogos por número de partidas
-        top_games = sorted(
-            [(name, stats["totalGames"]) for name, stats in self.game_stats.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:5]
+        now = datetime.now()
+        self._record(EVENT_TOURNAMENT_MATCH_RESULT,
+                     pickle.dumps((tournament_id, match_id, winner_id, now.isoformat()),
+                                  protocol=pickle.HIGHEST_PROTOCOL))
+        self._apply_tournament_match_result(tournament_id, match_id, winner_id, now.isoformat())
+        self._maybe_snapshot()
+        return matches[match_id]
 
-        # Nível médio dos jogadores
-        average_level = sum(player["level"] for player in self.players.values()) / total_players if total_players > 0 else 0
+    def _apply_tournament_match_result(self, tournament_id: str, match_id: int, winner_id: Optional[str],
+                                       reported_at: str):
+        tournament = self.tournaments[tournament_id]
+        if brackets.record_result(tournament, match_id, winner_id):
+            self._set_tournament_status(tournament, "finished")
+            tournament["finishedAt"] = reported_at
 
+    @_reads
+    def get_tournament_matches(self, tournament_id: str, round_number: Optional[int] = None) -> Dict:
+        tournament = self.tournaments.get(tournament_id)
+        if tournament is None:
+            raise ValueError("Torneio não encontrado")
+        matches = tournament["matches"]
+        if round_number is not None:
+            matches = [match for match in matches if match["round"] == round_number]
+        result = {
+            "tournamentId": tournament_id,
+            "type": tournament["type"],
+            "status": tournament["status"],
+            "currentRound": tournament["currentRound"],
+            "rounds": tournament["rounds"],
+            "winner": tournament["winner"],
+            "matches": matches,
+        }
+        if "standings" in tournament:
+            result["standings"] = brackets.final_standings(tournament)
+        return result
+
+    @_reads
+    def get_platform_stats(self) -> Dict:
+        # O(1): tudo vem dos agregados mantidos a cada mutação
+        aggregates = self.aggregates
         return {
-            "totalPlayers": total_players,
-            "activePlayers": active_players,
-            "totalGames": total_games,
+            "totalPlayers": aggregates.total_players,
+            # Jogadores ativos (últimos 7 dias completos)
+            "activePlayers": aggregates.active_players(datetime.now()),
+            "totalGames": aggregates.total_games,
             "totalTournaments": len(self.tournaments),
-            "topGames": [{"name": name, "totalGames": games} for name, games in top_games],
-            "averagePlayerLevel": round(average_level, 1),
+            # Top jogos por número de partidas
+            "topGames": [{"name": name, "totalGames": games} for name, games in aggregates.games.top()],
+            # Nível médio dos jogadores
+            "averagePlayerLevel": round(aggregates.average_level(), 1),
         }
 
+    # ===== VERSÕES DOS RANKINGS =====
+
+    def _bump_versions(self, *rankings: str):
+        for ranking in rankings:
+            self.ranking_versions[ranking] = self.ranking_versions.get(ranking, 0) + 1
+
+    def _maybe_rollover_season(self, now: datetime):
+        if self.seasons.maybe_rollover(now):
+            self._bump_versions("seasonal")
+
+    def _roll_season_if_due(self, now: datetime):
+        # Chamado pelos caminhos de leitura: a virada é uma escrita, então só pega o lock
+        # de escrita quando há uma virada a fazer
+        if season_id_for(now) > self.seasons.season_id:
+            with self.state_lock.write():
+                self._maybe_rollover_season(now)
+
+    def ranking_version(self, ranking: str) -> int:
+        # A virada de temporada é preguiçosa; verificá-la aqui evita servir a temporada encerrada
+        if ranking == "seasonal":
+            self._roll_season_if_due(datetime.now())
+        version = self.ranking_versions.get(ranking, 0)
+        # Escritas de outros processos no armazenamento compartilhado também mudam as respostas
+        return version + self.storage.generation() if self.storage.shared else version
+
+    @_writes
+    def record_activity(self, user_id, game: Optional[str] = None):
+        # Atividade fora do leaderboard (ex.: sessões de jogo); não passa pelo log de eventos
+        self.activity.record(user_id, datetime.now(), game)
+
+    def enqueue_for_match(self, player_id: str, game_name: str, mode: str) -> Dict:
+        # Pareamento pelo rating do jogador no jogo (o inicial, se ainda não jogou)
+        entry = self.storage.get_game_entry(game_name, player_id) if self.storage.has_game(game_name) else None
+        rating = entry["rating"] if entry is not None else INITIAL_GAME_RATING
+        return self.matchmaker.enqueue(player_id, game_name, mode, rating)
+
+    @_reads
+    def get_active_users(self, days: Optional[int] = None, game: Optional[str] = None) -> Dict:
+        if days is None:
+            return {"game": game, **self.activity.summary(game)}
+        return {"game": game, "days": days, "activeUsers": self.activity.active_users(days, game)}
+
     def get_seasonal_ranking(self, season: str = 'current', game: Optional[str] = None) -> Dict:
-        # Implementação simplificada - em produção seria baseado em dados históricos
-        players = list(self.players.values())
-        
-        if game and game in self.game_stats:
+        self._roll_season_if_due(datetime.now())
+        with self.state_lock.read():
+            return self._seasonal_ranking(season, game)
+
+    def _seasonal_ranking(self, season: str, game: Optional[str]) -> Dict:
+        if game and self.storage.has_game(game):
             # Filtrar por jogo específico
-            game_stats = self.game_stats[game]
+            game_stats = self.storage.get_game_stats(game)
             return {
                 "season": season,
                 "game": game,
-                "ranking": game_stats["topPlayers"][:20],
+                "ranking": self._game_leaderboard_entries(game, 20),
                 "totalParticipants": game_stats["totalPlayers"],
             }
 
-        # Ranking geral sazonal
-        seasonal_players = []
-        for player in players:
-            seasonal_player = {
-                **player,
-                "seasonalRating": player["rating"] + random.randint(-50, 50),  # Simulação
-                "seasonalGames": random.randint(5, 25),
-            }
-            seasonal_players.append(seasonal_player)
-
-        seasonal_players.sort(key=lambda x: x["seasonalRating"], reverse=True)
+        # Ranking geral sazonal: temporada atual pelo índice mantido, passadas pelo arquivo congelado
+        season_id = self.seasons.season_id if season == 'current' else season
+        rows, total, start, end = self.seasons.standings(season_id, 0, 50)
+        players = self.storage.get_players([row[0] for row in rows])
+        ranking = [{
+            "rank": i + 1,
+            **player,
+            "seasonalRating": rating,
+            "seasonalGames": games,
+            "seasonalRatingChange": rating - baseline,
+        } for i, (player, (_, rating, baseline, games)) in enumerate(zip(players, rows))]
 
         return {
-            "season": season,
-            "ranking": seasonal_players[:50],
-            "totalParticipants": len(players),
-            "startDate": (datetime.now() - timedelta(days=30)).isoformat(),
-            "endDate": datetime.now().isoformat(),
+            "season": season_id,
+            "ranking": ranking,
+            "totalParticipants": total,
+            "startDate": start.isoformat(),
+            "endDate": end.isoformat(),
+            "pastSeasons": sorted(self.seasons.archives, reverse=True),
         }
-
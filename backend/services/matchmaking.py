@@ -0,0 +1,174 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Filas de matchmaking por (jogo, modo), com os jogadores em buckets de rating.
+# Entrar na fila é O(1): o pareamento acontece em passadas (match_pass), que só
+# examinam quem chegou desde a passada anterior e quem teve a janela ampliada.
+# Cada busca olha apenas o primeiro da fila (o que espera há mais tempo) de cada
+# bucket dentro da janela: no máximo 2 * MAX_BUCKETS + 1 buckets por jogador.
+#
+# A janela aceitável começa em INITIAL_BUCKETS buckets de distância e ganha um bucket
+# a cada WIDEN_SECONDS de espera, até MAX_BUCKETS. Dois jogadores podem se enfrentar
+# se a distância entre os buckets couber na janela de qualquer um deles, então quem
+# espera muito acaba aceitando (e sendo aceito por) adversários mais distantes.
+
+BUCKET_WIDTH = 50
+INITIAL_BUCKETS = 1
+WIDEN_SECONDS = 5.0
+MAX_BUCKETS = 8
+
+
+class Ticket:
+    __slots__ = ("player_id", "rating", "queue", "bucket", "enqueued_at")
+
+    def __init__(self, player_id: str, rating: int, queue: Tuple[str, str], enqueued_at: float):
+        self.player_id = player_id
+        self.rating = rating
+        self.queue = queue
+        self.bucket = rating // BUCKET_WIDTH
+        self.enqueued_at = enqueued_at
+
+    def window(self, now: float) -> int:
+        return min(MAX_BUCKETS, INITIAL_BUCKETS + int((now - self.enqueued_at) // WIDEN_SECONDS))
+
+
+class Matchmaker:
+    def __init__(self, on_match: Optional[Callable[[Dict], None]] = None):
+        # (jogo, modo) -> bucket -> jogadores na ordem de chegada
+        self.queues: Dict[Tuple[str, str], Dict[int, "OrderedDict[str, Ticket]"]] = {}
+        self.tickets: Dict[str, Ticket] = {}
+        self.arrivals = deque()  # jogadores ainda não examinados por nenhuma passada
+        self.widenings: List[Tuple[float, int, str]] = []  # (quando a janela cresce, seq, jogador)
+        self.on_match = on_match
+        self._sequence = itertools.count()
+        self._match_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.matches_made = 0
+
+    def enqueue(self, player_id: str, game: str, mode: str, rating: int, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        with self._lock:
+            if player_id in self.tickets:
+                raise ValueError("Jogador já está na fila")
+            ticket = Ticket(player_id, int(rating), (game, mode), now)
+            self.tickets[player_id] = ticket
+            self.queues.setdefault(ticket.queue, {}).setdefault(ticket.bucket, OrderedDict())[player_id] = ticket
+            self.arrivals.append(player_id)
+            heapq.heappush(self.widenings, (now + WIDEN_SECONDS, next(self._sequence), player_id))
+        return self._ticket_status(ticket, now)
+
+    def cancel(self, player_id: str) -> bool:
+        with self._lock:
+            ticket = self.tickets.get(player_id)
+            if ticket is None:
+                return False
+            self._remove(ticket)
+            return True
+
+    def status(self, player_id: str, now: Optional[float] = None) -> Optional[Dict]:
+        ticket = self.tickets.get(player_id)
+        return self._ticket_status(ticket, time.time() if now is None else now) if ticket else None
+
+    def _ticket_status(self, ticket: Ticket, now: float) -> Dict:
+        window = ticket.window(now)
+        return {
+            "playerId": ticket.player_id,
+            "game": ticket.queue[0],
+            "mode": ticket.queue[1],
+            "rating": ticket.rating,
+            "waitSeconds": round(now - ticket.enqueued_at, 3),
+            "ratingWindow": [(ticket.bucket - window) * BUCKET_WIDTH, (ticket.bucket + window + 1) * BUCKET_WIDTH - 1],
+        }
+
+    def _remove(self, ticket: Ticket):
+        del self.tickets[ticket.player_id]
+        buckets = self.queues[ticket.queue]
+        bucket = buckets[ticket.bucket]
+        del bucket[ticket.player_id]
+        if not bucket:
+            del buckets[ticket.bucket]
+
+    def _find(self, ticket: Ticket, now: float) -> Optional[Ticket]:
+        # Adversário mais próximo (em buckets) aceitável por um dos dois lados; no mesmo
+        # bucket de distância, o de menor diferença de rating
+        buckets = self.queues[ticket.queue]
+        own_window = ticket.window(now)
+        for distance in range(MAX_BUCKETS + 1):
+            best = None
+            for bucket in {ticket.bucket - distance, ticket.bucket + distance}:
+                waiting = buckets.get(bucket)
+                if not waiting:
+                    continue
+                head = None
+                for candidate in itertools.islice(waiting.values(), 2):
+                    if candidate is not ticket:
+                        head = candidate
+                        break
+                if head is None or distance > max(own_window, head.window(now)):
+                    continue
+                if best is None or abs(head.rating - ticket.rating) < abs(best.rating - ticket.rating):
+                    best = head
+            if best is not None:
+                return best
+        return None
+
+    def _pair(self, a: Ticket, b: Ticket, now: float) -> Dict:
+        self._remove(a)
+        self._remove(b)
+        self.matches_made += 1
+        return {
+            "matchId": next(self._match_ids),
+            "game": a.queue[0],
+            "mode": a.queue[1],
+            "players": [
+                {"playerId": t.player_id, "rating": t.rating, "waitSeconds": round(now - t.enqueued_at, 3)}
+                for t in (a, b)
+            ],
+            "ratingGap": abs(a.rating - b.rating),
+            "matchedAt": now,
+        }
+
+    def match_pass(self, now: Optional[float] = None) -> List[Dict]:
+        # Primeiro quem teve a janela ampliada (espera há mais tempo), depois os recém-chegados
+        now = time.time() if now is None else now
+        matches = []
+        with self._lock:
+            while self.widenings and self.widenings[0][0] <= now:
+                _, _, player_id = heapq.heappop(self.widenings)
+                ticket = self.tickets.get(player_id)
+                if ticket is None:
+                    continue  # pareado ou saiu da fila
+                opponent = self._find(ticket, now)
+                if opponent is not None:
+                    matches.append(self._pair(ticket, opponent, now))
+                elif ticket.window(now) < MAX_BUCKETS:
+                    next_step = ticket.enqueued_at + (ticket.window(now) - INITIAL_BUCKETS + 1) * WIDEN_SECONDS
+                    heapq.heappush(self.widenings, (next_step, next(self._sequence), player_id))
+            while self.arrivals:
+                ticket = self.tickets.get(self.arrivals.popleft())
+                if ticket is None:
+                    continue
+                opponent = self._find(ticket, now)
+                if opponent is not None:
+                    matches.append(self._pair(opponent, ticket, now))
+        if self.on_match is not None:
+            for match in matches:
+                self.on_match(match)
+        return matches
+
+    def run(self, interval: float, stop: threading.Event):
+        # Laço da thread de pareamento
+        while not stop.wait(interval):
+            self.match_pass()
+
+    def stats(self) -> Dict:
+        return {
+            "waiting": len(self.tickets),
+            "queues": {f"{game}/{mode}": sum(map(len, buckets.values()))
+                       for (game, mode), buckets in self.queues.items()},
+            "matchesMade": self.matches_made,
+        }
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from typing import Dict, Set
+
+# Condição que acorda tanto threads (servidor WSGI) quanto corrotinas (modo asyncio).
+# Como em threading.Condition, notify_all() e future() são chamados com `condition`
+# adquirido; a espera da corrotina (wait_async) acontece fora do lock.
+# Cada corrotina espera o seu próprio Future, guardado num conjunto por event loop:
+# uma notificação custa um único call_soon_threadsafe por loop, não importa quantas
+# estejam esperando, e quem desiste por tempo sai do conjunto em O(1). (Um Future
+# compartilhado com asyncio.shield custaria O(esperando) a cada desistência.)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _resolve_all(futures: Set[asyncio.Future]):
+    for future in futures:
+        _resolve(future)
+
+
+class Notifier:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self._waiters: Dict[asyncio.AbstractEventLoop, Set[asyncio.Future]] = {}
+
+    def notify_all(self):
+        self.condition.notify_all()
+        waiters, self._waiters = self._waiters, {}
+        for loop, futures in waiters.items():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_resolve_all, futures)
+
+    def wait(self, timeout: float) -> bool:
+        return self.condition.wait(timeout)
+
+    def future(self) -> asyncio.Future:
+        # Resolvido na próxima notify_all(); esperar com wait_async
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.setdefault(loop, set()).add(future)
+        return future
+
+    async def wait_async(self, future: asyncio.Future, timeout: float):
+        loop = asyncio.get_running_loop()
+        timer = loop.call_later(timeout, _resolve, future)
+        try:
+            await future
+        finally:
+            timer.cancel()
+            with self.condition:
+                waiting = self._waiters.get(loop)
+                if waiting is not None:
+                    waiting.discard(future)
@@ -0,0 +1,66 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+# Progresso dos usuários nos jogos, indexado por (userId, gameId): usuário -> jogo ->
+# registro. Leitura e gravação são O(1) e o progresso de todos os jogos de um usuário
+# sai de um único dicionário, não de uma varredura da tabela inteira.
+#
+# Cada registro tem uma versão. Gravações que trazem "version" seguem a regra
+# last-writer-wins: só se aplicam se a versão for maior que a gravada (um dispositivo
+# que sincroniza atrasado não sobrescreve progresso mais novo); as demais ficam
+# "stale" e recebem o registro atual. Sem "version", a gravação sempre se aplica e o
+# servidor usa a versão seguinte à gravada.
+
+PROGRESS_FIELDS = ("score", "level", "status")
+DEFAULTS = {"score": 0, "level": 1, "status": "started"}
+
+
+class ProgressStore:
+    def __init__(self):
+        self.by_user: Dict[Any, Dict[Any, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, game_id) -> Optional[Dict]:
+        return self.by_user.get(user_id, {}).get(game_id)
+
+    def for_user(self, user_id) -> List[Dict]:
+        return list(self.by_user.get(user_id, {}).values())
+
+    def __len__(self) -> int:
+        return sum(len(games) for games in self.by_user.values())
+
+    def _upsert(self, update: Dict) -> Dict:
+        user_id = update.get("userId")
+        game_id = update.get("gameId")
+        if not user_id or not game_id or not all(isinstance(key, (int, str)) for key in (user_id, game_id)):
+            return {"userId": user_id, "gameId": game_id, "error": "ID do usuário e ID do jogo são obrigatórios"}
+        version = update.get("version")
+        if version is not None and (isinstance(version, bool) or not isinstance(version, int)):
+            return {"userId": user_id, "gameId": game_id, "error": "version deve ser um inteiro"}
+
+        games = self.by_user.setdefault(user_id, {})
+        record = games.get(game_id)
+        if record is not None and version is not None and version <= record["version"]:
+            return {"userId": user_id, "gameId": game_id, "status": "stale", "progress": record}
+        created = record is None
+        if created:
+            # Campos ausentes ou vazios recebem os valores iniciais
+            record = {"userId": user_id, "gameId": game_id,
+                      **{field: update.get(field) or DEFAULTS[field] for field in PROGRESS_FIELDS}, "version": 0}
+            games[game_id] = record
+        else:
+            for field in PROGRESS_FIELDS:
+                if update.get(field) is not None:
+                    record[field] = update[field]
+        record["version"] = version if version is not None else record["version"] + 1
+        return {"userId": user_id, "gameId": game_id, "status": "created" if created else "updated", "progress": record}
+
+    def upsert(self, update: Dict) -> Dict:
+        with self._lock:
+            return self._upsert(update)
+
+    def bulk_upsert(self, updates: List[Dict]) -> List[Dict]:
+        # Na ordem recebida, com o lock adquirido uma vez para o lote inteiro
+        with self._lock:
+            return [self._upsert(update) if isinstance(update, dict)
+                    else {"error": "Cada atualização deve ser um objeto"} for update in updates]
@@ -0,0 +1,180 @@
+import mmap
+import os
+import struct
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.ranking_index import RankingIndex
+
+# Temporadas mensais ("AAAA-MM"). A temporada atual guarda, para cada jogador que jogou
+# nela, o rating no início da temporada (baseline), o rating atual e o número de partidas,
+# com um índice de ranking mantido a cada resultado.
+# Na virada, a classificação final é congelada em um arquivo compacto e imutável:
+#
+#   cabeçalho  <8sIIdd  magic, participantes n, bytes de ids, início, fim (epoch)
+#   offsets    int64[n + 1]  início de cada id no bloco de ids
+#   rating     int32[n]      rating final, em ordem de classificação
+#   baseline   int32[n]
+#   games      int32[n]
+#   ids        utf-8 concatenados
+#
+# Temporadas passadas são lidas via mmap com np.frombuffer (sem cópia); só a página
+# pedida é materializada.
+
+ARCHIVE_MAGIC = b"ODGSEAS1"
+ARCHIVE_HEADER = struct.Struct("<8sIIdd")
+
+
+def season_id_for(moment: datetime) -> str:
+    return f"{moment.year:04d}-{moment.month:02d}"
+
+
+def season_bounds(season_id: str) -> Tuple[datetime, datetime]:
+    year, month = (int(part) for part in season_id.split("-"))
+    start = datetime(year, month, 1)
+    end = datetime(year + month // 12, month % 12 + 1, 1)
+    return start, end
+
+
+def archive_path(directory: str, season_id: str) -> str:
+    return os.path.join(directory, f"season-{season_id}.bin")
+
+
+def encode_archive(player_ids: List[str], ratings: np.ndarray, baselines: np.ndarray, games: np.ndarray,
+                   start: datetime, end: datetime) -> bytes:
+    encoded = [player_id.encode("utf-8") for player_id in player_ids]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+    blob = b"".join(encoded)
+    return b"".join([
+        ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, len(encoded), len(blob), start.timestamp(), end.timestamp()),
+        offsets.tobytes(),
+        np.asarray(ratings, dtype=np.int32).tobytes(),
+        np.asarray(baselines, dtype=np.int32).tobytes(),
+        np.asarray(games, dtype=np.int32).tobytes(),
+        blob,
+    ])
+
+
+class SeasonArchive:
+    # Classificação final de uma temporada, sobre um buffer (mmap do arquivo ou bytes)
+    def __init__(self, season_id: str, buffer):
+        magic, count, blob_size, start, end = ARCHIVE_HEADER.unpack_from(buffer, 0)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError("Arquivo de temporada inválido")
+        self.season_id = season_id
+        self.buffer = buffer
+        self.count = count
+        self.start = datetime.fromtimestamp(start)
+        self.end = datetime.fromtimestamp(end)
+        offset = ARCHIVE_HEADER.size
+        self.offsets = np.frombuffer(buffer, dtype=np.int64, count=count + 1, offset=offset)
+        offset += 8 * (count + 1)
+        self.ratings = np.frombuffer(buffer, dtype=np.int32, count=count, offset=offset)
+        self.baselines = np.frombuffer(buffer, dtype=np.int32, count=count, offset=offset + 4 * count)
+        self.games = np.frombuffer(buffer, dtype=np.int32, count=count, offset=offset + 8 * count)
+        self.ids_offset = offset + 12 * count
+        self.ids = memoryview(buffer)[self.ids_offset:self.ids_offset + blob_size]
+
+    @classmethod
+    def open(cls, path: str, season_id: str) -> "SeasonArchive":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(season_id, buffer)
+
+    def player_id(self, position: int) -> str:
+        return bytes(self.ids[self.offsets[position]:self.offsets[position + 1]]).decode("utf-8")
+
+    def page(self, offset: int, limit: int) -> List[Tuple[str, int, int, int]]:
+        stop = min(self.count, offset + limit)
+        ratings = self.ratings[offset:stop].tolist()
+        baselines = self.baselines[offset:stop].tolist()
+        games = self.games[offset:stop].tolist()
+        return [(self.player_id(offset + i), ratings[i], baselines[i], games[i]) for i in range(stop - offset)]
+
+
+class SeasonTracker:
+    def __init__(self, directory: Optional[str] = None, now: Optional[datetime] = None):
+        # Sem diretório, as temporadas encerradas ficam em memória no mesmo formato binário
+        self.directory = directory
+        self.archives: Dict[str, SeasonArchive] = {}
+        self.season_id = season_id_for(now or datetime.now())
+        # jogador -> [baseline, rating, partidas]
+        self.participants: Dict[str, List[int]] = {}
+        self.index = RankingIndex()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            for name in sorted(os.listdir(directory)):
+                if name.startswith("season-") and name.endswith(".bin"):
+                    season_id = name[len("season-"):-len(".bin")]
+                    self.archives[season_id] = SeasonArchive.open(os.path.join(directory, name), season_id)
+
+    def record_game(self, player_id: str, rating_before: int, rating_after: int):
+        # O rating só muda com partidas, então o rating antes da primeira partida da
+        # temporada é o rating do início da temporada
+        participant = self.participants.get(player_id)
+        if participant is None:
+            participant = self.participants[player_id] = [rating_before, rating_before, 0]
+        participant[1] = rating_after
+        participant[2] += 1
+        self.index.update(player_id, rating_after, participant[2])
+
+    def maybe_rollover(self, moment: datetime) -> bool:
+        season_id = season_id_for(moment)
+        if season_id <= self.season_id:
+            return False
+        self.rollover(season_id)
+        return True
+
+    def rollover(self, next_season_id: str):
+        # Congela a classificação final da temporada atual e inicia a próxima
+        player_ids = self.index.range(0, len(self.participants))
+        participants = self.participants
+        rows = np.fromiter(chain.from_iterable(map(participants.__getitem__, player_ids)),
+                           dtype=np.int32, count=3 * len(player_ids)).reshape(-1, 3)
+        start, end = season_bounds(self.season_id)
+        data = encode_archive(player_ids, rows[:, 1], rows[:, 0], rows[:, 2], start, end)
+        if self.directory:
+            path = archive_path(self.directory, self.season_id)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+            self.archives[self.season_id] = SeasonArchive.open(path, self.season_id)
+        else:
+            self.archives[self.season_id] = SeasonArchive(self.season_id, data)
+
+        self.season_id = next_season_id
+        self.participants = {}
+        self.index = RankingIndex()
+
+    def standings(self, season_id: str, offset: int, limit: int) -> Tuple[List[Tuple[str, int, int, int]], int, datetime, datetime]:
+        # (jogador, rating, baseline, partidas) em ordem de classificação, total, início e fim
+        if season_id == self.season_id:
+            rows = []
+            for player_id in self.index.range(offset, limit):
+                baseline, rating, games = self.participants[player_id]
+                rows.append((player_id, rating, baseline, games))
+            start, end = season_bounds(season_id)
+            return rows, len(self.participants), start, end
+        archive = self.archives.get(season_id)
+        if archive is None:
+            raise ValueError("Temporada não encontrada")
+        return archive.page(offset, limit), archive.count, archive.start, archive.end
+
+    # ----- snapshot -----
+
+    def export_state(self) -> Dict:
+        # Temporadas encerradas já estão em seus arquivos; o snapshot guarda só a atual
+        return {"season_id": self.season_id, "participants": self.participants}
+
+    def import_state(self, state: Dict):
+        self.season_id = state["season_id"]
+        self.participants = state["participants"]
+        self.index = RankingIndex()
+        self.index.rebuild((player_id, p[1], p[2]) for player_id, p in self.participants.items())
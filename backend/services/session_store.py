@@ -0,0 +1,184 @@
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from services.event_store import EventLog, list_segments, read_segment, segment_path
+
+# Sessões de jogo indexadas pelo ID (e por usuário: ID do usuário -> sessões), com IDs
+# de um contador atômico. O userId é guardado sempre como string (a API recebe números
+# ou strings), para índices, atividade e consultas concordarem. Cada sessão tem um prazo: sessões ativas expiram após
+# idle_ttl segundos sem atividade (criação, consulta) e viram "abandoned"; sessões
+# finalizadas ficam consultáveis por completed_ttl segundos. Os prazos ficam numa
+# timer wheel de `tick` segundos com uma volta maior que o maior TTL: agendar, remarcar
+# e expirar custam O(1) por sessão, e a roda avança a cada operação sem varrer as
+# sessões. Com mais de max_sessions, saem antes as sessões de prazo mais próximo
+# ("evicted" se ainda ativas), então a memória fica limitada mesmo com milhões de
+# sessões por dia.
+# Com archive_dir, cada sessão que sai da memória é gravada num log de eventos
+# (services.event_store), lido de volta com read_archive().
+
+DEFAULT_IDLE_TTL = 30 * 60
+DEFAULT_COMPLETED_TTL = 5 * 60
+DEFAULT_MAX_SESSIONS = 100000
+EVENT_SESSION_ARCHIVED = 1
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds").replace("+00:00", "Z")
+
+
+def read_archive(directory: str) -> Iterator[Dict]:
+    for segment in list_segments(directory):
+        for event_type, payload in read_segment(segment_path(directory, segment)):
+            if event_type == EVENT_SESSION_ARCHIVED:
+                yield json.loads(payload)
+
+
+class SessionStore:
+    def __init__(self, idle_ttl: float = DEFAULT_IDLE_TTL, completed_ttl: float = DEFAULT_COMPLETED_TTL,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS, archive_dir: Optional[str] = None,
+                 tick: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.idle_ttl = idle_ttl
+        self.completed_ttl = completed_ttl
+        self.max_sessions = max_sessions
+        self.tick = tick
+        self.clock = clock
+        self.by_id: Dict[int, Dict] = {}
+        self.by_user: Dict[str, Dict[int, Dict]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        # Roda: slot (tick do prazo % tamanho) -> IDs; _deadlines guarda o tick de cada sessão
+        self._wheel: List[set] = [set() for _ in range(math.ceil(max(idle_ttl, completed_ttl) / tick) + 2)]
+        self._deadlines: Dict[int, int] = {}
+        self._current = self._now_tick()
+        self.archive: Optional[EventLog] = None
+        if archive_dir:
+            os.makedirs(archive_dir, exist_ok=True)
+            segments = list_segments(archive_dir)
+            self.archive = EventLog(archive_dir, segments[-1] + 1 if segments else 0)
+        self.expired = 0
+        self.evicted = 0
+        self.archived = 0
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def _now_tick(self) -> int:
+        return int(self.clock() // self.tick)
+
+    def _schedule(self, session_id: int, ttl: float):
+        previous = self._deadlines.get(session_id)
+        if previous is not None:
+            self._wheel[previous % len(self._wheel)].discard(session_id)
+        deadline = math.ceil((self.clock() + ttl) / self.tick)
+        self._deadlines[session_id] = deadline
+        self._wheel[deadline % len(self._wheel)].add(session_id)
+
+    def _remove(self, session_id: int, status: str):
+        del self._deadlines[session_id]
+        session = self.by_id.pop(session_id)
+        user_sessions = self.by_user[session["userId"]]
+        del user_sessions[session_id]
+        if not user_sessions:
+            del self.by_user[session["userId"]]
+        if session["status"] == "active":
+            session["status"] = status
+            session["endTime"] = utc_now()
+        if self.archive is not None:
+            self.archive.append(EVENT_SESSION_ARCHIVED, json.dumps(session, ensure_ascii=False).encode("utf-8"))
+            self.archived += 1
+
+    def _advance(self):
+        # Expira os slots dos ticks já passados; como a volta da roda é maior que o
+        # maior TTL, tudo num slot vencido tem prazo nesse tick
+        now = self._now_tick()
+        size = len(self._wheel)
+        for tick in range(max(self._current + 1, now - size + 1), now + 1):
+            slot = self._wheel[tick % size]
+            while slot:
+                self._remove(slot.pop(), "abandoned")
+                self.expired += 1
+        self._current = max(self._current, now)
+
+    def _make_room(self):
+        # Acima do limite, saem as sessões de prazo mais próximo
+        size = len(self._wheel)
+        tick = self._current + 1
+        while len(self.by_id) >= self.max_sessions:
+            slot = self._wheel[tick % size]
+            while slot and len(self.by_id) >= self.max_sessions:
+                self._remove(slot.pop(), "evicted")
+                self.evicted += 1
+            tick += 1
+
+    def create(self, user_id, game_id, mode, **extra) -> Dict:
+        with self._lock:
+            self._advance()
+            self._make_room()
+            session_id = next(self._ids)
+            session = {
+                "id": session_id,
+                "userId": str(user_id),
+                "gameId": game_id,
+                "mode": mode,
+                "startTime": utc_now(),
+                "status": "active",
+                **extra,
+            }
+            self.by_id[session_id] = session
+            self.by_user.setdefault(session["userId"], {})[session_id] = session
+            self._schedule(session_id, self.idle_ttl)
+        return session
+
+    def get(self, session_id: int) -> Optional[Dict]:
+        # Consultar uma sessão ativa conta como atividade
+        with self._lock:
+            self._advance()
+            session = self.by_id.get(session_id)
+            if session is not None and session["status"] == "active":
+                self._schedule(session_id, self.idle_ttl)
+        return session
+
+    def for_user(self, user_id) -> List[Dict]:
+        with self._lock:
+            self._advance()
+            return list(self.by_user.get(str(user_id), {}).values())
+
+    def end(self, session_id: int) -> Optional[Dict]:
+        with self._lock:
+            self._advance()
+            session = self.by_id.get(session_id)
+            if session is None:
+                return None
+            if session["status"] == "active":
+                session["status"] = "completed"
+                session["endTime"] = utc_now()
+                self._schedule(session_id, self.completed_ttl)
+        return session
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._advance()
+            return {
+                "sessions": len(self.by_id),
+                "active": sum(1 for session in self.by_id.values() if session["status"] == "active"),
+                "users": len(self.by_user),
+                "maxSessions": self.max_sessions,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "archived": self.archived,
+            }
+
+    def close(self):
+        # Sessões finalizadas ainda em memória também vão para o arquivo
+        if self.archive is None:
+            return
+        with self._lock:
+            for session_id in [s for s, session in self.by_id.items() if session["status"] != "active"]:
+                self._remove(session_id, "completed")
+            self.archive.close()
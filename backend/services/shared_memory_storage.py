@@ -0,0 +1,663 @@
+import fcntl
+import os
+import tempfile
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from services.columnar_store import MAX_ACHIEVEMENTS
+
+# Backend em memória compartilhada (multiprocessing.shared_memory) para o LeaderboardService:
+# vários processos de um servidor WSGI (ex.: workers do gunicorn) abrem o mesmo segmento
+# pelo nome e servem um único leaderboard.
+#
+# O segmento tem capacidade fixa e guarda só arrays: campos numéricos dos jogadores,
+# textos em largura fixa (UTF-8), conquistas como bitmask, um índice id -> linha por
+# endereçamento aberto, estatísticas dos jogos, as entradas por jogo em arrays densos
+# [jogo, campo, linha do jogador] e a ordem de cada ranking (global e por jogo) como
+# arrays ordenados: posição por busca binária e páginas como fatias, então as leituras
+# custam O(log n + página) e seguram o lock por pouco tempo.
+#
+# Lock entre processos: flock em um arquivo ao lado do segmento — compartilhado para
+# leituras, exclusivo para escritas. Cada thread usa seu próprio descritor (flock vale
+# por descritor aberto, não por thread). Não há rollback: uma exceção no meio de uma
+# transação deixa gravado o que já foi escrito (o serviço valida antes de escrever).
+#
+# Processos servindo o segmento: cada um segura um lock POSIX (lockf) compartilhado num
+# arquivo de membros, registrado no primeiro uso pela API (attach_process). Locks POSIX
+# são por processo e não passam por fork, e o lock do próprio processo não conflita
+# com ele: tentar convertê-lo em exclusivo sem bloquear só falha se outro processo
+# também está registrado (shared_with_other_processes), sem soltar o lock no caminho.
+#
+# O segmento sobrevive aos processos que o usam (reinícios de workers mantêm o
+# leaderboard) e só é removido por destroy().
+
+MAGIC = 0x4F445953
+DEFAULT_CAPACITY = 100_000
+MAX_GAMES = 16
+
+ID_BYTES = 32
+NAME_BYTES = 64
+AVATAR_BYTES = 16
+GAME_BYTES = 32
+ACHIEVEMENT_BYTES = 32
+
+# Cabeçalho: int64 por campo
+(HEADER_MAGIC, HEADER_CAPACITY, HEADER_PLAYERS, HEADER_GAMES, HEADER_ACHIEVEMENTS, HEADER_GENERATION,
+ HEADER_LEVEL_SUM) = range(7)
+HEADER_FIELDS = 8
+
+# Colunas inteiras dos jogadores (int64, uma linha por jogador)
+RATING, EXPERIENCE, LEVEL, GAMES_PLAYED, GAMES_WON, CURRENT_STREAK, BEST_STREAK = range(7)
+JOIN_DATE, LAST_ACTIVE = range(2)
+# Entradas por jogo (int32)
+ENTRY_RATING, ENTRY_GAMES_PLAYED, ENTRY_GAMES_WON = range(3)
+GAME_STATS_FIELDS = ("totalGames", "totalPlayers", "averageGameTime")
+# Rankings: 0 é o global, 1 + posição do jogo os por jogo
+GLOBAL_RANKING = 0
+
+# Jogadores lidos por vez (sob o lock de leitura) em iter_players
+ITER_CHUNK = 4096
+ALIGNMENT = 64
+
+
+def _layout(capacity: int) -> List[Tuple[str, str, Tuple[int, ...]]]:
+    # (atributo, dtype, forma) de cada região, na ordem do segmento
+    slots = 1 << (2 * capacity - 1).bit_length()
+    return [
+        ("_header", "i8", (HEADER_FIELDS,)),
+        ("_ids", f"S{ID_BYTES}", (capacity,)),
+        ("_names", f"S{NAME_BYTES}", (capacity,)),
+        ("_avatars", f"S{AVATAR_BYTES}", (capacity,)),
+        ("_favorite_games", f"S{GAME_BYTES}", (capacity,)),
+        ("_numbers", "i8", (capacity, 7)),
+        ("_times", "f8", (capacity, 2)),
+        ("_achievements", "u8", (capacity,)),
+        # Índice id -> linha: linha + 1 (0 = vazio), sondagem linear a partir do crc32 do id
+        ("_slots", "i4", (slots,)),
+        ("_game_names", f"S{GAME_BYTES}", (MAX_GAMES,)),
+        ("_game_stats", "i8", (MAX_GAMES, len(GAME_STATS_FIELDS))),
+        ("_achievement_table", f"S{ACHIEVEMENT_BYTES}", (MAX_ACHIEVEMENTS,)),
+        ("_entry_present", "u1", (MAX_GAMES, capacity)),
+        ("_entries", "i4", (MAX_GAMES, 3, capacity)),
+        # Ordem dos rankings: chaves negadas em ordem crescente e a linha em cada posição
+        ("_rank_keys", "i8", (1 + MAX_GAMES, capacity)),
+        ("_rank_rows", "i4", (1 + MAX_GAMES, capacity)),
+        ("_rank_counts", "i8", (1 + MAX_GAMES,)),
+    ]
+
+
+def _regions(capacity: int) -> Tuple[List[Tuple[str, np.dtype, Tuple[int, ...], int]], int]:
+    regions = []
+    offset = 0
+    for attribute, dtype, shape in _layout(capacity):
+        dtype = np.dtype(dtype)
+        regions.append((attribute, dtype, shape, offset))
+        offset += -(-dtype.itemsize * int(np.prod(shape)) // ALIGNMENT) * ALIGNMENT
+    return regions, offset
+
+
+def _encode(value: Optional[str], width: int, field: str) -> bytes:
+    if value is None:
+        return b""
+    data = str(value).encode("utf-8")
+    if len(data) > width:
+        raise ValueError(f"Campo {field} excede {width} bytes")
+    return data
+
+
+def _decode(value: bytes) -> Optional[str]:
+    return value.decode("utf-8") if value else None
+
+
+def _player_key(rating: int, experience: int) -> int:
+    # rating nos bits altos, experiência (< 2^40) nos baixos: (rating, experiência) numa chave int64
+    return (rating << 40) + experience
+
+
+def _entry_key(rating: int, games_played: int) -> int:
+    return (rating << 32) + games_played
+
+
+class _SortedIndex:
+    # Ordem de um ranking no segmento: chaves negadas em ordem crescente (maior chave
+    # primeiro) e a linha do jogador em cada posição; empates de chave na ordem dos ids.
+    # Mover um jogador desloca só o trecho entre a posição antiga e a nova
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, counts: np.ndarray, ranking: int, ids: np.ndarray):
+        self.keys = keys
+        self.rows = rows
+        self.counts = counts
+        self.ranking = ranking
+        self.ids = ids
+
+    def __len__(self) -> int:
+        return int(self.counts[self.ranking])
+
+    def position(self, key: int, key_id: bytes, after: bool = False) -> int:
+        # Posição base 0 de (key, key_id); com after=True, a primeira depois dele
+        keys = self.keys[:len(self)]
+        lo = int(np.searchsorted(keys, -key, "left"))
+        hi = int(np.searchsorted(keys, -key, "right"))
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_id = self.ids[self.rows[mid]]
+            if mid_id < key_id or (after and mid_id == key_id):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def insert(self, key: int, key_id: bytes, row: int):
+        count = len(self)
+        position = self.position(key, key_id)
+        self.keys[position + 1:count + 1] = self.keys[position:count]
+        self.rows[position + 1:count + 1] = self.rows[position:count]
+        self.keys[position] = -key
+        self.rows[position] = row
+        self.counts[self.ranking] = count + 1
+
+    def move(self, old_key: int, new_key: int, key_id: bytes, row: int):
+        if old_key == new_key:
+            return
+        old = self.position(old_key, key_id)
+        new = self.position(new_key, key_id)
+        if new > old:
+            # A posição nova foi contada com o jogador ainda na antiga
+            new -= 1
+            self.keys[old:new] = self.keys[old + 1:new + 1]
+            self.rows[old:new] = self.rows[old + 1:new + 1]
+        else:
+            self.keys[new + 1:old + 1] = self.keys[new:old]
+            self.rows[new + 1:old + 1] = self.rows[new:old]
+        self.keys[new] = -new_key
+        self.rows[new] = row
+
+    def page(self, offset: int, limit: int) -> List[int]:
+        return self.rows[offset:max(offset, min(offset + limit, len(self)))].tolist()
+
+
+class SharedMemoryStorage:
+    durable = True
+    shared = True
+    deferred_indexing = False
+
+    def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY):
+        # Abre o segmento `name` ou o cria com `capacity` jogadores; ao abrir um segmento
+        # existente vale a capacidade com que ele foi criado
+        self.name = name
+        self.lock_path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+        self.members_path = os.path.join(tempfile.gettempdir(), f"{name}.members")
+        self._local = threading.local()
+        self._member_lock = threading.Lock()
+        self._member_fd: Optional[int] = None
+        self._member_pid: Optional[int] = None
+        self._game_slots: Dict[str, int] = {}
+        self._achievement_bits: Dict[str, int] = {}
+        self._achievement_names: List[str] = []
+        with self.transaction():
+            try:
+                self._segment = shared_memory.SharedMemory(name=name)
+                created = False
+            except FileNotFoundError:
+                self._segment = shared_memory.SharedMemory(name=name, create=True, size=_regions(capacity)[1])
+                created = True
+            # O resource_tracker removeria o segmento quando este processo terminasse
+            resource_tracker.unregister(self._segment._name, "shared_memory")
+            header = np.ndarray((HEADER_FIELDS,), dtype=np.int64, buffer=self._segment.buf)
+            if created:
+                header[HEADER_MAGIC] = MAGIC
+                header[HEADER_CAPACITY] = capacity
+            elif header[HEADER_MAGIC] != MAGIC:
+                raise ValueError(f"Segmento {name} não é um armazenamento do leaderboard")
+            self.capacity = int(header[HEADER_CAPACITY])
+            del header
+            for attribute, dtype, shape, offset in _regions(self.capacity)[0]:
+                setattr(self, attribute, np.ndarray(shape, dtype=dtype, buffer=self._segment.buf, offset=offset))
+        self._slot_mask = len(self._slots) - 1
+        self._rankings = [_SortedIndex(self._rank_keys[ranking], self._rank_rows[ranking], self._rank_counts,
+                                       ranking, self._ids) for ranking in range(1 + MAX_GAMES)]
+
+    # ===== LOCK ENTRE PROCESSOS =====
+
+    def _lock_fd(self) -> int:
+        local = self._local
+        pid = os.getpid()
+        if getattr(local, "pid", None) != pid:
+            # Primeiro uso na thread, ou processo filho: um descritor herdado por fork
+            # dividiria o flock com o processo pai
+            if getattr(local, "fd", None) is not None:
+                os.close(local.fd)
+            local.fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            local.pid = pid
+            local.depth = 0
+        return local.fd
+
+    @contextmanager
+    def _reading(self):
+        fd = self._lock_fd()
+        if self._local.depth:
+            # Dentro de uma transação desta thread o lock exclusivo já está com ela
+            yield
+            return
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def transaction(self):
+        # Escritas com exclusividade entre processos (aninhável); cada transação
+        # encerrada avança a geração vista pelos outros processos
+        fd = self._lock_fd()
+        local = self._local
+        if not local.depth:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        local.depth += 1
+        try:
+            yield
+        finally:
+            local.depth -= 1
+            if not local.depth:
+                if getattr(self, "_header", None) is not None:
+                    self._header[HEADER_GENERATION] += 1
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def attach_process(self):
+        # Registra este processo entre os que servem o segmento (uma vez por processo)
+        pid = os.getpid()
+        if self._member_pid == pid:
+            return
+        with self._member_lock:
+            if self._member_pid != pid:
+                # Um descritor herdado por fork fica aberto: fechá-lo soltaria os locks deste processo
+                fd = os.open(self.members_path, os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.lockf(fd, fcntl.LOCK_SH)
+                self._member_fd, self._member_pid = fd, pid
+
+    def shared_with_other_processes(self) -> bool:
+        # Outro processo registrado com attach_process ainda aberto?
+        self.attach_process()
+        with self._member_lock:
+            try:
+                fcntl.lockf(self._member_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return True
+            fcntl.lockf(self._member_fd, fcntl.LOCK_SH)
+        return False
+
+    def generation(self) -> int:
+        # Contador de transações de todos os processos; muda a cada escrita
+        return int(self._header[HEADER_GENERATION])
+
+    def close(self):
+        # Solta os arrays (o mapeamento só fecha sem views vivas); o segmento continua
+        self._rankings = None
+        for attribute, _, _ in _layout(self.capacity):
+            setattr(self, attribute, None)
+        self._segment.close()
+        fd = getattr(self._local, "fd", None)
+        if fd is not None and self._local.pid == os.getpid():
+            os.close(fd)
+            self._local.fd = None
+        if self._member_pid == os.getpid():
+            os.close(self._member_fd)
+            self._member_fd = self._member_pid = None
+
+    def destroy(self):
+        # Remove o segmento e o arquivo de lock (com todos os processos já encerrados)
+        self.close()
+        # unlink() cancela o registro no resource_tracker, desfeito ao abrir
+        resource_tracker.register(self._segment._name, "shared_memory")
+        self._segment.unlink()
+        for path in (self.lock_path, self.members_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def after_fork(self):
+        # O mapeamento é herdado; o descritor do lock é reaberto no primeiro uso (_lock_fd)
+        # e o registro de membro, no próximo attach_process
+        pass
+
+    def is_empty(self) -> bool:
+        with self._reading():
+            return not self._header[HEADER_PLAYERS] and not self._header[HEADER_GAMES]
+
+    # ===== ÍNDICE id -> linha =====
+
+    def _find(self, key: bytes) -> int:
+        slot = zlib.crc32(key) & self._slot_mask
+        while True:
+            value = int(self._slots[slot])
+            if not value:
+                return -1
+            if self._ids[value - 1] == key:
+                return value - 1
+            slot = (slot + 1) & self._slot_mask
+
+    def _insert(self, key: bytes, row: int):
+        slot = zlib.crc32(key) & self._slot_mask
+        while self._slots[slot]:
+            slot = (slot + 1) & self._slot_mask
+        self._slots[slot] = row + 1
+
+    def _row(self, player_id: str) -> int:
+        try:
+            return self._find(str(player_id).encode("utf-8"))
+        except UnicodeEncodeError:
+            return -1
+
+    # ===== JOGADORES =====
+
+    def _achievement_mask(self, achievements: Iterable[str]) -> int:
+        mask = 0
+        for achievement in achievements:
+            bit = self._achievement_bits.get(achievement)
+            if bit is None:
+                self._refresh_achievements()
+                bit = self._achievement_bits.get(achievement)
+            if bit is None:
+                bit = len(self._achievement_names)
+                if bit >= MAX_ACHIEVEMENTS:
+                    raise ValueError(f"Limite de {MAX_ACHIEVEMENTS} conquistas distintas atingido")
+                self._achievement_table[bit] = _encode(achievement, ACHIEVEMENT_BYTES, "achievements")
+                self._header[HEADER_ACHIEVEMENTS] = bit + 1
+                self._refresh_achievements()
+            mask |= 1 << bit
+        return mask
+
+    def _refresh_achievements(self):
+        # Nomes de conquistas acrescentados por outros processos
+        count = int(self._header[HEADER_ACHIEVEMENTS])
+        if count != len(self._achievement_names):
+            self._achievement_names = [name.decode("utf-8") for name in self._achievement_table[:count].tolist()]
+            self._achievement_bits = {name: bit for bit, name in enumerate(self._achievement_names)}
+
+    def _achievement_list(self, mask: int) -> List[str]:
+        if mask >> len(self._achievement_names):
+            self._refresh_achievements()
+        return [name for bit, name in enumerate(self._achievement_names) if mask >> bit & 1]
+
+    def _player(self, row: int) -> Dict:
+        rating, experience, level, games_played, games_won, current_streak, best_streak = self._numbers[row].tolist()
+        join_date, last_active = self._times[row].tolist()
+        return {
+            "id": self._ids[row].decode("utf-8"),
+            "name": self._names[row].decode("utf-8"),
+            "avatar": _decode(self._avatars[row]),
+            "level": level,
+            "experience": experience,
+            "gamesPlayed": games_played,
+            "gamesWon": games_won,
+            "currentStreak": current_streak,
+            "bestStreak": best_streak,
+            "favoriteGame": _decode(self._favorite_games[row]),
+            "joinDate": datetime.fromtimestamp(join_date),
+            "lastActive": datetime.fromtimestamp(last_active),
+            "achievements": self._achievement_list(int(self._achievements[row])),
+            "rating": rating,
+        }
+
+    def has_player(self, player_id: str) -> bool:
+        with self._reading():
+            return self._row(player_id) >= 0
+
+    def get_player(self, player_id: str) -> Optional[Dict]:
+        with self._reading():
+            row = self._row(player_id)
+            return self._player(row) if row >= 0 else None
+
+    def get_players(self, player_ids: Iterable[str]) -> List[Dict]:
+        with self._reading():
+            players = []
+            for player_id in player_ids:
+                row = self._row(player_id)
+                if row < 0:
+                    raise KeyError(player_id)
+                players.append(self._player(row))
+            return players
+
+    def iter_players(self) -> Iterator[Dict]:
+        # Em blocos, para não segurar o lock de leitura enquanto o chamador processa
+        start = 0
+        while True:
+            with self._reading():
+                end = min(start + ITER_CHUNK, int(self._header[HEADER_PLAYERS]))
+                chunk = [self._player(row) for row in range(start, end)]
+            if not chunk:
+                return
+            yield from chunk
+            start = end
+
+    def player_ids(self) -> List[str]:
+        with self._reading():
+            return [player_id.decode("utf-8") for player_id in self._ids[:self._header[HEADER_PLAYERS]].tolist()]
+
+    def add_player(self, player: Dict):
+        self.save_player(player)
+
+    def save_player(self, player: Dict):
+        with self.transaction():
+            self._write_player(player)
+
+    def save_players(self, players: Iterable[Dict]):
+        with self.transaction():
+            for player in players:
+                self._write_player(player)
+
+    def _write_player(self, player: Dict):
+        # Insere ou atualiza (upsert, como o SQLiteStorage); tudo validado antes de gravar
+        key = _encode(player["id"], ID_BYTES, "id")
+        name = _encode(player["name"], NAME_BYTES, "name")
+        avatar = _encode(player.get("avatar"), AVATAR_BYTES, "avatar")
+        favorite_game = _encode(player.get("favoriteGame"), GAME_BYTES, "favoriteGame")
+        numbers = (player["rating"], player["experience"], player["level"], player["gamesPlayed"],
+                   player["gamesWon"], player["currentStreak"], player["bestStreak"])
+        times = (player["joinDate"].timestamp(), player["lastActive"].timestamp())
+        mask = self._achievement_mask(player["achievements"])
+
+        ranking = self._rankings[GLOBAL_RANKING]
+        new_key = _player_key(player["rating"], player["experience"])
+        row = self._find(key)
+        if row < 0:
+            row = int(self._header[HEADER_PLAYERS])
+            if row >= self.capacity:
+                raise ValueError(f"Armazenamento compartilhado cheio ({self.capacity} jogadores)")
+            self._ids[row] = key
+            self._insert(key, row)
+            self._header[HEADER_PLAYERS] = row + 1
+            ranking.insert(new_key, key, row)
+        else:
+            old = self._numbers[row]
+            ranking.move(_player_key(int(old[RATING]), int(old[EXPERIENCE])), new_key, key, row)
+            self._header[HEADER_LEVEL_SUM] -= old[LEVEL]
+        self._header[HEADER_LEVEL_SUM] += player["level"]
+        self._names[row] = name
+        self._avatars[row] = avatar
+        self._favorite_games[row] = favorite_game
+        self._numbers[row] = numbers
+        self._times[row] = times
+        self._achievements[row] = mask
+
+    def count_players(self) -> int:
+        return int(self._header[HEADER_PLAYERS])
+
+    def player_rank(self, player_id: str) -> Optional[int]:
+        with self._reading():
+            row = self._row(player_id)
+            if row < 0:
+                return None
+            numbers = self._numbers[row]
+            key = _player_key(int(numbers[RATING]), int(numbers[EXPERIENCE]))
+            return self._rankings[GLOBAL_RANKING].position(key, self._ids[row]) + 1
+
+    def top_players(self, offset: int, limit: int) -> List[Dict]:
+        with self._reading():
+            return [self._player(row) for row in self._rankings[GLOBAL_RANKING].page(offset, limit)]
+
+    def players_after(self, rating: int, experience: int, player_id: str, limit: int) -> Tuple[int, List[Dict]]:
+        with self._reading():
+            ranking = self._rankings[GLOBAL_RANKING]
+            offset = ranking.position(_player_key(rating, experience), player_id.encode("utf-8"), after=True)
+            return offset, [self._player(row) for row in ranking.page(offset, limit)]
+
+    def players_around(self, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        with self._reading():
+            row = self._row(player_id)
+            if row < 0:
+                return None
+            numbers = self._numbers[row]
+            ranking = self._rankings[GLOBAL_RANKING]
+            position = ranking.position(_player_key(int(numbers[RATING]), int(numbers[EXPERIENCE])), self._ids[row])
+            offset = max(0, position - radius)
+            return offset, [self._player(r) for r in ranking.page(offset, position - offset + radius + 1)]
+
+    def count_active_since(self, since: datetime) -> int:
+        with self._reading():
+            last_active = self._times[:self._header[HEADER_PLAYERS], LAST_ACTIVE]
+            return int(np.count_nonzero(last_active > since.timestamp()))
+
+    def average_level(self) -> float:
+        count = int(self._header[HEADER_PLAYERS])
+        return int(self._header[HEADER_LEVEL_SUM]) / count if count else 0
+
+    # ===== JOGOS =====
+
+    def _game_slot(self, game: str) -> int:
+        slot = self._game_slots.get(game)
+        if slot is None:
+            # Jogos cadastrados por outros processos
+            count = int(self._header[HEADER_GAMES])
+            names = self._game_names[:count].tolist()
+            self._game_slots = {name.decode("utf-8"): i for i, name in enumerate(names)}
+            slot = self._game_slots.get(game)
+            if slot is None:
+                raise KeyError(game)
+        return slot
+
+    def add_game(self, game: str, stats: Dict):
+        self.save_game_stats(game, stats)
+
+    def has_game(self, game: str) -> bool:
+        with self._reading():
+            try:
+                self._game_slot(game)
+            except KeyError:
+                return False
+            return True
+
+    def _stats(self, slot: int) -> Dict:
+        return dict(zip(GAME_STATS_FIELDS, self._game_stats[slot].tolist()))
+
+    def get_game_stats(self, game: str) -> Dict:
+        with self._reading():
+            return self._stats(self._game_slot(game))
+
+    def all_game_stats(self) -> Dict[str, Dict]:
+        with self._reading():
+            count = int(self._header[HEADER_GAMES])
+            names = self._game_names[:count].tolist()
+            return {name.decode("utf-8"): self._stats(slot) for slot, name in enumerate(names)}
+
+    def save_game_stats(self, game: str, stats: Dict):
+        with self.transaction():
+            values = [stats[field] for field in GAME_STATS_FIELDS]
+            try:
+                slot = self._game_slot(game)
+            except KeyError:
+                slot = int(self._header[HEADER_GAMES])
+                if slot >= MAX_GAMES:
+                    raise ValueError(f"Limite de {MAX_GAMES} jogos atingido")
+                self._game_names[slot] = _encode(game, GAME_BYTES, "game")
+                self._header[HEADER_GAMES] = slot + 1
+            self._game_stats[slot] = values
+
+    def _entry(self, slot: int, row: int) -> Dict:
+        rating, games_played, games_won = self._entries[slot, :, row].tolist()
+        return {
+            "playerId": self._ids[row].decode("utf-8"),
+            "playerName": self._names[row].decode("utf-8"),
+            "rating": rating,
+            "gamesPlayed": games_played,
+            "gamesWon": games_won,
+            "winRate": games_won / games_played if games_played > 0 else 0,
+        }
+
+    def get_game_entry(self, game: str, player_id: str) -> Optional[Dict]:
+        with self._reading():
+            slot = self._game_slot(game)
+            row = self._row(player_id)
+            return self._entry(slot, row) if row >= 0 and self._entry_present[slot, row] else None
+
+    def add_game_entry(self, game: str, entry: Dict):
+        self.save_game_entry(game, entry)
+
+    def save_game_entry(self, game: str, entry: Dict):
+        # O nome exibido vem da linha do jogador (playerName não é guardado por entrada)
+        with self.transaction():
+            slot = self._game_slot(game)
+            row = self._row(entry["playerId"])
+            if row < 0:
+                raise KeyError(entry["playerId"])
+            ranking = self._rankings[1 + slot]
+            new_key = _entry_key(entry["rating"], entry["gamesPlayed"])
+            if self._entry_present[slot, row]:
+                old = self._entries[slot, :, row]
+                ranking.move(_entry_key(int(old[ENTRY_RATING]), int(old[ENTRY_GAMES_PLAYED])), new_key,
+                             self._ids[row], row)
+            else:
+                ranking.insert(new_key, self._ids[row], row)
+            self._entries[slot, :, row] = (entry["rating"], entry["gamesPlayed"], entry["gamesWon"])
+            self._entry_present[slot, row] = 1
+
+    def _entry_position(self, slot: int, row: int) -> int:
+        entry = self._entries[slot, :, row]
+        key = _entry_key(int(entry[ENTRY_RATING]), int(entry[ENTRY_GAMES_PLAYED]))
+        return self._rankings[1 + slot].position(key, self._ids[row])
+
+    def game_rank(self, game: str, player_id: str) -> Optional[int]:
+        with self._reading():
+            slot = self._game_slot(game)
+            row = self._row(player_id)
+            if row < 0 or not self._entry_present[slot, row]:
+                return None
+            return self._entry_position(slot, row) + 1
+
+    def top_game_entries(self, game: str, offset: int, limit: int) -> List[Dict]:
+        with self._reading():
+            slot = self._game_slot(game)
+            return [self._entry(slot, row) for row in self._rankings[1 + slot].page(offset, limit)]
+
+    def game_entries_after(self, game: str, rating: int, games_played: int, player_id: str,
+                           limit: int) -> Tuple[int, List[Dict]]:
+        with self._reading():
+            slot = self._game_slot(game)
+            ranking = self._rankings[1 + slot]
+            offset = ranking.position(_entry_key(rating, games_played), player_id.encode("utf-8"), after=True)
+            return offset, [self._entry(slot, row) for row in ranking.page(offset, limit)]
+
+    def game_entries_around(self, game: str, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        with self._reading():
+            slot = self._game_slot(game)
+            row = self._row(player_id)
+            if row < 0 or not self._entry_present[slot, row]:
+                return None
+            position = self._entry_position(slot, row)
+            offset = max(0, position - radius)
+            rows = self._rankings[1 + slot].page(offset, position - offset + radius + 1)
+            return offset, [self._entry(slot, r) for r in rows]
+
+    def player_game_entries(self, player_id: str) -> Dict[str, Dict]:
+        with self._reading():
+            row = self._row(player_id)
+            if row < 0:
+                return {}
+            count = int(self._header[HEADER_GAMES])
+            names = self._game_names[:count].tolist()
+            return {name.decode("utf-8"): self._entry(slot, row)
+                    for slot, name in enumerate(names) if self._entry_present[slot, row]}
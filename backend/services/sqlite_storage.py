@@ -0,0 +1,402 @@
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Backend SQLite (WAL) para o LeaderboardService: as consultas de ranking e estatísticas
+# rodam sobre índices em vez de varrer dicionários em Python.
+# Cada thread reutiliza sua própria conexão; o cache de statements do sqlite3 mantém
+# as consultas (SQL constante) já compiladas entre chamadas.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    avatar TEXT,
+    level INTEGER NOT NULL,
+    experience INTEGER NOT NULL,
+    games_played INTEGER NOT NULL,
+    games_won INTEGER NOT NULL,
+    current_streak INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL,
+    favorite_game TEXT,
+    join_date REAL NOT NULL,
+    last_active REAL NOT NULL,
+    achievements TEXT NOT NULL,
+    rating INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_players_ranking ON players (rating DESC, experience DESC, id);
+CREATE INDEX IF NOT EXISTS idx_players_last_active ON players (last_active);
+
+CREATE TABLE IF NOT EXISTS game_stats (
+    game TEXT PRIMARY KEY,
+    total_games INTEGER NOT NULL,
+    total_players INTEGER NOT NULL,
+    average_game_time INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS game_players (
+    game TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    player_name TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    games_played INTEGER NOT NULL,
+    games_won INTEGER NOT NULL,
+    PRIMARY KEY (game, player_id)
+);
+CREATE INDEX IF NOT EXISTS idx_game_players_ranking ON game_players (game, rating DESC, games_played DESC, player_id);
+CREATE INDEX IF NOT EXISTS idx_game_players_player ON game_players (player_id);
+"""
+
+PLAYER_COLUMNS = (
+    "id, name, avatar, level, experience, games_played, games_won, current_streak, best_streak, "
+    "favorite_game, join_date, last_active, achievements, rating"
+)
+UPSERT_PLAYER = f"""
+INSERT INTO players ({PLAYER_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name, avatar = excluded.avatar, level = excluded.level,
+    experience = excluded.experience, games_played = excluded.games_played,
+    games_won = excluded.games_won, current_streak = excluded.current_streak,
+    best_streak = excluded.best_streak, favorite_game = excluded.favorite_game,
+    join_date = excluded.join_date, last_active = excluded.last_active,
+    achievements = excluded.achievements, rating = excluded.rating
+"""
+SELECT_PLAYER = f"SELECT {PLAYER_COLUMNS} FROM players WHERE id = ?"
+SELECT_TOP_PLAYERS = f"""
+SELECT {PLAYER_COLUMNS} FROM players
+ORDER BY rating DESC, experience DESC, id LIMIT ? OFFSET ?
+"""
+# Posição = 1 + jogadores que vêm antes na ordem (rating DESC, experience DESC, id)
+SELECT_PLAYER_RANK = """
+SELECT 1
+    + (SELECT COUNT(*) FROM players WHERE rating > :rating)
+    + (SELECT COUNT(*) FROM players WHERE rating = :rating AND experience > :experience)
+    + (SELECT COUNT(*) FROM players WHERE rating = :rating AND experience = :experience AND id < :id)
+"""
+# Paginação por cursor (keyset): faixa no índice de ranking a partir do cursor, nos dois sentidos;
+# só os empates de rating com o cursor são filtrados linha a linha
+SELECT_PLAYERS_AFTER = f"""
+SELECT {PLAYER_COLUMNS} FROM players
+WHERE rating <= :rating
+  AND NOT (rating = :rating AND (experience > :experience OR (experience = :experience AND id <= :id)))
+ORDER BY rating DESC, experience DESC, id LIMIT :limit
+"""
+SELECT_PLAYERS_BEFORE = f"""
+SELECT {PLAYER_COLUMNS} FROM players
+WHERE rating >= :rating
+  AND NOT (rating = :rating AND (experience < :experience OR (experience = :experience AND id >= :id)))
+ORDER BY rating, experience, id DESC LIMIT :limit
+"""
+# Jogadores na posição do cursor ou antes dela
+COUNT_PLAYERS_UP_TO = """
+SELECT (SELECT COUNT(*) FROM players WHERE rating > :rating)
+    + (SELECT COUNT(*) FROM players WHERE rating = :rating AND experience > :experience)
+    + (SELECT COUNT(*) FROM players WHERE rating = :rating AND experience = :experience AND id <= :id)
+"""
+COUNT_ACTIVE_SINCE = "SELECT COUNT(*) FROM players WHERE last_active > ?"
+
+GAME_ENTRY_COLUMNS = "player_id, player_name, rating, games_played, games_won"
+UPSERT_GAME_ENTRY = f"""
+INSERT INTO game_players (game, {GAME_ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (game, player_id) DO UPDATE SET
+    player_name = excluded.player_name, rating = excluded.rating,
+    games_played = excluded.games_played, games_won = excluded.games_won
+"""
+SELECT_GAME_ENTRY = f"SELECT {GAME_ENTRY_COLUMNS} FROM game_players WHERE game = ? AND player_id = ?"
+SELECT_TOP_GAME_ENTRIES = f"""
+SELECT {GAME_ENTRY_COLUMNS} FROM game_players WHERE game = ?
+ORDER BY rating DESC, games_played DESC, player_id LIMIT ? OFFSET ?
+"""
+SELECT_GAME_RANK = """
+SELECT 1
+    + (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating > :rating)
+    + (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating = :rating AND games_played > :games_played)
+    + (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating = :rating
+                                           AND games_played = :games_played AND player_id < :player_id)
+"""
+SELECT_GAME_ENTRIES_AFTER = f"""
+SELECT {GAME_ENTRY_COLUMNS} FROM game_players
+WHERE game = :game AND rating <= :rating
+  AND NOT (rating = :rating AND (games_played > :games_played
+                                 OR (games_played = :games_played AND player_id <= :player_id)))
+ORDER BY rating DESC, games_played DESC, player_id LIMIT :limit
+"""
+SELECT_GAME_ENTRIES_BEFORE = f"""
+SELECT {GAME_ENTRY_COLUMNS} FROM game_players
+WHERE game = :game AND rating >= :rating
+  AND NOT (rating = :rating AND (games_played < :games_played
+                                 OR (games_played = :games_played AND player_id >= :player_id)))
+ORDER BY rating, games_played, player_id DESC LIMIT :limit
+"""
+COUNT_GAME_ENTRIES_UP_TO = """
+SELECT (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating > :rating)
+    + (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating = :rating AND games_played > :games_played)
+    + (SELECT COUNT(*) FROM game_players WHERE game = :game AND rating = :rating
+                                           AND games_played = :games_played AND player_id <= :player_id)
+"""
+SELECT_PLAYER_GAME_ENTRIES = f"SELECT game, {GAME_ENTRY_COLUMNS} FROM game_players WHERE player_id = ?"
+
+UPSERT_GAME_STATS = """
+INSERT INTO game_stats (game, total_games, total_players, average_game_time) VALUES (?, ?, ?, ?)
+ON CONFLICT (game) DO UPDATE SET
+    total_games = excluded.total_games, total_players = excluded.total_players,
+    average_game_time = excluded.average_game_time
+"""
+
+# Limite de parâmetros por consulta IN (...)
+IN_CHUNK = 500
+
+
+def _player_row(player: Dict) -> tuple:
+    return (
+        player["id"], player["name"], player.get("avatar"), player["level"], player["experience"],
+        player["gamesPlayed"], player["gamesWon"], player["currentStreak"], player["bestStreak"],
+        player.get("favoriteGame"), player["joinDate"].timestamp(), player["lastActive"].timestamp(),
+        json.dumps(player["achievements"]), player["rating"],
+    )
+
+
+def _player_from_row(row) -> Dict:
+    return {
+        "id": row[0],
+        "name": row[1],
+        "avatar": row[2],
+        "level": row[3],
+        "experience": row[4],
+        "gamesPlayed": row[5],
+        "gamesWon": row[6],
+        "currentStreak": row[7],
+        "bestStreak": row[8],
+        "favoriteGame": row[9],
+        "joinDate": datetime.fromtimestamp(row[10]),
+        "lastActive": datetime.fromtimestamp(row[11]),
+        "achievements": json.loads(row[12]),
+        "rating": row[13],
+    }
+
+
+def _game_entry_from_row(row) -> Dict:
+    games_played = row[3]
+    return {
+        "playerId": row[0],
+        "playerName": row[1],
+        "rating": row[2],
+        "gamesPlayed": games_played,
+        "gamesWon": row[4],
+        "winRate": row[4] / games_played if games_played > 0 else 0,
+    }
+
+
+class SQLiteStorage:
+    durable = True
+    # Agregados e versões de ranking mantidos pelo serviço, por processo
+    shared = False
+    # Não há índices em memória para adiar; mantido para compatibilidade com MemoryStorage
+    deferred_indexing = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            # isolation_level=None: autocommit fora de transaction()
+            connection = sqlite3.connect(self.path, isolation_level=None, cached_statements=256,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=5000")
+            self._local.connection = connection
+            self._local.depth = 0
+        return connection
+
+    @contextmanager
+    def transaction(self):
+        # Agrupa as gravações de uma operação em uma única transação (aninhável)
+        connection = self._connection()
+        if self._local.depth == 0:
+            connection.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield connection
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                connection.execute("ROLLBACK")
+            raise
+        self._local.depth -= 1
+        if self._local.depth == 0:
+            connection.execute("COMMIT")
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+    def after_fork(self):
+        # Conexões SQLite não podem atravessar fork: o processo filho abre as suas
+        self._local = threading.local()
+
+    def is_empty(self) -> bool:
+        connection = self._connection()
+        return (connection.execute("SELECT 1 FROM players LIMIT 1").fetchone() is None
+                and connection.execute("SELECT 1 FROM game_stats LIMIT 1").fetchone() is None)
+
+    # ===== JOGADORES =====
+
+    def has_player(self, player_id: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM players WHERE id = ?", (player_id,)).fetchone() is not None
+
+    def get_player(self, player_id: str) -> Optional[Dict]:
+        row = self._connection().execute(SELECT_PLAYER, (player_id,)).fetchone()
+        return _player_from_row(row) if row else None
+
+    def get_players(self, player_ids: Iterable[str]) -> List[Dict]:
+        player_ids = list(player_ids)
+        found: Dict[str, Dict] = {}
+        connection = self._connection()
+        for start in range(0, len(player_ids), IN_CHUNK):
+            chunk = player_ids[start:start + IN_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT {PLAYER_COLUMNS} FROM players WHERE id IN ({placeholders})"
+            for row in connection.execute(query, chunk):
+                found[row[0]] = _player_from_row(row)
+        return [found[player_id] for player_id in player_ids]
+
+    def iter_players(self) -> Iterator[Dict]:
+        for row in self._connection().execute(f"SELECT {PLAYER_COLUMNS} FROM players"):
+            yield _player_from_row(row)
+
+    def player_ids(self) -> List[str]:
+        return [row[0] for row in self._connection().execute("SELECT id FROM players")]
+
+    def add_player(self, player: Dict):
+        self.save_player(player)
+
+    def save_player(self, player: Dict):
+        self._connection().execute(UPSERT_PLAYER, _player_row(player))
+
+    def save_players(self, players: Iterable[Dict]):
+        self._connection().executemany(UPSERT_PLAYER, [_player_row(player) for player in players])
+
+    def count_players(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM players").fetchone()[0]
+
+    def player_rank(self, player_id: str) -> Optional[int]:
+        connection = self._connection()
+        row = connection.execute("SELECT rating, experience FROM players WHERE id = ?", (player_id,)).fetchone()
+        if row is None:
+            return None
+        params = {"rating": row[0], "experience": row[1], "id": player_id}
+        return connection.execute(SELECT_PLAYER_RANK, params).fetchone()[0]
+
+    def top_players(self, offset: int, limit: int) -> List[Dict]:
+        rows = self._connection().execute(SELECT_TOP_PLAYERS, (limit, offset))
+        return [_player_from_row(row) for row in rows]
+
+    def players_after(self, rating: int, experience: int, player_id: str, limit: int) -> Tuple[int, List[Dict]]:
+        connection = self._connection()
+        params = {"rating": rating, "experience": experience, "id": player_id, "limit": limit}
+        offset = connection.execute(COUNT_PLAYERS_UP_TO, params).fetchone()[0]
+        return offset, [_player_from_row(row) for row in connection.execute(SELECT_PLAYERS_AFTER, params)]
+
+    def players_around(self, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        connection = self._connection()
+        row = connection.execute(SELECT_PLAYER, (player_id,)).fetchone()
+        if row is None:
+            return None
+        player = _player_from_row(row)
+        params = {"rating": player["rating"], "experience": player["experience"], "id": player_id, "limit": radius}
+        before = [_player_from_row(r) for r in connection.execute(SELECT_PLAYERS_BEFORE, params)]
+        after = [_player_from_row(r) for r in connection.execute(SELECT_PLAYERS_AFTER, params)]
+        offset = connection.execute(SELECT_PLAYER_RANK, params).fetchone()[0] - 1 - len(before)
+        return offset, before[::-1] + [player] + after
+
+    def count_active_since(self, since: datetime) -> int:
+        return self._connection().execute(COUNT_ACTIVE_SINCE, (since.timestamp(),)).fetchone()[0]
+
+    def average_level(self) -> float:
+        return self._connection().execute("SELECT COALESCE(AVG(level), 0) FROM players").fetchone()[0]
+
+    # ===== JOGOS =====
+
+    def add_game(self, game: str, stats: Dict):
+        self.save_game_stats(game, stats)
+
+    def has_game(self, game: str) -> bool:
+        return self._connection().execute("SELECT 1 FROM game_stats WHERE game = ?", (game,)).fetchone() is not None
+
+    def get_game_stats(self, game: str) -> Dict:
+        row = self._connection().execute(
+            "SELECT total_games, total_players, average_game_time FROM game_stats WHERE game = ?", (game,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(game)
+        return {"totalGames": row[0], "totalPlayers": row[1], "averageGameTime": row[2]}
+
+    def all_game_stats(self) -> Dict[str, Dict]:
+        rows = self._connection().execute(
+            "SELECT game, total_games, total_players, average_game_time FROM game_stats ORDER BY rowid"
+        )
+        return {row[0]: {"totalGames": row[1], "totalPlayers": row[2], "averageGameTime": row[3]} for row in rows}
+
+    def save_game_stats(self, game: str, stats: Dict):
+        self._connection().execute(
+            UPSERT_GAME_STATS, (game, stats["totalGames"], stats["totalPlayers"], stats["averageGameTime"])
+        )
+
+    def get_game_entry(self, game: str, player_id: str) -> Optional[Dict]:
+        row = self._connection().execute(SELECT_GAME_ENTRY, (game, player_id)).fetchone()
+        return _game_entry_from_row(row) if row else None
+
+    def add_game_entry(self, game: str, entry: Dict):
+        self.save_game_entry(game, entry)
+
+    def save_game_entry(self, game: str, entry: Dict):
+        self._connection().execute(UPSERT_GAME_ENTRY, (
+            game, entry["playerId"], entry["playerName"], entry["rating"], entry["gamesPlayed"], entry["gamesWon"],
+        ))
+
+    def game_rank(self, game: str, player_id: str) -> Optional[int]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT rating, games_played FROM game_players WHERE game = ? AND player_id = ?", (game, player_id)
+        ).fetchone()
+        if row is None:
+            return None
+        params = {"game": game, "rating": row[0], "games_played": row[1], "player_id": player_id}
+        return connection.execute(SELECT_GAME_RANK, params).fetchone()[0]
+
+    def top_game_entries(self, game: str, offset: int, limit: int) -> List[Dict]:
+        rows = self._connection().execute(SELECT_TOP_GAME_ENTRIES, (game, limit, offset))
+        return [_game_entry_from_row(row) for row in rows]
+
+    def game_entries_after(self, game: str, rating: int, games_played: int, player_id: str,
+                           limit: int) -> Tuple[int, List[Dict]]:
+        connection = self._connection()
+        params = {"game": game, "rating": rating, "games_played": games_played, "player_id": player_id, "limit": limit}
+        offset = connection.execute(COUNT_GAME_ENTRIES_UP_TO, params).fetchone()[0]
+        return offset, [_game_entry_from_row(row) for row in connection.execute(SELECT_GAME_ENTRIES_AFTER, params)]
+
+    def game_entries_around(self, game: str, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        connection = self._connection()
+        row = connection.execute(SELECT_GAME_ENTRY, (game, player_id)).fetchone()
+        if row is None:
+            return None
+        entry = _game_entry_from_row(row)
+        params = {"game": game, "rating": entry["rating"], "games_played": entry["gamesPlayed"],
+                  "player_id": player_id, "limit": radius}
+        before = [_game_entry_from_row(r) for r in connection.execute(SELECT_GAME_ENTRIES_BEFORE, params)]
+        after = [_game_entry_from_row(r) for r in connection.execute(SELECT_GAME_ENTRIES_AFTER, params)]
+        offset = connection.execute(SELECT_GAME_RANK, params).fetchone()[0] - 1 - len(before)
+        return offset, before[::-1] + [entry] + after
+
+    def player_game_entries(self, player_id: str) -> Dict[str, Dict]:
+        rows = self._connection().execute(SELECT_PLAYER_GAME_ENTRIES, (player_id,))
+        return {row[0]: _game_entry_from_row(row[1:]) for row in rows}
@@ -0,0 +1,165 @@
+import os
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Caminho de escrita do LeaderboardService: as requisições não alteram o estado, só
+# enfileiram. Cada shard (escolhido pelo id do jogador) tem uma fila e uma única thread
+# escritora, então os resultados de um mesmo jogador são aplicados na ordem em que
+# chegaram, sem lock por jogador. A escritora esvazia a fila em micro-lotes: o que se
+# acumulou enquanto o lote anterior era aplicado vira o próximo lote, aplicado de uma
+# vez pelo caminho vetorizado (update_players_after_games).
+#
+# Rankings, agregados e o log de eventos são compartilhados entre os shards, então a
+# aplicação de cada lote é exclusiva em relação às leituras e aos outros lotes
+# (ReadWriteLock): leitores nunca veem um lote pela metade e não bloqueiam uns aos outros.
+
+DEFAULT_SHARDS = os.cpu_count() or 1
+DEFAULT_MAX_BATCH = 4096
+
+
+class ReadWriteLock:
+    # Vários leitores ou um escritor; escritores esperando têm preferência, para que um
+    # fluxo contínuo de leituras não adie as escritas indefinidamente. Não é reentrante
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class _Shard:
+    __slots__ = ("queue", "ready", "thread", "batches", "applied")
+
+    def __init__(self):
+        self.queue: deque = deque()
+        self.ready = threading.Condition()
+        self.thread = None
+        self.batches = 0
+        self.applied = 0
+
+
+def shard_for(key: str, shards: int) -> int:
+    # Estável entre execuções (hash() de str muda a cada processo)
+    return zlib.crc32(key.encode("utf-8")) % shards
+
+
+class WritePipeline:
+    def __init__(self, apply_batch: Callable[[List[Any]], List[Any]], shards: int = DEFAULT_SHARDS,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        # apply_batch recebe os itens de um micro-lote e devolve um resultado por item
+        self.apply_batch = apply_batch
+        self.max_batch = max_batch
+        self.shards = [_Shard() for _ in range(max(1, shards))]
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, key: str, item: Any) -> Future:
+        return self.submit_many([(key, item)])[0]
+
+    def submit_many(self, keyed_items: Iterable[Tuple[str, Any]]) -> List[Future]:
+        # Itens de uma mesma chave, numa mesma chamada, são aplicados na ordem da lista
+        if self._closed:
+            raise ValueError("Pipeline de escrita encerrado")
+        by_shard: Dict[int, List[Tuple[Any, Future]]] = {}
+        futures = []
+        for key, item in keyed_items:
+            future = Future()
+            futures.append(future)
+            by_shard.setdefault(shard_for(key, len(self.shards)), []).append((item, future))
+        for index, pending in by_shard.items():
+            shard = self._started(index)
+            with shard.ready:
+                shard.queue.extend(pending)
+                shard.ready.notify()
+        return futures
+
+    def _started(self, index: int) -> _Shard:
+        # Escritoras criadas sob demanda: serviços que nunca recebem escritas pela fila
+        # (benchmarks, ferramentas offline) não ficam com threads ociosas
+        shard = self.shards[index]
+        if shard.thread is None:
+            with self._start_lock:
+                if shard.thread is None:
+                    shard.thread = threading.Thread(target=self._write_loop, args=(shard,),
+                                                    name=f"leaderboard-writer-{index}", daemon=True)
+                    shard.thread.start()
+        return shard
+
+    def _write_loop(self, shard: _Shard):
+        while True:
+            with shard.ready:
+                while not shard.queue and not self._closed:
+                    shard.ready.wait()
+                if not shard.queue:
+                    return
+                batch = [shard.queue.popleft() for _ in range(min(len(shard.queue), self.max_batch))]
+            self._apply(batch)
+            shard.batches += 1
+            shard.applied += len(batch)
+
+    def _apply(self, batch: List[Tuple[Any, Future]]):
+        # apply_batch devolve o erro de cada item inválido na própria resposta (o de uma
+        # requisição não chega às outras do micro-lote). Se ainda assim levantar, parte do
+        # lote pode já estar no log e aplicada: nada é reaplicado e todos recebem o erro
+        try:
+            results = self.apply_batch([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self):
+        # Aplica o que já estava na fila e encerra as escritoras
+        self._closed = True
+        for shard in self.shards:
+            with shard.ready:
+                shard.ready.notify_all()
+        for shard in self.shards:
+            if shard.thread is not None:
+                shard.thread.join()
+
+    def stats(self) -> Dict:
+        batches = sum(shard.batches for shard in self.shards)
+        applied = sum(shard.applied for shard in self.shards)
+        return {
+            "shards": len(self.shards),
+            "queued": sum(len(shard.queue) for shard in self.shards),
+            "batches": batches,
+            "applied": applied,
+            "averageBatch": round(applied / batches, 2) if batches else 0,
+        }
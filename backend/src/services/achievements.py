@@ -0,0 +1,120 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional
+
+# Catálogo de conquistas e suas regras declarativas: cada regra é um limiar sobre um contador
+# do jogador. Contadores: gamesWon, currentStreak, gamesPlayed, level, gameWins:<jogo>
+# (vitórias no jogo) e allGamesCovered (1 quando o jogador já jogou todos os jogos).
+# A posição no catálogo é o bit da conquista: novas conquistas entram sempre no final.
+ACHIEVEMENTS = [
+    {"id": 'first_win', "name": 'Primeira Vitória', "description": 'Ganhe sua primeira partida', "icon": '🏆', "rarity": 'common',
+     "counter": "gamesWon", "threshold": 1},
+    {"id": 'win_streak_5', "name": 'Sequência de 5', "description": 'Ganhe 5 partidas seguidas', "icon": '🔥', "rarity": 'uncommon',
+     "counter": "currentStreak", "threshold": 5},
+    {"id": 'win_streak_10', "name": 'Sequência de 10', "description": 'Ganhe 10 partidas seguidas', "icon": '⚡', "rarity": 'rare',
+     "counter": "currentStreak", "threshold": 10},
+    {"id": 'games_played_100', "name": 'Veterano', "description": 'Jogue 100 partidas', "icon": '🎖️', "rarity": 'uncommon',
+     "counter": "gamesPlayed", "threshold": 100},
+    {"id": 'level_10', "name": 'Explorador', "description": 'Alcance o nível 10', "icon": '🌟', "rarity": 'common',
+     "counter": "level", "threshold": 10},
+    {"id": 'level_20', "name": 'Aventureiro', "description": 'Alcance o nível 20', "icon": '⭐', "rarity": 'uncommon',
+     "counter": "level", "threshold": 20},
+    {"id": 'master_senet', "name": 'Mestre do Senet', "description": 'Ganhe 10 partidas de Senet', "icon": '🏺', "rarity": 'rare',
+     "counter": "gameWins:Senet", "threshold": 10},
+    {"id": 'master_go', "name": 'Mestre do Go', "description": 'Ganhe 10 partidas de Go', "icon": '⚫', "rarity": 'rare',
+     "counter": "gameWins:Go", "threshold": 10},
+    {"id": 'master_mancala', "name": 'Mestre do Mancala', "description": 'Ganhe 10 partidas de Mancala', "icon": '🌰', "rarity": 'rare',
+     "counter": "gameWins:Mancala", "threshold": 10},
+    {"id": 'collector', "name": 'Colecionador', "description": 'Jogue todos os jogos disponíveis', "icon": '📚', "rarity": 'legendary',
+     "counter": "allGamesCovered", "threshold": 1},
+]
+
+ACHIEVEMENT_IDS = [achievement["id"] for achievement in ACHIEVEMENTS]
+RULE_FIELDS = ("counter", "threshold")
+
+
+def player_counters(player: Dict, game_entries: Dict[str, Dict], total_games: int) -> Dict[str, int]:
+    # Todos os contadores de um jogador (avaliação completa: backfill ou verificação sem delta)
+    counters = {
+        "gamesWon": player["gamesWon"],
+        "currentStreak": player["currentStreak"],
+        "gamesPlayed": player["gamesPlayed"],
+        "level": player["level"],
+        "allGamesCovered": int(total_games > 0 and len(game_entries) >= total_games),
+    }
+    for game, entry in game_entries.items():
+        counters[f"gameWins:{game}"] = entry["gamesWon"]
+    return counters
+
+
+class AchievementEngine:
+    # Regras compiladas: por contador, limiares ordenados e a máscara acumulada dos bits
+    # liberados até cada limiar; avaliar um contador é um bisect + operações de bits
+    def __init__(self, achievements: List[Dict] = ACHIEVEMENTS):
+        self.catalog = achievements
+        self.ids = [achievement["id"] for achievement in achievements]
+        self.bits = {achievement_id: bit for bit, achievement_id in enumerate(self.ids)}
+        self.thresholds: Dict[str, List[int]] = {}
+        self.prefix_masks: Dict[str, List[int]] = {}
+        rules: Dict[str, List] = {}
+        for bit, achievement in enumerate(achievements):
+            rules.setdefault(achievement["counter"], []).append((achievement["threshold"], bit))
+        for counter, counter_rules in rules.items():
+            counter_rules.sort()
+            masks = [0]
+            for _, bit in counter_rules:
+                masks.append(masks[-1] | (1 << bit))
+            self.thresholds[counter] = [threshold for threshold, _ in counter_rules]
+            self.prefix_masks[counter] = masks
+
+    def mask_of(self, achievements: Iterable[str]) -> int:
+        mask = 0
+        for achievement_id in achievements:
+            bit = self.bits.get(achievement_id)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        return [achievement_id for bit, achievement_id in enumerate(self.ids) if mask >> bit & 1]
+
+    def earned_mask(self, counters: Dict[str, int]) -> int:
+        # Bits cujos limiares são atingidos pelos contadores informados
+        mask = 0
+        for counter, value in counters.items():
+            thresholds = self.thresholds.get(counter)
+            if thresholds is not None:
+                mask |= self.prefix_masks[counter][bisect_right(thresholds, value)]
+        return mask
+
+    def player_mask(self, player) -> int:
+        # O armazenamento colunar já guarda as conquistas como bits; nos demais, a máscara
+        # sai da lista do próprio jogador lido do armazenamento (sem cache: com vários
+        # processos no mesmo armazenamento, as concessões dos outros também contam)
+        if hasattr(player, "achievement_mask"):
+            return player.achievement_mask
+        return self.mask_of(player.get("achievements", []))
+
+    def evaluate(self, player, changed: Dict[str, int]) -> List[str]:
+        # Avalia só as regras dos contadores alterados; conquistas novas são acrescentadas ao jogador
+        candidates = self.earned_mask(changed)
+        if not candidates:
+            return []
+        new = candidates & ~self.player_mask(player)
+        if not new:
+            return []
+        return self.grant(player, new)
+
+    def grant(self, player, new: int) -> List[str]:
+        new_achievements = self.names(new)
+        if hasattr(player, "achievement_mask"):
+            player.achievement_mask |= new
+        else:
+            player.setdefault("achievements", []).extend(new_achievements)
+        return new_achievements
+
+    def rule(self, achievement_id: str) -> Optional[Dict]:
+        bit = self.bits.get(achievement_id)
+        return self.catalog[bit] if bit is not None else None
+
+    def public_catalog(self) -> List[Dict]:
+        return [{k: v for k, v in achievement.items() if k not in RULE_FIELDS} for achievement in self.catalog]
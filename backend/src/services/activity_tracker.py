@@ -0,0 +1,141 @@
+import hashlib
+import math
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Contagem aproximada de usuários ativos distintos (DAU/WAU/MAU e por jogo) com memória fixa.
+# Cada dia guarda um sketch HyperLogLog global e um por jogo; uma janela de N dias é
+# respondida fazendo o merge (máximo registrador a registrador) dos N sketches diários.
+#
+# Precisão padrão p=12: 4096 registradores de 1 byte (4 KB por sketch), erro padrão
+# relativo de 1,04/sqrt(4096) ~ 1,6% (~95% das estimativas dentro de ±3,3%).
+# Até ~10 mil usuários a correção de intervalo pequeno (linear counting) mantém o erro
+# bem abaixo disso. Memória máxima: retention_days * (1 + max_games) * 4 KB.
+
+DEFAULT_PRECISION = 12
+DEFAULT_RETENTION_DAYS = 31
+DEFAULT_MAX_GAMES = 32
+ALL_GAMES = "*"
+
+
+def hash_user(user_id) -> int:
+    return int.from_bytes(hashlib.blake2b(str(user_id).encode(), digest_size=8).digest(), "little")
+
+
+class HyperLogLog:
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[np.ndarray] = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    def add_hashes(self, hashes: np.ndarray):
+        # Índice = p bits mais altos; posto = posição do primeiro bit 1 nos 64 - p restantes.
+        # Com p >= 11 os bits restantes cabem exatos na mantissa de um float64
+        suffix_bits = 64 - self.precision
+        indices = (hashes >> np.uint64(suffix_bits)).astype(np.intp)
+        suffixes = hashes & np.uint64((1 << suffix_bits) - 1)
+        _, bit_lengths = np.frexp(suffixes.astype(np.float64))
+        ranks = (suffix_bits - bit_lengths + 1).astype(np.uint8)
+        np.maximum.at(self.registers, indices, ranks)
+
+    def add(self, user_id):
+        self.add_hashes(np.array([hash_user(user_id)], dtype=np.uint64))
+
+    def merge(self, other: "HyperLogLog"):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class ActivityTracker:
+    def __init__(self, precision: int = DEFAULT_PRECISION, retention_days: int = DEFAULT_RETENTION_DAYS,
+                 max_games: int = DEFAULT_MAX_GAMES):
+        self.precision = precision
+        self.retention_days = retention_days
+        self.max_games = max_games
+        # ordinal do dia -> {jogo ou "*" -> sketch}
+        self.days: Dict[int, Dict[str, HyperLogLog]] = {}
+        self.games = set()
+
+    def _day_sketches(self, moment: datetime) -> Optional[Dict[str, HyperLogLog]]:
+        day = moment.toordinal()
+        sketches = self.days.get(day)
+        if sketches is None:
+            newest = max(self.days, default=day)
+            if day <= newest - self.retention_days:
+                return None  # atividade mais antiga que a retenção
+            sketches = self.days[day] = {}
+            for old in [d for d in self.days if d <= max(newest, day) - self.retention_days]:
+                del self.days[old]
+        return sketches
+
+    def _sketch(self, sketches: Dict[str, HyperLogLog], name: str) -> Optional[HyperLogLog]:
+        sketch = sketches.get(name)
+        if sketch is None:
+            if name != ALL_GAMES and name not in self.games:
+                if len(self.games) >= self.max_games:
+                    return None  # limite de jogos rastreados: conta só no total
+                self.games.add(name)
+            sketch = sketches[name] = HyperLogLog(self.precision)
+        return sketch
+
+    def record(self, user_id, moment: datetime, game: Optional[str] = None):
+        self.record_many([user_id], moment, game)
+
+    def record_many(self, user_ids: Iterable, moment: datetime, game: Optional[str] = None):
+        sketches = self._day_sketches(moment)
+        if sketches is None:
+            return
+        hashes = np.array([hash_user(user_id) for user_id in user_ids], dtype=np.uint64)
+        if not len(hashes):
+            return
+        self._sketch(sketches, ALL_GAMES).add_hashes(hashes)
+        if game:
+            sketch = self._sketch(sketches, game)
+            if sketch is not None:
+                sketch.add_hashes(hashes)
+
+    def active_users(self, days: int = 1, game: Optional[str] = None, today: Optional[date] = None) -> int:
+        # Usuários distintos ativos nos últimos `days` dias, incluindo hoje
+        if days < 1 or days > self.retention_days:
+            raise ValueError(f"Janela deve ter entre 1 e {self.retention_days} dias")
+        last = (today or date.today()).toordinal()
+        merged = HyperLogLog(self.precision)
+        for day in range(last - days + 1, last + 1):
+            sketch = self.days.get(day, {}).get(game or ALL_GAMES)
+            if sketch is not None:
+                merged.merge(sketch)
+        return merged.count()
+
+    def summary(self, game: Optional[str] = None, today: Optional[date] = None) -> Dict:
+        return {
+            "daily": self.active_users(1, game, today),
+            "weekly": self.active_users(7, game, today),
+            "monthly": self.active_users(min(30, self.retention_days), game, today),
+        }
+
+    # ----- snapshot -----
+
+    def export_state(self) -> Dict:
+        return {
+            "precision": self.precision,
+            "days": {day: {name: sketch.registers.tobytes() for name, sketch in sketches.items()}
+                     for day, sketches in self.days.items()},
+        }
+
+    def import_state(self, state: Dict):
+        self.precision = state["precision"]
+        self.days = {
+            day: {name: HyperLogLog(self.precision, np.frombuffer(data, dtype=np.uint8).copy())
+                  for name, data in sketches.items()}
+            for day, sketches in state["days"].items()
+        }
+        self.games = {name for sketches in self.days.values() for name in sketches if name != ALL_GAMES}
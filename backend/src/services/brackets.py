@@ -0,0 +1,315 @@
+import math
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple
+
+# Motor de chaveamento dos torneios. Formatos (campo "type"):
+#
+#   elimination         eliminatória simples; chave completa gerada no início
+#   double_elimination  chave dos vencedores + chave dos perdedores + grande final
+#                       (partida única, sem "reset" da chave)
+#   round_robin         todos contra todos, método do círculo, uma rodada por vez
+#   swiss               sistema suíço, uma rodada por vez a partir da pontuação
+#
+# Tudo fica no próprio dict do torneio (serializável, vai para o snapshot). O id da
+# partida é sua posição em tournament["matches"]. Nas eliminatórias cada partida aponta
+# para onde vão o vencedor e o perdedor (winnerTo/loserTo = [partida, vaga]) e conta as
+# vagas ainda aguardando resultado (feeds); quando chega a zero com um só jogador, a
+# partida é um bye e o jogador avança sozinho.
+
+TOURNAMENT_TYPES = ("elimination", "double_elimination", "round_robin", "swiss")
+ELIMINATION_TYPES = ("elimination", "double_elimination")
+# Quantos adversários adiante o pareamento suíço examina para evitar revanches
+SWISS_LOOKAHEAD = 32
+
+
+def seeded_players(participants: List[Dict]) -> List[Tuple[str, int]]:
+    # Cabeças de chave por rating (desempate pela ordem de inscrição)
+    order = sorted(range(len(participants)), key=lambda i: (-participants[i]["playerRating"], i))
+    return [(participants[i]["playerId"], participants[i]["playerRating"]) for i in order]
+
+
+def seed_positions(size: int) -> List[int]:
+    # Posição de cada cabeça de chave na primeira rodada: 1 x N, 2 x N-1... com os
+    # melhores em metades opostas; byes (cabeças inexistentes) caem nos melhores
+    positions = [0]
+    while len(positions) < size:
+        mirror = 2 * len(positions) - 1
+        positions = [p for seed in positions for p in (seed, mirror - seed)]
+    return positions
+
+
+def _new_match(matches: List[Dict], round_number: int, bracket: Optional[str], feeds: int) -> int:
+    matches.append({
+        "id": len(matches),
+        "round": round_number,
+        "bracket": bracket,
+        "player1": None,
+        "player2": None,
+        "winner": None,
+        "status": "pending",
+        "feeds": feeds,
+        "winnerTo": None,
+        "loserTo": None,
+    })
+    return len(matches) - 1
+
+
+def _place(matches: List[Dict], target: Optional[List[int]], player_id: Optional[str]):
+    # Entrega o resultado de uma vaga (jogador ou bye) à partida seguinte
+    if target is None:
+        return
+    match = matches[target[0]]
+    if player_id is not None:
+        match["player1" if target[1] == 0 else "player2"] = player_id
+    match["feeds"] -= 1
+    _settle(matches, match["id"])
+
+
+def _settle(matches: List[Dict], match_id: int):
+    match = matches[match_id]
+    if match["status"] != "pending" or match["feeds"] > 0:
+        return
+    if match["player1"] is not None and match["player2"] is not None:
+        match["status"] = "ready"
+        return
+    # Bye: o único jogador (se houver) avança; nenhum perdedor desce de chave
+    match["winner"] = match["player1"] if match["player1"] is not None else match["player2"]
+    match["status"] = "bye"
+    _place(matches, match["winnerTo"], match["winner"])
+    _place(matches, match["loserTo"], None)
+
+
+def build_elimination(participants: List[Dict], double: bool = False) -> List[Dict]:
+    seeds = [player_id for player_id, _ in seeded_players(participants)]
+    if len(seeds) < 2:
+        raise ValueError("São necessários pelo menos 2 participantes")
+    rounds = max(1, math.ceil(math.log2(len(seeds))))
+    size = 1 << rounds
+    matches: List[Dict] = []
+
+    # Chave dos vencedores: rodada r tem size >> r partidas
+    winners = []
+    for r in range(1, rounds + 1):
+        winners.append([_new_match(matches, r, "winners", 0 if r == 1 else 2) for _ in range(size >> r)])
+    for r in range(rounds - 1):
+        for m, match_id in enumerate(winners[r]):
+            matches[match_id]["winnerTo"] = [winners[r + 1][m // 2], m % 2]
+    positions = seed_positions(size)
+    for m, match_id in enumerate(winners[0]):
+        for slot in (0, 1):
+            seed = positions[2 * m + slot]
+            if seed < len(seeds):
+                matches[match_id]["player1" if slot == 0 else "player2"] = seeds[seed]
+
+    if double:
+        final = _new_match(matches, rounds + 1, "final", 2)
+        matches[winners[-1][0]]["winnerTo"] = [final, 0]
+        if rounds == 1:
+            matches[winners[0][0]]["loserTo"] = [final, 1]
+        else:
+            # Chave dos perdedores: rodadas ímpares jogam entre si, rodadas pares recebem
+            # os perdedores da rodada seguinte da chave dos vencedores (em ordem invertida
+            # alternadamente, para adiar revanches)
+            losers = [[_new_match(matches, 1, "losers", 2) for _ in range(size >> 2)]]
+            for m, match_id in enumerate(winners[0]):
+                matches[match_id]["loserTo"] = [losers[0][m // 2], m % 2]
+            for j in range(1, rounds):
+                previous = losers[-1]
+                dropping = winners[j]
+                current = [_new_match(matches, 2 * j, "losers", 2) for _ in range(len(previous))]
+                for m, match_id in enumerate(previous):
+                    matches[match_id]["winnerTo"] = [current[m], 0]
+                for m, match_id in enumerate(dropping):
+                    target = current[len(current) - 1 - m] if j % 2 else current[m]
+                    matches[match_id]["loserTo"] = [target, 1]
+                losers.append(current)
+                if j < rounds - 1:
+                    merged = [_new_match(matches, 2 * j + 1, "losers", 2) for _ in range(len(current) // 2)]
+                    for m, match_id in enumerate(current):
+                        matches[match_id]["winnerTo"] = [merged[m // 2], m % 2]
+                    losers.append(merged)
+            matches[losers[-1][0]]["winnerTo"] = [final, 1]
+
+    for match_id in winners[0]:
+        _settle(matches, match_id)
+    return matches
+
+
+def round_robin_pairings(player_ids: List[str], round_index: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    # Método do círculo: o primeiro fica fixo e os demais giram uma posição por rodada
+    players: List[Optional[str]] = list(player_ids)
+    if len(players) % 2:
+        players.append(None)
+    n = len(players)
+    rest = players[1:]
+    shift = round_index % (n - 1)
+    rotated = [players[0]] + rest[-shift:] + rest[:-shift] if shift else players
+    return [(rotated[i], rotated[n - 1 - i]) for i in range(n // 2)]
+
+
+def swiss_pairings(entries: List[Tuple[str, float, int]], opponents: Dict[str, Set[str]],
+                   had_bye: Set[str], lookahead: int = SWISS_LOOKAHEAD) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+    # entries: (jogador, pontuação, rating). Ordena por pontuação e rating e emparelha
+    # cada jogador com o próximo da lista que ainda não enfrentou, olhando até `lookahead`
+    # posições adiante; quem sobra de um grupo de pontuação desce para o seguinte.
+    # O(n log n + n * lookahead); se não houver adversário inédito na janela, aceita a revanche
+    ranked = sorted(entries, key=lambda e: (-e[1], -e[2], e[0]))
+    queue = deque(player_id for player_id, _, _ in ranked)
+
+    bye = None
+    if len(queue) % 2:
+        # Bye para o último colocado que ainda não recebeu um
+        for k in range(len(queue) - 1, -1, -1):
+            if queue[k] not in had_bye:
+                bye = queue[k]
+                del queue[k]
+                break
+        else:
+            bye = queue.pop()
+
+    pairs = []
+    while queue:
+        player = queue.popleft()
+        played = opponents.get(player, ())
+        choice = 0
+        for k in range(min(lookahead, len(queue))):
+            if queue[k] not in played:
+                choice = k
+                break
+        opponent = queue[choice]
+        del queue[choice]
+        pairs.append((player, opponent))
+
+    # Revanches forçadas (em geral no fim da lista) são desfeitas trocando adversários
+    # com um dos pares anteriores próximos
+    for i, (a, b) in enumerate(pairs):
+        if b not in opponents.get(a, ()):
+            continue
+        for j in range(i - 1, max(-1, i - 1 - lookahead), -1):
+            c, d = pairs[j]
+            if c not in opponents.get(a, ()) and d not in opponents.get(b, ()):
+                pairs[j], pairs[i] = (c, a), (d, b)
+                break
+            if d not in opponents.get(a, ()) and c not in opponents.get(b, ()):
+                pairs[j], pairs[i] = (c, b), (d, a)
+                break
+    return pairs, bye
+
+
+# ===== ESTADO DO TORNEIO =====
+
+def start(tournament: Dict):
+    # Gera a chave (eliminatórias) ou a primeira rodada (round robin e suíço)
+    participants = tournament["participants"]
+    if len(participants) < 2:
+        raise ValueError("São necessários pelo menos 2 participantes")
+    kind = tournament["type"]
+    if kind in ELIMINATION_TYPES:
+        tournament["matches"] = build_elimination(participants, double=kind == "double_elimination")
+        tournament["rounds"] = max(match["round"] for match in tournament["matches"])
+        # A final é a única partida cujo vencedor não avança
+        tournament["finalMatch"] = next(m["id"] for m in tournament["matches"] if m["winnerTo"] is None)
+        tournament["currentRound"] = 1
+        return
+
+    tournament["matches"] = []
+    tournament["standings"] = {
+        p["playerId"]: {"score": 0.0, "rating": p["playerRating"], "opponents": [], "byes": 0}
+        for p in participants
+    }
+    if kind == "round_robin":
+        tournament["rounds"] = len(participants) - 1 + len(participants) % 2
+    else:
+        tournament["rounds"] = tournament.get("rounds") or math.ceil(math.log2(len(participants)))
+    tournament["currentRound"] = 0
+    _next_round(tournament)
+
+
+def _next_round(tournament: Dict):
+    standings = tournament["standings"]
+    round_number = tournament["currentRound"] + 1
+    if tournament["type"] == "round_robin":
+        pairs = []
+        bye = None
+        order = [p["playerId"] for p in tournament["participants"]]
+        for a, b in round_robin_pairings(order, round_number - 1):
+            if a is None or b is None:
+                bye = a if b is None else b
+            else:
+                pairs.append((a, b))
+    else:
+        entries = [(player_id, s["score"], s["rating"]) for player_id, s in standings.items()]
+        opponents = {player_id: set(s["opponents"]) for player_id, s in standings.items()}
+        had_bye = {player_id for player_id, s in standings.items() if s["byes"]}
+        pairs, bye = swiss_pairings(entries, opponents, had_bye)
+
+    matches = tournament["matches"]
+    for a, b in pairs:
+        match_id = _new_match(matches, round_number, None, 0)
+        matches[match_id].update(player1=a, player2=b, status="ready")
+    if bye is not None:
+        match_id = _new_match(matches, round_number, None, 0)
+        matches[match_id].update(player1=bye, winner=bye, status="bye")
+        # Bye vale uma vitória no suíço; no round robin é só a folga da rodada
+        if tournament["type"] == "swiss":
+            standings[bye]["score"] += 1
+        standings[bye]["byes"] += 1
+    tournament["currentRound"] = round_number
+    tournament["pendingMatches"] = len(pairs)
+
+
+def record_result(tournament: Dict, match_id: int, winner_id: Optional[str]) -> bool:
+    # Registra o resultado (winner_id None = empate, só fora das eliminatórias).
+    # Retorna True quando o torneio termina
+    matches = tournament["matches"]
+    if not 0 <= match_id < len(matches):
+        raise ValueError("Partida não encontrada")
+    match = matches[match_id]
+    if match["status"] != "ready":
+        raise ValueError("Partida não está disponível para resultado")
+    players = (match["player1"], match["player2"])
+    if winner_id is None:
+        if tournament["type"] in ELIMINATION_TYPES:
+            raise ValueError("Eliminatórias não admitem empate")
+    elif winner_id not in players:
+        raise ValueError("Vencedor não participa da partida")
+
+    match["winner"] = winner_id
+    match["status"] = "completed"
+    if tournament["type"] in ELIMINATION_TYPES:
+        loser = players[1] if winner_id == players[0] else players[0]
+        _place(matches, match["winnerTo"], winner_id)
+        _place(matches, match["loserTo"], loser)
+        tournament["currentRound"] = max(tournament["currentRound"], match["round"])
+        final = matches[tournament["finalMatch"]]
+        if final["status"] in ("completed", "bye"):
+            tournament["winner"] = final["winner"]
+            return True
+        return False
+
+    standings = tournament["standings"]
+    for player_id in players:
+        standings[player_id]["opponents"].append(players[1] if player_id == players[0] else players[0])
+        if winner_id is None:
+            standings[player_id]["score"] += 0.5
+    if winner_id is not None:
+        standings[winner_id]["score"] += 1
+    tournament["pendingMatches"] -= 1
+    if tournament["pendingMatches"]:
+        return False
+    if tournament["currentRound"] < tournament["rounds"]:
+        _next_round(tournament)
+        return False
+    tournament["winner"] = final_standings(tournament)[0]["playerId"]
+    return True
+
+
+def final_standings(tournament: Dict) -> List[Dict]:
+    # Classificação por pontuação; desempate por Buchholz (soma das pontuações dos adversários)
+    standings = tournament["standings"]
+    rows = []
+    for player_id, s in standings.items():
+        buchholz = sum(standings[opponent]["score"] for opponent in s["opponents"])
+        rows.append({"playerId": player_id, "score": s["score"], "buchholz": buchholz, "rating": s["rating"]})
+    rows.sort(key=lambda row: (-row["score"], -row["buchholz"], -row["rating"]))
+    return rows
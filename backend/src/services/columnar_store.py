@@ -0,0 +1,271 @@
+from array import array
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from services.achievements import ACHIEVEMENT_IDS
+from services.storage import MemoryStorage
+
+# Armazenamento colunar (struct-of-arrays) para os jogadores: os campos numéricos
+# ficam em arrays compactos, conquistas viram um bitmask e textos repetidos
+# (nomes, avatares, jogo favorito) ficam em uma tabela de strings internadas.
+# Cada jogador é exposto como um PlayerView com a mesma forma de dict usada pela API.
+
+# Campos inteiros e o typecode do array correspondente
+INT_COLUMNS = {
+    "rating": "i",
+    "level": "i",
+    "experience": "q",
+    "gamesPlayed": "i",
+    "gamesWon": "i",
+    "currentStreak": "i",
+    "bestStreak": "i",
+}
+# Datas guardadas como segundos desde a época
+TIME_COLUMNS = ("joinDate", "lastActive")
+# Referências para a tabela de strings (-1 = None)
+STRING_COLUMNS = ("name", "avatar", "favoriteGame")
+
+PLAYER_FIELDS = (
+    "id", "name", "avatar", "level", "experience", "gamesPlayed", "gamesWon", "currentStreak",
+    "bestStreak", "favoriteGame", "joinDate", "lastActive", "achievements", "rating",
+)
+
+# Os bits de conquista seguem a ordem do catálogo; conquistas fora dele recebem o próximo bit livre
+MAX_ACHIEVEMENTS = 64
+
+
+class StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self.refs: Dict[str, int] = {}
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        ref = self.refs.get(value)
+        if ref is None:
+            ref = len(self.strings)
+            self.strings.append(value)
+            self.refs[value] = ref
+        return ref
+
+    def get(self, ref: int) -> Optional[str]:
+        return self.strings[ref] if ref >= 0 else None
+
+
+class PlayerView:
+    # Visão de uma linha do armazenamento colunar com a interface de um dict de jogador
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "ColumnarPlayerStore", row: int):
+        self._store = store
+        self._row = row
+
+    def __getitem__(self, field: str):
+        return self._store.get_field(self._row, field)
+
+    def __setitem__(self, field: str, value):
+        self._store.set_field(self._row, field, value)
+
+    def __contains__(self, field: str) -> bool:
+        return field in PLAYER_FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(PLAYER_FIELDS)
+
+    def __len__(self) -> int:
+        return len(PLAYER_FIELDS)
+
+    @property
+    def achievement_mask(self) -> int:
+        return self._store.columns["achievements"][self._row]
+
+    @achievement_mask.setter
+    def achievement_mask(self, mask: int):
+        self._store.columns["achievements"][self._row] = mask
+
+    def __eq__(self, other) -> bool:
+        return dict(self) == dict(other)
+
+    def keys(self):
+        return PLAYER_FIELDS
+
+    def get(self, field: str, default=None):
+        return self[field] if field in PLAYER_FIELDS else default
+
+    def items(self):
+        return [(field, self[field]) for field in PLAYER_FIELDS]
+
+    def values(self):
+        return [self[field] for field in PLAYER_FIELDS]
+
+    def __repr__(self) -> str:
+        return f"PlayerView({dict(self)!r})"
+
+
+class ColumnarPlayerStore:
+    # Mapeamento id -> PlayerView sobre colunas compactas
+    def __init__(self):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.columns: Dict[str, array] = {field: array(typecode) for field, typecode in INT_COLUMNS.items()}
+        for field in TIME_COLUMNS:
+            self.columns[field] = array("q")
+        for field in STRING_COLUMNS:
+            self.columns[field] = array("i")
+        self.columns["achievements"] = array("Q")
+        self.strings = StringTable()
+        self.achievement_names: List[str] = list(ACHIEVEMENT_IDS)
+        self.achievement_bits: Dict[str, int] = {name: bit for bit, name in enumerate(self.achievement_names)}
+
+    # ----- conquistas -----
+
+    def achievement_bit(self, achievement: str) -> int:
+        bit = self.achievement_bits.get(achievement)
+        if bit is None:
+            if len(self.achievement_names) >= MAX_ACHIEVEMENTS:
+                raise ValueError("Limite de conquistas atingido")
+            bit = len(self.achievement_names)
+            self.achievement_names.append(achievement)
+            self.achievement_bits[achievement] = bit
+        return bit
+
+    def achievements_to_mask(self, achievements: List[str]) -> int:
+        mask = 0
+        for achievement in achievements:
+            mask |= 1 << self.achievement_bit(achievement)
+        return mask
+
+    def mask_to_achievements(self, mask: int) -> List[str]:
+        names = []
+        bit = 0
+        while mask:
+            if mask & 1:
+                names.append(self.achievement_names[bit])
+            mask >>= 1
+            bit += 1
+        return names
+
+    # ----- campos -----
+
+    def get_field(self, row: int, field: str):
+        if field in INT_COLUMNS:
+            return self.columns[field][row]
+        if field in TIME_COLUMNS:
+            return datetime.fromtimestamp(self.columns[field][row])
+        if field in STRING_COLUMNS:
+            return self.strings.get(self.columns[field][row])
+        if field == "achievements":
+            return self.mask_to_achievements(self.columns["achievements"][row])
+        if field == "id":
+            return self.ids[row]
+        raise KeyError(field)
+
+    def set_field(self, row: int, field: str, value):
+        if field in INT_COLUMNS:
+            self.columns[field][row] = value
+        elif field in TIME_COLUMNS:
+            self.columns[field][row] = int(value.timestamp())
+        elif field in STRING_COLUMNS:
+            self.columns[field][row] = self.strings.intern(value)
+        elif field == "achievements":
+            self.columns["achievements"][row] = self.achievements_to_mask(value)
+        elif field != "id":
+            raise KeyError(field)
+
+    # ----- mapeamento id -> jogador -----
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self.rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    def __getitem__(self, player_id: str) -> PlayerView:
+        return PlayerView(self, self.rows[player_id])
+
+    def get(self, player_id: str, default=None) -> Optional[PlayerView]:
+        row = self.rows.get(player_id)
+        return PlayerView(self, row) if row is not None else default
+
+    def values(self) -> Iterator[PlayerView]:
+        return (PlayerView(self, row) for row in range(len(self.ids)))
+
+    def keys(self) -> List[str]:
+        return self.ids
+
+    def __setitem__(self, player_id: str, player: Dict):
+        row = self.rows.get(player_id)
+        if row is None:
+            row = len(self.ids)
+            self.ids.append(player_id)
+            self.rows[player_id] = row
+            for column in self.columns.values():
+                column.append(0)
+        for field in PLAYER_FIELDS:
+            if field in player:
+                self.set_field(row, field, player[field])
+
+    @contextmanager
+    def numpy_column(self, field: str):
+        # Visão NumPy sem cópia de uma coluna; o array não pode crescer enquanto a visão existir
+        column = self.columns[field]
+        view = np.frombuffer(column, dtype=np.dtype(column.typecode)) if len(column) else np.empty(0)
+        try:
+            yield view
+        finally:
+            del view
+
+    # ----- snapshot -----
+
+    def export_state(self) -> Dict:
+        return {
+            "ids": self.ids,
+            "columns": {field: (column.typecode, column.tobytes()) for field, column in self.columns.items()},
+            "strings": self.strings.strings,
+            "achievement_names": self.achievement_names,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "ColumnarPlayerStore":
+        store = cls()
+        store.ids = state["ids"]
+        store.rows = {player_id: row for row, player_id in enumerate(store.ids)}
+        for field, (typecode, data) in state["columns"].items():
+            column = array(typecode)
+            column.frombytes(data)
+            store.columns[field] = column
+        for value in state["strings"]:
+            store.strings.intern(value)
+        store.achievement_names = list(state["achievement_names"])
+        store.achievement_bits = {name: bit for bit, name in enumerate(store.achievement_names)}
+        return store
+
+
+class ColumnarStorage(MemoryStorage):
+    # Igual ao MemoryStorage, mas com os jogadores no armazenamento colunar compacto
+    def __init__(self):
+        super().__init__()
+        self.players = ColumnarPlayerStore()
+
+    def count_active_since(self, since: datetime) -> int:
+        with self.players.numpy_column("lastActive") as last_active:
+            return int(np.count_nonzero(last_active > since.timestamp()))
+
+    def average_level(self) -> float:
+        if not len(self.players):
+            return 0
+        with self.players.numpy_column("level") as levels:
+            return float(levels.mean())
+
+    def export_state(self) -> Dict:
+        return {**super().export_state(), "players": self.players.export_state()}
+
+    def import_state(self, state: Dict):
+        super().import_state({**state, "players": ColumnarPlayerStore.from_state(state["players"])})
@@ -0,0 +1,234 @@
+import os
+import pickle
+import re
+import struct
+import threading
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Log de eventos binário, somente anexação, dividido em segmentos numerados.
+# Cada registro: [tamanho do payload u32][crc32 u32][tipo u8][payload]
+RECORD_HEADER = struct.Struct("<IIB")
+
+# Modos de fsync do group commit
+FSYNC_ALWAYS = "always"  # quem grava espera o fsync do lote que contém seu registro
+FSYNC_BATCH = "batch"    # fsync periódico a cada fsync_interval segundos
+FSYNC_OFF = "off"        # apenas write(); o sistema operacional decide quando persistir
+
+SEGMENT_PATTERN = re.compile(r"^events-(\d{8})\.log$")
+SNAPSHOT_PATTERN = re.compile(r"^snapshot-(\d{8})\.bin$")
+SNAPSHOT_MAGIC = b"ODGSNAP1"
+
+
+def segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"events-{segment:08d}.log")
+
+
+def snapshot_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"snapshot-{segment:08d}.bin")
+
+
+def _list_numbered(directory: str, pattern) -> List[int]:
+    numbers = []
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            numbers.append(int(match.group(1)))
+    return sorted(numbers)
+
+
+def _fsync_directory(directory: str):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class EventLog:
+    def __init__(self, directory: str, segment: int, fsync_mode: str = FSYNC_BATCH,
+                 fsync_interval: float = 0.05, max_buffer_bytes: int = 1 << 20):
+        if fsync_mode not in (FSYNC_ALWAYS, FSYNC_BATCH, FSYNC_OFF):
+            raise ValueError(f"Modo de fsync inválido: {fsync_mode}")
+
+        self.directory = directory
+        self.segment = segment
+        self.fsync_mode = fsync_mode
+        self.fsync_interval = fsync_interval
+        self.max_buffer_bytes = max_buffer_bytes
+
+        self._file = open(segment_path(directory, segment), "ab")
+        self._buffer = bytearray()
+        self._appended = 0   # número de registros anexados ao buffer
+        self._durable = 0    # número de registros já gravados (e sincronizados, conforme o modo)
+        self._lock = threading.Lock()      # protege o buffer e os contadores
+        self._io_lock = threading.Lock()   # serializa write/fsync/rotação do arquivo
+        self._flushed = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        # Thread de group commit: junta tudo o que chegou desde a última gravação em um único write/fsync
+        self._flusher = threading.Thread(target=self._flush_loop, name="event-log-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, event_type: int, payload: bytes):
+        header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), event_type)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Log de eventos fechado")
+            self._buffer += header
+            self._buffer += payload
+            self._appended += 1
+            sequence = self._appended
+            if len(self._buffer) >= self.max_buffer_bytes:
+                self._wakeup.set()
+
+            if self.fsync_mode == FSYNC_ALWAYS:
+                self._wakeup.set()
+                while self._durable < sequence and not self._closed:
+                    self._flushed.wait()
+
+    def _write_pending(self):
+        # O buffer é trocado sob o lock, mas write/fsync acontecem fora dele:
+        # enquanto um lote é sincronizado, novos registros já formam o próximo lote
+        with self._io_lock:
+            with self._lock:
+                pending = self._buffer
+                target = self._appended
+                self._buffer = bytearray()
+            if pending:
+                self._file.write(pending)
+                self._file.flush()
+                if self.fsync_mode != FSYNC_OFF:
+                    os.fsync(self._file.fileno())
+            with self._lock:
+                self._durable = max(self._durable, target)
+                self._flushed.notify_all()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.fsync_interval)
+            self._wakeup.clear()
+            if not self._closed:
+                self._write_pending()
+
+    def flush(self):
+        self._write_pending()
+
+    def rotate(self) -> int:
+        # Fecha o segmento atual e começa o próximo; retorna o número do novo segmento
+        with self._io_lock:
+            with self._lock:
+                pending = self._buffer
+                target = self._appended
+                self._buffer = bytearray()
+            self._file.write(pending)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self.segment += 1
+            self._file = open(segment_path(self.directory, self.segment), "ab")
+            _fsync_directory(self.directory)
+            with self._lock:
+                self._durable = max(self._durable, target)
+                self._flushed.notify_all()
+            return self.segment
+
+    def close(self):
+        if self._closed:
+            return
+        self._write_pending()
+        with self._lock:
+            self._closed = True
+            self._flushed.notify_all()
+        self._wakeup.set()
+        self._flusher.join()
+        with self._io_lock:
+            self._file.close()
+
+
+def read_segment(path: str) -> Iterator[Tuple[int, bytes]]:
+    # Lê registros até o fim ou até o primeiro registro incompleto/corrompido (gravação interrompida);
+    # a cauda inválida é truncada para que novas gravações continuem de um ponto consistente
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    end = len(data)
+    header_size = RECORD_HEADER.size
+    while offset + header_size <= end:
+        length, crc, event_type = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + header_size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            break
+        yield event_type, payload
+        offset = start + length
+    if offset < end:
+        with open(path, "r+b") as f:
+            f.truncate(offset)
+
+
+def write_snapshot(directory: str, segment: int, state: Any):
+    # O snapshot de número N contém o estado resultante de todos os segmentos anteriores a N
+    path = snapshot_path(directory, segment)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(SNAPSHOT_MAGIC)
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    _fsync_directory(directory)
+
+
+def load_latest_snapshot(directory: str) -> Tuple[Optional[int], Any]:
+    for segment in reversed(_list_numbered(directory, SNAPSHOT_PATTERN)):
+        with open(snapshot_path(directory, segment), "rb") as f:
+            if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                continue
+            return segment, pickle.load(f)
+    return None, None
+
+
+def list_segments(directory: str, start: int = 0) -> List[int]:
+    return [segment for segment in _list_numbered(directory, SEGMENT_PATTERN) if segment >= start]
+
+
+def remove_before(directory: str, segment: int):
+    # Descarta segmentos e snapshots já cobertos pelo snapshot mais recente
+    for old in _list_numbered(directory, SEGMENT_PATTERN):
+        if old < segment:
+            os.remove(segment_path(directory, old))
+    for old in _list_numbered(directory, SNAPSHOT_PATTERN):
+        if old < segment:
+            os.remove(snapshot_path(directory, old))
+
+
+class GameResultCodec:
+    # Codificação compacta do evento mais frequente (resultado de partida)
+    _fixed = struct.Struct("<?ddd")
+    _length = struct.Struct("<H")
+
+    @classmethod
+    def encode(cls, player_id: str, game_name: str, won: bool, game_time: float,
+               opponent_rating: float, timestamp: float) -> bytes:
+        player_bytes = player_id.encode("utf-8")
+        game_bytes = game_name.encode("utf-8")
+        return b"".join((
+            cls._length.pack(len(player_bytes)), player_bytes,
+            cls._length.pack(len(game_bytes)), game_bytes,
+            cls._fixed.pack(won, game_time, opponent_rating, timestamp),
+        ))
+
+    @classmethod
+    def decode(cls, payload: bytes) -> Tuple[str, str, bool, float, float, float]:
+        (player_length,) = cls._length.unpack_from(payload, 0)
+        offset = cls._length.size
+        player_id = payload[offset:offset + player_length].decode("utf-8")
+        offset += player_length
+        (game_length,) = cls._length.unpack_from(payload, offset)
+        offset += cls._length.size
+        game_name = payload[offset:offset + game_length].decode("utf-8")
+        offset += game_length
+        won, game_time, opponent_rating, timestamp = cls._fixed.unpack_from(payload, offset)
+        return player_id, game_name, won, game_time, opponent_rating, timestamp
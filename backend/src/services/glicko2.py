@@ -0,0 +1,285 @@
+from array import array
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+# Glicko-2 (Glickman, "Example of the Glicko-2 system") com períodos de rating processados
+# em lote: os resultados de um período são acumulados em buffers e, ao fechar o período,
+# todos os jogadores são atualizados de uma vez com operações NumPy — inclusive a busca
+# iterativa da nova volatilidade (método de Illinois), feita em paralelo para todos os
+# jogadores que ainda não convergiram.
+#
+# O adversário de uma partida vem de fora (opponentRating); sem o desvio dele, usa-se
+# OPPONENT_DEVIATION.
+
+SCALE = 173.7178
+DEFAULT_RATING = 1500.0
+DEFAULT_DEVIATION = 350.0
+DEFAULT_VOLATILITY = 0.06
+DEFAULT_TAU = 0.5
+OPPONENT_DEVIATION = 100.0
+CONVERGENCE = 1e-6
+MAX_ITERATIONS = 100
+
+
+def _g(phi: np.ndarray) -> np.ndarray:
+    return 1 / np.sqrt(1 + 3 * phi ** 2 / np.pi ** 2)
+
+
+def _volatility(phi: np.ndarray, sigma: np.ndarray, v: np.ndarray, delta: np.ndarray, tau: float) -> np.ndarray:
+    # Passo 5: raiz de f(x) para cada jogador, pelo método de Illinois vetorizado
+    a = np.log(sigma ** 2)
+    phi2 = phi ** 2
+    delta2 = delta ** 2
+
+    def f(x, rows):
+        ex = np.exp(x)
+        denominator = phi2[rows] + v[rows] + ex
+        return ex * (delta2[rows] - phi2[rows] - v[rows] - ex) / (2 * denominator ** 2) - (x - a[rows]) / tau ** 2
+
+    everyone = np.arange(len(a))
+    A = a.copy()
+    B = np.empty_like(a)
+    large = delta2 > phi2 + v
+    B[large] = np.log(delta2[large] - phi2[large] - v[large])
+    small = np.flatnonzero(~large)
+    k = np.ones(len(small))
+    while len(small):
+        x = a[small] - k * tau
+        negative = f(x, small) < 0
+        B[small[~negative]] = x[~negative]
+        small, k = small[negative], k[negative] + 1
+
+    fA = f(A, everyone)
+    fB = f(B, everyone)
+    active = np.flatnonzero(np.abs(B - A) > CONVERGENCE)
+    for _ in range(MAX_ITERATIONS):
+        if not len(active):
+            break
+        a_, b_, fa, fb = A[active], B[active], fA[active], fB[active]
+        C = a_ + (a_ - b_) * fa / (fb - fa)
+        fC = f(C, active)
+        swap = fC * fb <= 0
+        A[active] = np.where(swap, b_, a_)
+        fA[active] = np.where(swap, fb, fa / 2)
+        B[active] = C
+        fB[active] = fC
+        active = active[np.abs(C - A[active]) > CONVERGENCE]
+    return np.exp(A / 2)
+
+
+def rating_period(rating: np.ndarray, deviation: np.ndarray, volatility: np.ndarray, players: np.ndarray,
+                  opponent_ratings: np.ndarray, opponent_deviations: np.ndarray, scores: np.ndarray,
+                  tau: float = DEFAULT_TAU):
+    # Um período completo para todos os jogadores (escala Glicko: rating/desvio/volatilidade).
+    # players[i] é a linha do jogador da i-ésima partida; quem não jogou só tem o desvio ampliado
+    n = len(rating)
+    mu = (rating - DEFAULT_RATING) / SCALE
+    phi = deviation / SCALE
+    opponent_mu = (opponent_ratings - DEFAULT_RATING) / SCALE
+    g = _g(opponent_deviations / SCALE)
+    expected = 1 / (1 + np.exp(-g * (mu[players] - opponent_mu)))
+
+    v_inverse = np.bincount(players, weights=g ** 2 * expected * (1 - expected), minlength=n)
+    improvement = np.bincount(players, weights=g * (scores - expected), minlength=n)
+
+    new_phi = np.sqrt(phi ** 2 + volatility ** 2)
+    new_mu = mu.copy()
+    new_volatility = volatility.copy()
+    played = np.flatnonzero(v_inverse > 0)
+    if len(played):
+        v = 1 / v_inverse[played]
+        sigma = _volatility(phi[played], volatility[played], v, v * improvement[played], tau)
+        phi_star = np.sqrt(phi[played] ** 2 + sigma ** 2)
+        phi_played = 1 / np.sqrt(1 / phi_star ** 2 + 1 / v)
+        new_mu[played] = mu[played] + phi_played ** 2 * improvement[played]
+        new_phi[played] = phi_played
+        new_volatility[played] = sigma
+    return new_mu * SCALE + DEFAULT_RATING, np.minimum(new_phi * SCALE, DEFAULT_DEVIATION), new_volatility
+
+
+class Glicko2Table:
+    # Rating, desvio e volatilidade de um conjunto de jogadores (global ou de um jogo),
+    # em colunas NumPy, mais os resultados do período em aberto
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.ids = []
+        self.rating = np.empty(0)
+        self.deviation = np.empty(0)
+        self.volatility = np.empty(0)
+        self._reset_period()
+
+    def _reset_period(self):
+        self.players = array("q")
+        self.opponent_ratings = array("d")
+        self.opponent_deviations = array("d")
+        self.scores = array("d")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, player_id: str) -> int:
+        row = self.index.get(player_id)
+        if row is None:
+            row = self.index[player_id] = len(self.ids)
+            self.ids.append(player_id)
+            if row >= len(self.rating):
+                capacity = max(16, 2 * len(self.rating))
+                self.rating = np.resize(self.rating, capacity)
+                self.deviation = np.resize(self.deviation, capacity)
+                self.volatility = np.resize(self.volatility, capacity)
+            self.rating[row] = DEFAULT_RATING
+            self.deviation[row] = DEFAULT_DEVIATION
+            self.volatility[row] = DEFAULT_VOLATILITY
+        return row
+
+    def record(self, player_id: str, opponent_rating: float, score: float,
+               opponent_deviation: float = OPPONENT_DEVIATION):
+        self.players.append(self.row(player_id))
+        self.opponent_ratings.append(opponent_rating)
+        self.opponent_deviations.append(opponent_deviation)
+        self.scores.append(score)
+
+    def record_many(self, player_ids: Iterable[str], opponent_ratings: np.ndarray, scores: np.ndarray,
+                    opponent_deviations: Optional[np.ndarray] = None):
+        rows = np.fromiter(map(self.row, player_ids), dtype=np.int64, count=len(scores))
+        if opponent_deviations is None:
+            opponent_deviations = np.full(len(scores), OPPONENT_DEVIATION)
+        self.players.frombytes(rows.tobytes())
+        self.opponent_ratings.frombytes(np.asarray(opponent_ratings, dtype=np.float64).tobytes())
+        self.opponent_deviations.frombytes(np.asarray(opponent_deviations, dtype=np.float64).tobytes())
+        self.scores.frombytes(np.asarray(scores, dtype=np.float64).tobytes())
+
+    def close_period(self, tau: float = DEFAULT_TAU, idle_periods: int = 0) -> int:
+        # Fecha o período em aberto; idle_periods períodos seguintes sem partidas só ampliam o desvio
+        n = len(self.ids)
+        games = len(self.players)
+        rating, deviation, volatility = rating_period(
+            self.rating[:n], self.deviation[:n], self.volatility[:n],
+            np.frombuffer(self.players, dtype=np.int64),
+            np.frombuffer(self.opponent_ratings, dtype=np.float64),
+            np.frombuffer(self.opponent_deviations, dtype=np.float64),
+            np.frombuffer(self.scores, dtype=np.float64),
+            tau,
+        )
+        if idle_periods:
+            phi = deviation / SCALE
+            deviation = np.minimum(np.sqrt(phi ** 2 + idle_periods * volatility ** 2) * SCALE, DEFAULT_DEVIATION)
+        self.rating[:n], self.deviation[:n], self.volatility[:n] = rating, deviation, volatility
+        self._reset_period()
+        return games
+
+    def get(self, player_id: str) -> Optional[Dict]:
+        row = self.index.get(player_id)
+        if row is None:
+            return None
+        return {
+            "rating": round(float(self.rating[row]), 1),
+            "deviation": round(float(self.deviation[row]), 1),
+            "volatility": round(float(self.volatility[row]), 6),
+        }
+
+    def export_state(self) -> Dict:
+        n = len(self.ids)
+        return {
+            "ids": self.ids,
+            "rating": self.rating[:n].tobytes(),
+            "deviation": self.deviation[:n].tobytes(),
+            "volatility": self.volatility[:n].tobytes(),
+            "period": (self.players.tobytes(), self.opponent_ratings.tobytes(),
+                       self.opponent_deviations.tobytes(), self.scores.tobytes()),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "Glicko2Table":
+        table = cls()
+        table.ids = list(state["ids"])
+        table.index = {player_id: row for row, player_id in enumerate(table.ids)}
+        table.rating = np.frombuffer(state["rating"], dtype=np.float64).copy()
+        table.deviation = np.frombuffer(state["deviation"], dtype=np.float64).copy()
+        table.volatility = np.frombuffer(state["volatility"], dtype=np.float64).copy()
+        for buffer, data in zip((table.players, table.opponent_ratings, table.opponent_deviations, table.scores),
+                                state["period"]):
+            buffer.frombytes(data)
+        return table
+
+
+class Glicko2Ratings:
+    # Tabelas Glicko-2 global e por jogo, com períodos diários: o período em aberto é
+    # fechado (em lote) na primeira partida de um dia seguinte, ou sob demanda.
+    # O primeiro período começa no dia da primeira partida, para que a reaplicação do
+    # log feche os períodos nos mesmos pontos
+    def __init__(self, tau: float = DEFAULT_TAU):
+        self.tau = tau
+        self.players = Glicko2Table()
+        self.games: Dict[str, Glicko2Table] = {}
+        self.period_start: Optional[date] = None
+
+    def record(self, player_id: str, game: Optional[str], opponent_rating: float, won: bool, moment: datetime):
+        self.maybe_close_period(moment)
+        score = 1.0 if won else 0.0
+        self.players.record(player_id, opponent_rating, score)
+        if game:
+            table = self.games.get(game)
+            if table is None:
+                table = self.games[game] = Glicko2Table()
+            table.record(player_id, opponent_rating, score)
+
+    def record_many(self, player_ids, games, opponent_ratings: np.ndarray, won: np.ndarray, moment: datetime):
+        # Lote de resultados (games[i] None = jogo sem ranking próprio)
+        self.maybe_close_period(moment)
+        scores = np.asarray(won, dtype=np.float64)
+        opponent_ratings = np.asarray(opponent_ratings, dtype=np.float64)
+        self.players.record_many(player_ids, opponent_ratings, scores)
+        by_game: Dict[str, list] = {}
+        for i, game in enumerate(games):
+            if game:
+                by_game.setdefault(game, []).append(i)
+        for game, rows in by_game.items():
+            table = self.games.get(game)
+            if table is None:
+                table = self.games[game] = Glicko2Table()
+            table.record_many([player_ids[i] for i in rows], opponent_ratings[rows], scores[rows])
+
+    def maybe_close_period(self, moment: datetime) -> bool:
+        if self.period_start is None:
+            self.period_start = moment.date()
+            return False
+        elapsed = (moment.date() - self.period_start).days
+        if elapsed <= 0:
+            return False
+        self.close_period(moment.date(), idle_periods=elapsed - 1)
+        return True
+
+    def close_period(self, next_start: date, idle_periods: int = 0) -> int:
+        games = self.players.close_period(self.tau, idle_periods)
+        for table in self.games.values():
+            table.close_period(self.tau, idle_periods)
+        self.period_start = next_start
+        return games
+
+    def get(self, player_id: str) -> Optional[Dict]:
+        overall = self.players.get(player_id)
+        if overall is None:
+            return None
+        games = {}
+        for game, table in self.games.items():
+            ratings = table.get(player_id)
+            if ratings is not None:
+                games[game] = ratings
+        return {**overall, "periodStart": self.period_start.isoformat() if self.period_start else None, "games": games}
+
+    def export_state(self) -> Dict:
+        return {
+            "tau": self.tau,
+            "period_start": self.period_start.toordinal() if self.period_start else None,
+            "players": self.players.export_state(),
+            "games": {game: table.export_state() for game, table in self.games.items()},
+        }
+
+    def import_state(self, state: Dict):
+        self.tau = state["tau"]
+        self.period_start = date.fromordinal(state["period_start"]) if state["period_start"] else None
+        self.players = Glicko2Table.from_state(state["players"])
+        self.games = {game: Glicko2Table.from_state(table) for game, table in state["games"].items()}
@@ -0,0 +1,146 @@
+from array import array
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Histórico de partidas em colunas, na ordem em que os resultados foram aplicados
+# (cronológica), mais o ponto de partida de cada jogador e de cada entrada por jogo:
+# o estado antes da primeira partida do histórico. É o que o recálculo de ratings
+# (services/rating_recompute.py) reprocessa.
+# É alimentado pelos caminhos _apply_* do serviço e vai no snapshot, então a reaplicação
+# do log o reconstrói junto com o resto do estado. Com os backends duráveis não há log
+# nem snapshot, então o serviço não mantém histórico (ele recomeçaria a cada processo).
+# Entradas por jogo criadas durante o histórico partem do rating inicial do
+# jogo, sem partidas.
+# Para não crescer sem limite, as partidas mais antigas podem ser incorporadas ao ponto
+# de partida (fold): depois disso, o recálculo não as reprocessa mais.
+
+PLAYER_BASELINE_FIELDS = ("rating", "experience", "level", "gamesPlayed", "gamesWon", "currentStreak", "bestStreak")
+ENTRY_BASELINE_FIELDS = ("rating", "gamesPlayed", "gamesWon")
+
+
+class MatchHistory:
+    def __init__(self):
+        self.player_index: Dict[str, int] = {}
+        self.player_ids: List[str] = []
+        self.game_index: Dict[str, int] = {}
+        self.game_names: List[str] = []
+        # Uma posição por partida
+        self.players = array("i")
+        self.games = array("i")
+        self.won = array("b")
+        self.game_times = array("d")
+        self.opponent_ratings = array("d")
+        self.timestamps = array("d")
+        # PLAYER_BASELINE_FIELDS de cada jogador, na ordem de player_ids
+        self.baselines = array("q")
+        # (jogador, jogo) -> ENTRY_BASELINE_FIELDS das entradas anteriores ao histórico
+        self.entry_baselines: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def start_from(self, storage):
+        # Recomeça o histórico vazio, com o estado atual como ponto de partida de todos
+        self.__init__()
+        for player in storage.iter_players():
+            self.add_player(player)
+            player_row = self.player_index[player["id"]]
+            for game, entry in storage.player_game_entries(player["id"]).items():
+                self.entry_baselines[(player_row, self._game(game))] = tuple(
+                    int(entry[field]) for field in ENTRY_BASELINE_FIELDS)
+
+    def add_player(self, player: Dict):
+        self.player_index[player["id"]] = len(self.player_ids)
+        self.player_ids.append(player["id"])
+        self.baselines.extend(int(player[field]) for field in PLAYER_BASELINE_FIELDS)
+
+    def _game(self, game_name) -> int:
+        game_name = str(game_name or "")
+        row = self.game_index.get(game_name)
+        if row is None:
+            row = self.game_index[game_name] = len(self.game_names)
+            self.game_names.append(game_name)
+        return row
+
+    def record(self, player_id: str, game_name, won: bool, game_time: float, opponent_rating: float,
+               timestamp: float):
+        self.players.append(self.player_index[player_id])
+        self.games.append(self._game(game_name))
+        self.won.append(bool(won))
+        self.game_times.append(game_time)
+        self.opponent_ratings.append(opponent_rating)
+        self.timestamps.append(timestamp)
+
+    def record_many(self, player_ids: Iterable[str], game_names: Iterable, won: np.ndarray, game_times: np.ndarray,
+                    opponent_ratings: np.ndarray, timestamp: float):
+        count = len(won)
+        self.players.frombytes(np.fromiter(map(self.player_index.__getitem__, player_ids),
+                                           dtype=np.intc, count=count).tobytes())
+        self.games.frombytes(np.fromiter(map(self._game, game_names), dtype=np.intc, count=count).tobytes())
+        self.won.frombytes(np.asarray(won, dtype=np.int8).tobytes())
+        self.game_times.frombytes(np.asarray(game_times, dtype=np.float64).tobytes())
+        self.opponent_ratings.frombytes(np.asarray(opponent_ratings, dtype=np.float64).tobytes())
+        self.timestamps.frombytes(np.full(count, timestamp).tobytes())
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        # Visões NumPy (sem cópia) das colunas
+        return {
+            "players": np.frombuffer(self.players, dtype=np.intc),
+            "games": np.frombuffer(self.games, dtype=np.intc),
+            "won": np.frombuffer(self.won, dtype=np.int8).view(np.bool_),
+            "gameTimes": np.frombuffer(self.game_times, dtype=np.float64),
+            "opponentRatings": np.frombuffer(self.opponent_ratings, dtype=np.float64),
+            "timestamps": np.frombuffer(self.timestamps, dtype=np.float64),
+        }
+
+    def prefix(self, count: int) -> "MatchHistory":
+        # Só as `count` primeiras partidas, com os mesmos pontos de partida (compartilhados)
+        history = MatchHistory()
+        history.player_index, history.player_ids = self.player_index, self.player_ids
+        history.game_index, history.game_names = self.game_index, self.game_names
+        for column, source in zip(
+                (history.players, history.games, history.won, history.game_times, history.opponent_ratings,
+                 history.timestamps),
+                (self.players, self.games, self.won, self.game_times, self.opponent_ratings, self.timestamps)):
+            column.extend(source[:count])
+        history.baselines = self.baselines
+        history.entry_baselines = self.entry_baselines
+        return history
+
+    def fold(self, count: int, result: Dict[str, np.ndarray]):
+        # Descarta as `count` primeiras partidas; `result` (rating_recompute.recompute de
+        # prefix(count)) é o estado depois delas e vira o novo ponto de partida
+        baselines = np.frombuffer(self.baselines, dtype=np.int64).reshape(-1, len(PLAYER_BASELINE_FIELDS))
+        baselines[result["players"]] = result["state"]
+        for player_row, game_row, entry in zip(result["entryPlayers"].tolist(), result["entryGames"].tolist(),
+                                               result["entries"].tolist()):
+            self.entry_baselines[(player_row, game_row)] = tuple(entry)
+        del baselines
+        for column in (self.players, self.games, self.won, self.game_times, self.opponent_ratings, self.timestamps):
+            del column[:count]
+
+    def player_baselines(self) -> np.ndarray:
+        return np.frombuffer(self.baselines, dtype=np.int64).reshape(-1, len(PLAYER_BASELINE_FIELDS))
+
+    def export_state(self) -> Dict:
+        return {
+            "player_ids": self.player_ids,
+            "game_names": self.game_names,
+            "columns": tuple(column.tobytes() for column in (
+                self.players, self.games, self.won, self.game_times, self.opponent_ratings, self.timestamps)),
+            "baselines": self.baselines.tobytes(),
+            "entry_baselines": self.entry_baselines,
+        }
+
+    def import_state(self, state: Dict):
+        self.__init__()
+        self.player_ids = list(state["player_ids"])
+        self.player_index = {player_id: row for row, player_id in enumerate(self.player_ids)}
+        self.game_names = list(state["game_names"])
+        self.game_index = {game: row for row, game in enumerate(self.game_names)}
+        columns = (self.players, self.games, self.won, self.game_times, self.opponent_ratings, self.timestamps)
+        for column, data in zip(columns, state["columns"]):
+            column.frombytes(data)
+        self.baselines.frombytes(state["baselines"])
+        self.entry_baselines = dict(state["entry_baselines"])
@@ -0,0 +1,175 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+# Agregados da plataforma mantidos a cada mutação, para que /platform/stats
+# não precise percorrer os jogadores nem ordenar as estatísticas dos jogos
+
+TOP_GAMES = 5
+ACTIVE_WINDOW_SECONDS = 8 * 24 * 3600  # últimos 7 dias completos
+BUCKET_SECONDS = 3600
+
+
+class ActivityCounter:
+    # Jogadores por hora de última atividade dentro da janela; horas que saem da
+    # janela são descartadas em ordem, então a contagem é O(1) amortizado.
+    # A precisão na borda da janela é de um bucket (uma hora)
+    def __init__(self, window_seconds: int = ACTIVE_WINDOW_SECONDS, bucket_seconds: int = BUCKET_SECONDS):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.buckets: Dict[int, int] = {}
+        self.oldest = 0  # primeiro bucket ainda dentro da janela
+        self.total = 0
+
+    def _bucket(self, moment: datetime) -> int:
+        return int(moment.timestamp() // self.bucket_seconds)
+
+    def add(self, moment: datetime):
+        bucket = self._bucket(moment)
+        if bucket >= self.oldest:
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+            self.total += 1
+
+    def remove(self, moment: datetime):
+        bucket = self._bucket(moment)
+        if bucket >= self.oldest and bucket in self.buckets:
+            self.buckets[bucket] -= 1
+            self.total -= 1
+            if not self.buckets[bucket]:
+                del self.buckets[bucket]
+
+    def move(self, before: datetime, after: datetime):
+        self.remove(before)
+        self.add(after)
+
+    def count(self, now: datetime) -> int:
+        cutoff = int((now.timestamp() - self.window_seconds) // self.bucket_seconds)
+        if cutoff - self.oldest > len(self.buckets):
+            # Salto grande no tempo: mais barato varrer os buckets existentes
+            for bucket in [b for b in self.buckets if b <= cutoff]:
+                self.total -= self.buckets.pop(bucket)
+        else:
+            for bucket in range(self.oldest, cutoff + 1):
+                self.total -= self.buckets.pop(bucket, 0)
+        self.oldest = max(self.oldest, cutoff + 1)
+        return self.total
+
+
+class TopCounter:
+    # Contadores que só crescem, com um min-heap pequeno dos `size` maiores.
+    # Empates seguem a ordem de cadastro, como a ordenação estável anterior
+    def __init__(self, size: int = TOP_GAMES):
+        self.size = size
+        self.counts: Dict[str, int] = {}
+        self.order: Dict[str, int] = {}
+        self.heap: List[Tuple[int, int, str]] = []
+
+    def add(self, name: str, count: int = 0):
+        self.order[name] = len(self.order)
+        self.counts[name] = 0
+        self.increment(name, count)
+
+    def increment(self, name: str, amount: int = 1):
+        count = self.counts[name] + amount
+        self.counts[name] = count
+        key = (count, -self.order[name], name)
+        for i, (_, _, member) in enumerate(self.heap):
+            if member == name:
+                self.heap[i] = key
+                heapq.heapify(self.heap)
+                return
+        if len(self.heap) < self.size:
+            heapq.heappush(self.heap, key)
+        elif key > self.heap[0]:
+            heapq.heapreplace(self.heap, key)
+
+    def top(self) -> List[Tuple[str, int]]:
+        return [(name, count) for count, _, name in sorted(self.heap, reverse=True)]
+
+
+class PlatformAggregates:
+    def __init__(self):
+        self.total_players = 0
+        self.level_sum = 0
+        self.total_games = 0
+        self.games = TopCounter()
+        self.active = ActivityCounter()
+
+    def player_added(self, player: Dict):
+        self.total_players += 1
+        self.level_sum += player["level"]
+        self.active.add(player["lastActive"])
+
+    def player_updated(self, old_level: int, new_level: int, old_last_active: datetime, new_last_active: datetime):
+        self.level_sum += new_level - old_level
+        self.active.move(old_last_active, new_last_active)
+
+    def game_added(self, game: str, total_games: int):
+        self.games.add(game, total_games)
+        self.total_games += total_games
+
+    def game_played(self, game: str):
+        self.games.increment(game)
+        self.total_games += 1
+
+    def rebuild(self, storage):
+        # Recalcula tudo a partir do armazenamento (uma vez, ao abrir ou recuperar o estado)
+        self.__init__()
+        for game, stats in storage.all_game_stats().items():
+            self.game_added(game, stats["totalGames"])
+        for player in storage.iter_players():
+            self.player_added(player)
+
+    def average_level(self) -> float:
+        return self.level_sum / self.total_players if self.total_players else 0
+
+    def active_players(self, now: datetime) -> int:
+        return self.active.count(now)
+
+
+class StoredGames:
+    def __init__(self, storage):
+        self.storage = storage
+
+    def top(self) -> List[Tuple[str, int]]:
+        # sorted é estável: empates seguem a ordem de cadastro, como no TopCounter
+        games = [(name, stats["totalGames"]) for name, stats in self.storage.all_game_stats().items()]
+        return sorted(games, key=lambda game: -game[1])[:TOP_GAMES]
+
+
+class StoredAggregates:
+    # Mesma interface de PlatformAggregates, lida do armazenamento a cada consulta. Para
+    # armazenamentos compartilhados entre processos (SharedMemoryStorage): contadores
+    # mantidos por este processo não veriam as escritas dos outros. Mutações são no-ops
+    def __init__(self, storage):
+        self.storage = storage
+        self.games = StoredGames(storage)
+
+    def player_added(self, player: Dict):
+        pass
+
+    def player_updated(self, old_level: int, new_level: int, old_last_active: datetime, new_last_active: datetime):
+        pass
+
+    def game_added(self, game: str, total_games: int):
+        pass
+
+    def game_played(self, game: str):
+        pass
+
+    def rebuild(self, storage):
+        pass
+
+    @property
+    def total_players(self) -> int:
+        return self.storage.count_players()
+
+    @property
+    def total_games(self) -> int:
+        return sum(stats["totalGames"] for stats in self.storage.all_game_stats().values())
+
+    def average_level(self) -> float:
+        return self.storage.average_level()
+
+    def active_players(self, now: datetime) -> int:
+        return self.storage.count_active_since(now - timedelta(seconds=ACTIVE_WINDOW_SECONDS))
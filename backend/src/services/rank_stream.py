@@ -0,0 +1,283 @@
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.notifier import Notifier
+
+# Atualizações de ranking por Server-Sent Events, no lugar de re-consultar os rankings.
+#
+# Assinantes com os mesmos parâmetros (top-N global, top-N de um jogo ou janela ao
+# redor de um jogador) compartilham uma StreamView. Uma única thread publicadora verifica,
+# a cada `interval` segundos, as versões dos rankings com assinantes (ranking_version);
+# só as views cujo ranking mudou são relidas, e as mudanças acumuladas no intervalo
+# viram um único quadro de diferenças (posição e rating de quem mudou, quem saiu).
+# Cada quadro é serializado uma vez e guardado num anel com número de sequência: os
+# assinantes leem os mesmos bytes, e quem ficou para trás do anel recebe o quadro
+# completo (snapshot) em vez das diferenças perdidas.
+# O id SSE é "<época>-<sequência>": cada view criada tem uma época nova (a sequência
+# recomeça quando a view é recriada, ou com o processo), e um Last-Event-ID de outra
+# época ou à frente da sequência atual recebe o snapshot.
+
+DEFAULT_INTERVAL = 0.25
+RING_FRAMES = 64
+HEARTBEAT_SECONDS = 15
+MAX_STREAM_LIMIT = 100
+MAX_STREAM_RADIUS = 25
+KEEP_ALIVE = b": keep-alive\n\n"
+
+# Épocas crescentes no processo, a partir do relógio: não se repetem entre reinícios
+_epochs = itertools.count(time.time_ns() // 1000)
+
+
+def _frame(event: str, event_id: str, payload: Dict) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _rows(leaderboard: List[Dict]) -> List[Dict]:
+    # Linhas do ranking global ou por jogo na mesma forma
+    return [{
+        "rank": entry["rank"],
+        "id": entry.get("id", entry.get("playerId")),
+        "name": entry.get("name", entry.get("playerName")),
+        "rating": entry["rating"],
+    } for entry in leaderboard]
+
+
+class StreamView:
+    def __init__(self, key: Tuple, ranking: str, load: Callable[[], List[Dict]]):
+        self.key = key
+        self.ranking = ranking
+        self.load = load
+        self.version = None
+        self.rows: List[Dict] = []
+        self.epoch = next(_epochs)
+        self.sequence = 0
+        self.snapshot = b""
+        self.frames: deque = deque(maxlen=RING_FRAMES)
+        self.notifier = Notifier()  # acorda assinantes em threads e em corrotinas
+        self.condition = self.notifier.condition
+        self.subscribers = 0
+
+    def refresh(self, version) -> bool:
+        # Relê a view; publica um quadro só se algo visível mudou
+        rows = self.load()
+        self.version = version
+        previous = {row["id"]: row for row in self.rows}
+        changes = []
+        for row in rows:
+            before = previous.pop(row["id"], None)
+            if before is None or before["rank"] != row["rank"] or before["rating"] != row["rating"]:
+                changes.append({
+                    **row,
+                    "previousRank": before["rank"] if before else None,
+                    "previousRating": before["rating"] if before else None,
+                })
+        if not changes and not previous and self.sequence:
+            return False
+        with self.condition:
+            self.sequence += 1
+            published_at = round(time.time() * 1000)
+            if self.sequence > 1:
+                self.frames.append((self.sequence, _frame("diff", f"{self.epoch}-{self.sequence}", {
+                    "changes": changes, "removed": list(previous), "publishedAt": published_at,
+                })))
+            self.rows = rows
+            self.snapshot = _frame("snapshot", f"{self.epoch}-{self.sequence}", {"entries": rows, "publishedAt": published_at})
+            self.notifier.notify_all()
+        return True
+
+    def since(self, sequence: int) -> Tuple[int, Optional[List[bytes]]]:
+        # (sequência atual, quadros depois de `sequence`); None se o anel já os descartou
+        current = self.sequence
+        if sequence >= current:
+            return current, []
+        if not self.frames or self.frames[0][0] > sequence + 1:
+            return current, None
+        return current, [frame for number, frame in self.frames if number > sequence]
+
+
+class Subscription:
+    def __init__(self, stream: "RankStream", view: StreamView):
+        self.stream = stream
+        self.view = view
+        self.closed = False
+
+    def close(self):
+        # Idempotente: chamado ao fim do gerador e pelo servidor ao fechar a resposta
+        # (um gerador que nunca começou não executa o finally)
+        if not self.closed:
+            self.closed = True
+            self.stream.unsubscribe(self.view)
+
+    def _first(self, last_event_id: Optional[str]) -> Tuple[int, bytes]:
+        # Snapshot ou o que faltou desde Last-Event-ID (com view.condition adquirido)
+        # Só continua de Last-Event-ID da mesma época e não à frente da view; senão, snapshot
+        view = self.view
+        epoch, _, last_sequence = (last_event_id or "").partition("-")
+        if epoch == str(view.epoch) and last_sequence.isdigit() and int(last_sequence) <= view.sequence:
+            sequence, frames = view.since(int(last_sequence))
+        else:
+            sequence, frames = view.sequence, None
+        return sequence, (b"".join(frames) if frames is not None else view.snapshot) or KEEP_ALIVE
+
+    def _next(self, sequence: int) -> Tuple[int, bytes]:
+        current, frames = self.view.since(sequence)
+        return current, (self.view.snapshot if frames is None else b"".join(frames)) or KEEP_ALIVE
+
+    def events(self, last_event_id: Optional[str] = None, heartbeat: float = HEARTBEAT_SECONDS) -> Iterator[bytes]:
+        # Corpo da resposta text/event-stream: snapshot (ou o que faltou desde Last-Event-ID)
+        # e depois os quadros de diferenças; comentários de keep-alive quando nada muda
+        view = self.view
+        try:
+            with view.condition:
+                sequence, body = self._first(last_event_id)
+            yield body
+            while not self.stream.closed:
+                with view.condition:
+                    if view.sequence == sequence:
+                        view.notifier.wait(heartbeat)
+                    sequence, body = self._next(sequence)
+                yield body
+        finally:
+            self.close()
+
+    async def async_events(self, last_event_id: Optional[str] = None,
+                           heartbeat: float = HEARTBEAT_SECONDS) -> AsyncIterator[bytes]:
+        # O mesmo corpo de events() para o modo asyncio: cada assinante é uma corrotina
+        view = self.view
+        try:
+            with view.condition:
+                sequence, body = self._first(last_event_id)
+            yield body
+            while not self.stream.closed:
+                with view.condition:
+                    waiter = view.notifier.future() if view.sequence == sequence else None
+                if waiter is not None:
+                    await view.notifier.wait_async(waiter, heartbeat)
+                with view.condition:
+                    sequence, body = self._next(sequence)
+                yield body
+        finally:
+            self.close()
+
+
+class RankStream:
+    def __init__(self, service, interval: float = DEFAULT_INTERVAL):
+        self.service = service
+        self.interval = interval
+        self.views: Dict[Tuple, StreamView] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.closed = False
+        self.refreshes = 0
+        self.frames_published = 0
+
+    def _view_for(self, key: Tuple) -> Tuple[str, Callable[[], List[Dict]]]:
+        kind = key[0]
+        service = self.service
+        if kind == "global":
+            _, limit = key
+            return "global", lambda: _rows(service.get_global_leaderboard(limit=limit)["leaderboard"])
+        if kind == "game":
+            _, game, limit = key
+            return f"game:{game}", lambda: _rows(service.get_game_leaderboard(game, limit=limit)["leaderboard"])
+        _, player_id, radius, game = key
+        if game:
+            return f"game:{game}", lambda: _rows(
+                service.get_game_leaderboard(game, around=player_id, radius=radius)["leaderboard"])
+        return "global", lambda: _rows(service.get_global_leaderboard(around=player_id, radius=radius)["leaderboard"])
+
+    @staticmethod
+    def view_key(view: str = "global", game: Optional[str] = None, limit: int = 10,
+                 player_id: Optional[str] = None, radius: int = 5) -> Tuple:
+        # Assinaturas com a mesma chave compartilham a view
+        if not 1 <= limit <= MAX_STREAM_LIMIT or not 0 <= radius <= MAX_STREAM_RADIUS:
+            raise ValueError(f"limit deve estar entre 1 e {MAX_STREAM_LIMIT} e radius entre 0 e {MAX_STREAM_RADIUS}")
+        if view == "global":
+            return "global", limit
+        if view == "game":
+            if not game:
+                raise ValueError("Parâmetro game obrigatório")
+            return "game", game, limit
+        if view == "around":
+            if not player_id:
+                raise ValueError("Parâmetro player obrigatório")
+            return "around", player_id, radius, game
+        raise ValueError(f"View {view} inválida")
+
+    def subscribe(self, key: Tuple) -> Subscription:
+        with self._lock:
+            stream_view = self.views.get(key)
+            if stream_view is None:
+                # Primeira leitura feita aqui: parâmetros inválidos (jogo ou jogador
+                # inexistente) falham na assinatura, com o ValueError do serviço
+                ranking, load = self._view_for(key)
+                stream_view = StreamView(key, ranking, load)
+                stream_view.refresh(self.service.ranking_version(ranking))
+                self.views[key] = stream_view
+            stream_view.subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._publish_loop, name="rank-stream", daemon=True)
+                self._thread.start()
+        return Subscription(self, stream_view)
+
+    def subscribe_loaded(self, key: Tuple) -> Optional[Subscription]:
+        # Sem ler o ranking nem esperar o lock (para o event loop do modo asyncio):
+        # None se a view ainda não existe ou o lock está ocupado, e aí vale subscribe()
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            stream_view = self.views.get(key)
+            if stream_view is None:
+                return None
+            stream_view.subscribers += 1
+        finally:
+            self._lock.release()
+        return Subscription(self, stream_view)
+
+    def unsubscribe(self, view: StreamView):
+        with self._lock:
+            view.subscribers -= 1
+            if not view.subscribers and self.views.get(view.key) is view:
+                del self.views[view.key]
+
+    def _publish_loop(self):
+        while not self.closed:
+            time.sleep(self.interval)
+            with self._lock:
+                views = list(self.views.values())
+            versions: Dict[str, object] = {}
+            for view in views:
+                if view.ranking not in versions:
+                    versions[view.ranking] = self.service.ranking_version(view.ranking)
+                if versions[view.ranking] == view.version:
+                    continue
+                try:
+                    published = view.refresh(versions[view.ranking])
+                except ValueError:
+                    # Ex.: jogador da janela não está mais no ranking; tenta de novo na próxima versão
+                    view.version = versions[view.ranking]
+                    continue
+                self.refreshes += 1
+                self.frames_published += published
+
+    def close(self):
+        self.closed = True
+        with self._lock:
+            views = list(self.views.values())
+        for view in views:
+            with view.condition:
+                view.notifier.notify_all()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "views": len(self.views),
+                "subscribers": sum(view.subscribers for view in self.views.values()),
+                "refreshes": self.refreshes,
+                "framesPublished": self.frames_published,
+            }
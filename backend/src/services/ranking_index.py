@@ -0,0 +1,242 @@
+import random
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+# Altura máxima da skip list (suficiente para bem mais de 10M de elementos com p = 1/4)
+MAX_LEVEL = 24
+LEVEL_PROBABILITY = 0.25
+
+# Gerador próprio para os níveis dos nós, sem consumir o estado global de random
+_level_random = random.Random()
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        # width[i] = quantas posições o ponteiro next[i] avança na lista base
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    # Skip list ordenada com larguras por nível (estatística de ordem):
+    # insert/remove/rank/posição em O(log n), fatias de m elementos em O(log n + m)
+
+    def __init__(self):
+        self.head = _Node(None, MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < MAX_LEVEL and _level_random.random() < LEVEL_PROBABILITY:
+            level += 1
+        return level
+
+    def insert(self, key: Any) -> None:
+        top = self.level
+        update: List[_Node] = [self.head] * top
+        steps = [0] * top
+        node = self.head
+        position = 0
+        for i in range(top - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and nxt.key < key:
+                position += node.width[i]
+                node = nxt
+                nxt = node.next[i]
+            update[i] = node
+            steps[i] = position
+
+        level = self._random_level()
+        if level > top:
+            for i in range(top, level):
+                update.append(self.head)
+                steps.append(0)
+                self.head.width[i] = self.size + 1
+            self.level = top = level
+
+        new_node = _Node(key, level)
+        next_pointers = new_node.next
+        widths = new_node.width
+        for i in range(level):
+            prev = update[i]
+            skipped = position - steps[i]
+            next_pointers[i] = prev.next[i]
+            prev.next[i] = new_node
+            widths[i] = prev.width[i] - skipped
+            prev.width[i] = skipped + 1
+        for i in range(level, top):
+            update[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key: Any) -> None:
+        update: List[_Node] = [self.head] * self.level
+        node = self.head
+        for i in range(self.level - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and nxt.key < key:
+                node = nxt
+                nxt = node.next[i]
+            update[i] = node
+
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for i in range(self.level):
+            prev = update[i]
+            if prev.next[i] is target:
+                prev.next[i] = target.next[i]
+                prev.width[i] += target.width[i] - 1
+            else:
+                prev.width[i] -= 1
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+
+    def rank(self, key: Any) -> int:
+        # Posição (base 0) da chave; KeyError se não existir
+        node = self.head
+        position = 0
+        for i in range(self.level - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and nxt.key < key:
+                position += node.width[i]
+                node = nxt
+                nxt = node.next[i]
+        target = node.next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+        return position
+
+    def bisect_right(self, key: Any) -> int:
+        # Quantidade de chaves <= key (posição base 0 da primeira chave maior)
+        node = self.head
+        position = 0
+        for i in range(self.level - 1, -1, -1):
+            nxt = node.next[i]
+            while nxt is not None and nxt.key <= key:
+                position += node.width[i]
+                node = nxt
+                nxt = node.next[i]
+        return position
+
+    def _node_at(self, index: int) -> Optional[_Node]:
+        if index < 0 or index >= self.size:
+            return None
+        node = self.head
+        remaining = index + 1
+        for i in range(self.level - 1, -1, -1):
+            while node.next[i] is not None and node.width[i] <= remaining:
+                remaining -= node.width[i]
+                node = node.next[i]
+        return node
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self.size
+        node = self._node_at(index)
+        if node is None:
+            raise IndexError(index)
+        return node.key
+
+    def slice(self, start: int, count: int) -> List[Any]:
+        keys: List[Any] = []
+        node = self._node_at(max(0, start))
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+    def __iter__(self) -> Iterator[Any]:
+        node = self.head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    @classmethod
+    def from_sorted(cls, keys: Iterable[Any]) -> "IndexableSkipList":
+        # Construção em O(n) a partir de chaves já ordenadas (usada ao recarregar estado)
+        skiplist = cls()
+        tails: List[_Node] = [skiplist.head] * MAX_LEVEL
+        tail_positions = [0] * MAX_LEVEL
+        position = 0
+        for key in keys:
+            position += 1
+            level = skiplist._random_level()
+            node = _Node(key, level)
+            for i in range(level):
+                tails[i].next[i] = node
+                tails[i].width[i] = position - tail_positions[i]
+                tails[i] = node
+                tail_positions[i] = position
+            if level > skiplist.level:
+                skiplist.level = level
+        # Os últimos nós de cada nível apontam para o "fim" da lista
+        for i in range(MAX_LEVEL):
+            tails[i].width[i] = position + 1 - tail_positions[i]
+        skiplist.size = position
+        return skiplist
+
+
+class RankingIndex:
+    # Índice de ranking incremental: ordem decrescente por (score principal, desempate),
+    # com o id do jogador como desempate final para manter a ordem determinística
+
+    def __init__(self):
+        self._keys: Dict[Hashable, Tuple] = {}
+        self._list = IndexableSkipList()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, member_id: Hashable) -> bool:
+        return member_id in self._keys
+
+    @staticmethod
+    def _make_key(member_id: Hashable, score: float, tiebreak: float) -> Tuple:
+        return (-score, -tiebreak, member_id)
+
+    def update(self, member_id: Hashable, score: float, tiebreak: float = 0) -> None:
+        key = self._make_key(member_id, score, tiebreak)
+        old_key = self._keys.get(member_id)
+        if old_key == key:
+            return
+        if old_key is not None:
+            self._list.remove(old_key)
+        self._list.insert(key)
+        self._keys[member_id] = key
+
+    def discard(self, member_id: Hashable) -> None:
+        old_key = self._keys.pop(member_id, None)
+        if old_key is not None:
+            self._list.remove(old_key)
+
+    def rank(self, member_id: Hashable) -> Optional[int]:
+        # Posição no ranking começando em 1 (None se o jogador não estiver indexado)
+        key = self._keys.get(member_id)
+        if key is None:
+            return None
+        return self._list.rank(key) + 1
+
+    def range(self, start: int, count: int) -> List[Hashable]:
+        # Ids nas posições [start, start + count) (base 0)
+        return [key[2] for key in self._list.slice(start, count)]
+
+    def position_after(self, member_id: Hashable, score: float, tiebreak: float = 0) -> int:
+        # Posição (base 0) do primeiro membro depois da chave (score, tiebreak, member_id),
+        # exista ela ou não no índice: base da paginação por cursor (keyset)
+        return self._list.bisect_right(self._make_key(member_id, score, tiebreak))
+
+    def top(self, count: int) -> List[Hashable]:
+        return self.range(0, count)
+
+    def rebuild(self, entries: Iterable[Tuple[Hashable, float, float]]) -> None:
+        self._keys = {member_id: self._make_key(member_id, score, tiebreak)
+                      for member_id, score, tiebreak in entries}
+        self._list = IndexableSkipList.from_sorted(sorted(self._keys.values()))
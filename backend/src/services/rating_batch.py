@@ -0,0 +1,46 @@
+from typing import Hashable, List, Sequence
+
+import numpy as np
+
+# Operações vetorizadas usadas na ingestão de resultados em lote.
+# As fórmulas espelham update_player_after_game (ELO simplificado e experiência).
+
+# Expoente máximo de 10 na pontuação esperada: acima disso ela já é 0 em ponto flutuante,
+# e pow() levantaria OverflowError onde o NumPy daria inf
+MAX_ELO_EXPONENT = 300
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    # Versão escalar da pontuação esperada de elo_changes, com o mesmo resultado
+    return 1 / (1 + pow(10, min((opponent_rating - rating) / 400, MAX_ELO_EXPONENT)))
+
+
+def occurrence_waves(keys: Sequence[Hashable]) -> List[np.ndarray]:
+    # Divide o lote em "ondas": a k-ésima ocorrência de cada jogador vai para a onda k.
+    # Dentro de uma onda cada jogador aparece uma única vez, então aplicar as ondas em
+    # ordem reproduz exatamente o processamento sequencial resultado a resultado.
+    seen = {}
+    occurrences = np.empty(len(keys), dtype=np.int64)
+    for i, key in enumerate(keys):
+        occurrence = seen.get(key, 0)
+        occurrences[i] = occurrence
+        seen[key] = occurrence + 1
+
+    if not len(keys):
+        return []
+    order = np.argsort(occurrences, kind="stable")
+    boundaries = np.flatnonzero(np.diff(occurrences[order])) + 1
+    return np.split(order, boundaries)
+
+
+def elo_changes(ratings: np.ndarray, opponent_ratings: np.ndarray, won: np.ndarray, k_factor: int) -> np.ndarray:
+    expected = 1 / (1 + np.power(10.0, np.minimum((opponent_ratings - ratings) / 400, MAX_ELO_EXPONENT)))
+    # np.rint arredonda metades para o par, como round() do Python
+    return np.rint(k_factor * (won - expected)).astype(np.int64)
+
+
+def experience_gains(won: np.ndarray, game_times: np.ndarray, streaks: np.ndarray) -> np.ndarray:
+    base_exp = np.where(won, 100, 25)
+    time_bonus = np.maximum(0, 30 - (game_times // 60))  # Bônus por jogos rápidos
+    streak_bonus = np.where(streaks > 1, streaks * 10, 0)
+    return (base_exp + time_bonus + streak_bonus).astype(np.int64)
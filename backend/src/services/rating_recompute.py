@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.match_history import PLAYER_BASELINE_FIELDS, MatchHistory
+from services.rating_batch import elo_changes, expected_score, experience_gains
+
+# Recálculo offline de rating, sequências, experiência e nível (globais e por jogo) a
+# partir do histórico de partidas, com as regras atuais (K, piso, fórmula de experiência).
+#
+# O resultado de uma partida só depende do estado do próprio jogador (o adversário entra
+# como um número, opponentRating), então os jogadores são independentes entre si: cada
+# processo do pool fica com os jogadores de índice ≡ shard (mod shards) — e com as
+# entradas por jogo deles. Particionar por jogo não funcionaria: rating global,
+# sequência e experiência atravessam os jogos de um mesmo jogador.
+# Cada processo percorre o histórico em trechos cronológicos; dentro do trecho, a
+# k-ésima partida de cada jogador vai para a onda k e cada onda é uma operação NumPy
+# sobre todos os seus jogadores (mesma ideia de rating_batch.occurrence_waves).
+#
+# Uso (com o servidor parado): python -m services.rating_recompute <data_dir> [processos]
+
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+# Estado herdado pelos processos filhos via fork
+_history: Optional[MatchHistory] = None
+
+RATING, EXPERIENCE, LEVEL, GAMES_PLAYED, GAMES_WON, CURRENT_STREAK, BEST_STREAK = range(len(PLAYER_BASELINE_FIELDS))
+# Ondas com menos posições que isso custam mais em chamadas NumPy do que um laço
+# escalar; sobram só as partidas finais dos poucos jogadores muito ativos no trecho
+MIN_WAVE = 32
+
+
+def _waves(keys: np.ndarray, min_wave: int = MIN_WAVE) -> Tuple[List[np.ndarray], np.ndarray]:
+    # Posições do trecho agrupadas por ocorrência da chave: a onda k tem a k-ésima
+    # partida de cada chave, então nenhuma chave se repete dentro de uma onda. As ondas
+    # só encolhem; as menores que min_wave voltam juntas, em ordem cronológica
+    # Ordenações estáveis feitas como np.sort de (chave * n + posição): bem mais rápido
+    # que argsort(kind="stable")
+    n = len(keys)
+    if not n:
+        return [], np.empty(0, dtype=np.int64)
+    sorted_keys, order = np.divmod(np.sort(keys.astype(np.int64) * n + np.arange(n)), n)
+    starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    lengths = np.diff(np.append(starts, n))
+    occurrence = np.arange(n) - np.repeat(starts, lengths)
+    grouped = np.sort(occurrence * n + order) % n
+    bounds = np.cumsum(np.bincount(occurrence))
+    wide = int(np.count_nonzero(np.diff(np.concatenate(([0], bounds))) >= min_wave))
+    split = int(bounds[wide - 1]) if wide else 0
+    return np.split(grouped[:split], bounds[:wide - 1]) if wide else [], np.sort(grouped[split:])
+
+
+def _scalar_players(keys, won, opponent_ratings, game_times, state, k_factor: int, min_rating: int):
+    # Mesmas fórmulas de update_player_after_game, partida a partida
+    if not len(keys):
+        return
+    touched = np.unique(keys)
+    columns = (RATING, CURRENT_STREAK, BEST_STREAK, EXPERIENCE)
+    current = dict(zip(touched.tolist(), state[np.ix_(touched, columns)].tolist()))
+    for key, player_won, opponent_rating, game_time in zip(keys.tolist(), won.tolist(), opponent_ratings.tolist(),
+                                                           game_times.tolist()):
+        rating, streak, best_streak, experience = current[key]
+        rating = max(min_rating, rating + round(k_factor * (player_won - expected_score(rating, opponent_rating))))
+        streak = streak + 1 if player_won else 0
+        experience += ((100 if player_won else 25) + max(0, 30 - int(game_time // 60))
+                       + (streak * 10 if streak > 1 else 0))
+        current[key] = [rating, streak, max(best_streak, streak), experience]
+    state[np.ix_(touched, columns)] = [current[key] for key in touched.tolist()]
+
+
+def _scalar_entries(keys, won, opponent_ratings, entry_rating, k_factor: int, min_rating: int):
+    if not len(keys):
+        return
+    touched = np.unique(keys)
+    current = dict(zip(touched.tolist(), entry_rating[touched].tolist()))
+    for key, player_won, opponent_rating in zip(keys.tolist(), won.tolist(), opponent_ratings.tolist()):
+        rating = current[key]
+        change = round(k_factor * (player_won - expected_score(rating, opponent_rating)))
+        current[key] = max(min_rating, rating + change)
+    entry_rating[touched] = [current[key] for key in touched.tolist()]
+
+
+def _recompute_shard(task) -> Dict[str, np.ndarray]:
+    shard, shards, known_games, k_factor, min_rating, initial_game_rating, chunk_size = task
+    columns = _history.columns()
+    players, games = columns["players"], columns["games"]
+    won, game_times, opponent_ratings = columns["won"], columns["gameTimes"], columns["opponentRatings"]
+
+    # Linha local do jogador p no shard: p // shards. Entradas por jogo em linhas densas:
+    # linha local * jogos com ranking + posição do jogo entre eles
+    shard_players = np.arange(shard, len(_history.player_ids), shards)
+    state = _history.player_baselines()[shard_players].copy()
+    played = np.zeros(len(shard_players), dtype=np.int64)
+    game_slots = np.full(max(1, len(_history.game_names)), -1, dtype=np.int64)
+    game_slots[list(known_games)] = np.arange(len(known_games))
+    ranked = len(known_games)
+    entry_rating = np.full(len(shard_players) * ranked, initial_game_rating, dtype=np.int64)
+    entry_played = np.zeros(len(entry_rating), dtype=np.int32)
+    entry_won = np.zeros(len(entry_rating), dtype=np.int32)
+    entry_matches = np.zeros(len(entry_rating), dtype=np.int32)
+    for (player_row, game_row), (rating, games_played, games_won) in _history.entry_baselines.items():
+        if player_row % shards == shard and game_slots[game_row] >= 0:
+            entry = player_row // shards * ranked + game_slots[game_row]
+            entry_rating[entry], entry_played[entry], entry_won[entry] = rating, games_played, games_won
+
+    rating = state[:, RATING]
+    experience = state[:, EXPERIENCE]
+    streak = state[:, CURRENT_STREAK]
+    best = state[:, BEST_STREAK]
+    for start in range(0, len(players), chunk_size):
+        rows = slice(start, start + chunk_size)
+        if shards > 1:
+            rows = start + np.flatnonzero(players[rows] % shards == shard)
+        local = players[rows] // shards
+        chunk_won = won[rows]
+        chunk_opponents = opponent_ratings[rows]
+        chunk_times = game_times[rows]
+        played += np.bincount(local, minlength=len(played))
+        state[:, GAMES_WON] += np.bincount(local, weights=chunk_won, minlength=len(played)).astype(np.int64)
+        waves, tail = _waves(local)
+        for wave in waves:
+            p = local[wave]
+            w = chunk_won[wave]
+            r = rating[p]
+            rating[p] = np.maximum(min_rating, r + elo_changes(r.astype(np.float64), chunk_opponents[wave], w, k_factor))
+            s = np.where(w, streak[p] + 1, 0)
+            streak[p] = s
+            best[p] = np.maximum(best[p], s)
+            experience[p] += experience_gains(w, chunk_times[wave], s)
+        _scalar_players(local[tail], chunk_won[tail], chunk_opponents[tail], chunk_times[tail], state,
+                        k_factor, min_rating)
+
+        slots = game_slots[games[rows]]
+        in_game = slots >= 0
+        keys = local[in_game] * ranked + slots[in_game]
+        game_won = chunk_won[in_game]
+        game_opponents = chunk_opponents[in_game]
+        entry_matches += np.bincount(keys, minlength=len(entry_rating)).astype(np.int32)
+        entry_won += np.bincount(keys, weights=game_won, minlength=len(entry_rating)).astype(np.int32)
+        waves, tail = _waves(keys)
+        for wave in waves:
+            e = keys[wave]
+            r = entry_rating[e]
+            entry_rating[e] = np.maximum(
+                min_rating, r + elo_changes(r.astype(np.float64), game_opponents[wave], game_won[wave], k_factor))
+        _scalar_entries(keys[tail], game_won[tail], game_opponents[tail], entry_rating, k_factor, min_rating)
+
+    # Só quem tem partidas no histórico
+    active = np.flatnonzero(played)
+    state[:, GAMES_PLAYED] += played
+    state[:, LEVEL] = experience // 1000 + 1
+    entries = np.flatnonzero(entry_matches)
+    entry_players, entry_slots = np.divmod(entries, max(1, ranked))
+    return {
+        "players": shard_players[active],
+        "state": state[active],
+        "entryPlayers": shard_players[entry_players],
+        "entryGames": np.asarray(known_games, dtype=np.int64)[entry_slots],
+        "entries": np.column_stack((entry_rating[entries], entry_played[entries] + entry_matches[entries],
+                                    entry_won[entries])),
+    }
+
+
+def recompute(history: MatchHistory, known_games: Iterable[str], k_factor: int, min_rating: int,
+              initial_game_rating: int, workers: int = DEFAULT_WORKERS,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    # Estado final de quem tem partidas no histórico: "state" tem PLAYER_BASELINE_FIELDS por
+    # linha de "players"; "entries" tem ENTRY_BASELINE_FIELDS por (entryPlayers, entryGames).
+    # Jogos fora de known_games (sem ranking próprio) só contam no perfil
+    global _history
+    known = [history.game_index[game] for game in known_games if game in history.game_index]
+    shards = max(1, min(workers, len(history.player_ids)))
+    tasks = [(shard, shards, known, k_factor, min_rating, initial_game_rating, chunk_size) for shard in range(shards)]
+    _history = history
+    try:
+        if shards > 1 and "fork" in multiprocessing.get_all_start_methods():
+            with multiprocessing.get_context("fork").Pool(shards) as pool:
+                results = pool.map(_recompute_shard, tasks)
+        else:
+            results = [_recompute_shard(task) for task in tasks]
+    finally:
+        _history = None
+    return {key: np.concatenate([result[key] for result in results]) for key in results[0]}
+
+
+if __name__ == '__main__':
+    from services.leaderboard_service import LeaderboardService
+
+    if len(sys.argv) < 2:
+        print("Uso: python -m services.rating_recompute <data_dir> [processos]")
+        sys.exit(1)
+    started = time.perf_counter()
+    service = LeaderboardService(data_dir=sys.argv[1])
+    try:
+        summary = service.recompute_ratings(workers=int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_WORKERS)
+    finally:
+        service.close()
+    print(f"{summary['matches']:,} partidas, {summary['players']:,} jogadores e {summary['entries']:,} entradas "
+          f"por jogo recalculados em {summary['seconds']:.2f} s ({summary['ratingsChanged']:,} ratings mudaram); "
+          f"total com carga e snapshot: {time.perf_counter() - started:.2f} s")
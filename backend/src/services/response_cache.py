@@ -0,0 +1,81 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+# Cache LRU de respostas já serializadas, indexado por (endpoint, parâmetros, versão).
+# A versão vem do LeaderboardService e só muda quando o ranking muda, então uma entrada
+# nunca fica desatualizada: versões antigas simplesmente deixam de ser pedidas.
+# Cada corpo recebe um ETag único (token do processo + sequência), o que permite
+# responder 304 a If-None-Match sem reconstruir nem reenviar o corpo.
+
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, Tuple[str, bytes]]" = OrderedDict()
+        # (endpoint, parâmetros) -> chave da versão em cache, para descartar versões antigas
+        self._latest: Dict[Tuple, Tuple] = {}
+        self._lock = threading.Lock()
+        # O token distingue ETags entre reinícios (as versões recomeçam do zero)
+        self._token = uuid.uuid4().hex[:12]
+        self._sequence = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.bytes_served_from_cache = 0
+        self.bytes_not_sent = 0
+
+    def get(self, endpoint: str, params: Hashable, version: Hashable,
+            build: Callable[[], bytes]) -> Tuple[str, bytes]:
+        key = (endpoint, params, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.bytes_served_from_cache += len(entry[1])
+                return entry
+
+        # Construção fora do lock; duas requisições simultâneas podem construir a mesma
+        # versão, e a última a terminar fica no cache (corpos idênticos)
+        body = build()
+        with self._lock:
+            self.misses += 1
+            self._sequence += 1
+            entry = (f'"{self._token}-{self._sequence}"', body)
+            previous = self._latest.get((endpoint, params))
+            if previous is not None and previous != key:
+                self._entries.pop(previous, None)
+            self._latest[(endpoint, params)] = key
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                (old_endpoint, old_params, old_version), _ = self._entries.popitem(last=False)
+                if self._latest.get((old_endpoint, old_params)) == (old_endpoint, old_params, old_version):
+                    del self._latest[(old_endpoint, old_params)]
+                self.evictions += 1
+        return entry
+
+    def record_not_modified(self, body: bytes):
+        with self._lock:
+            self.not_modified += 1
+            self.bytes_not_sent += len(body)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hitRate": self.hits / lookups if lookups else 0,
+                "notModified": self.not_modified,
+                "evictions": self.evictions,
+                "bytesServedFromCache": self.bytes_served_from_cache,
+                "bytesNotSent": self.bytes_not_sent,
+            }
@@ -0,0 +1,183 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from services.ranking_index import RankingIndex
+
+
+class MemoryStorage:
+    # Armazenamento padrão do LeaderboardService: dicionários em memória + índices de ranking.
+    # Jogadores e entradas por jogo são dicts; quem altera um dict chama save_* para
+    # manter os índices (em outros backends, save_* grava a linha correspondente).
+    durable = False
+    # Estado visto só por este processo: agregados e versões de ranking ficam no serviço
+    shared = False
+
+    def __init__(self):
+        self.players: Dict[str, Dict] = {}
+        self.game_stats: Dict[str, Dict] = {}
+
+        # Índice de ranking global por (rating, experiência)
+        self.global_ranking = RankingIndex()
+
+        # Ratings por jogo: entradas por jogo, índice reverso por jogador e ranking por jogo
+        self.game_players: Dict[str, Dict[str, Dict]] = {}
+        self.player_games: Dict[str, Dict[str, Dict]] = {}
+        self.game_rankings: Dict[str, RankingIndex] = {}
+
+        # Com indexação adiada (reaplicação do log), os índices são reconstruídos ao final
+        self.deferred_indexing = False
+
+    def is_empty(self) -> bool:
+        return not self.players and not self.game_stats
+
+    @contextmanager
+    def transaction(self):
+        yield
+
+    def close(self):
+        pass
+
+    def after_fork(self):
+        # Processos filhos leem a cópia copy-on-write herdada; nada a reabrir
+        pass
+
+    # ===== JOGADORES =====
+
+    def has_player(self, player_id: str) -> bool:
+        return player_id in self.players
+
+    def get_player(self, player_id: str) -> Optional[Dict]:
+        return self.players.get(player_id)
+
+    def get_players(self, player_ids: Iterable[str]) -> List[Dict]:
+        return [self.players[player_id] for player_id in player_ids]
+
+    def iter_players(self) -> Iterator[Dict]:
+        return iter(self.players.values())
+
+    def player_ids(self) -> List[str]:
+        return list(self.players)
+
+    def add_player(self, player: Dict):
+        self.players[player["id"]] = player
+        self.save_player(player)
+
+    def save_player(self, player: Dict):
+        if not self.deferred_indexing:
+            self.global_ranking.update(player["id"], player["rating"], player["experience"])
+
+    def save_players(self, players: Iterable[Dict]):
+        for player in players:
+            self.save_player(player)
+
+    def count_players(self) -> int:
+        return len(self.players)
+
+    def player_rank(self, player_id: str) -> Optional[int]:
+        return self.global_ranking.rank(player_id)
+
+    def top_players(self, offset: int, limit: int) -> List[Dict]:
+        return [self.players[player_id] for player_id in self.global_ranking.range(offset, limit)]
+
+    def players_after(self, rating: int, experience: int, player_id: str, limit: int) -> Tuple[int, List[Dict]]:
+        # Página por cursor (keyset): (posição base 0 do primeiro, jogadores) depois do cursor
+        offset = self.global_ranking.position_after(player_id, rating, experience)
+        return offset, self.top_players(offset, limit)
+
+    def players_around(self, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        rank = self.global_ranking.rank(player_id)
+        if rank is None:
+            return None
+        offset = max(0, rank - 1 - radius)
+        return offset, self.top_players(offset, rank - offset + radius)
+
+    def count_active_since(self, since: datetime) -> int:
+        return sum(1 for player in self.players.values() if player["lastActive"] > since)
+
+    def average_level(self) -> float:
+        if not self.players:
+            return 0
+        return sum(player["level"] for player in self.players.values()) / len(self.players)
+
+    # ===== JOGOS =====
+
+    def add_game(self, game: str, stats: Dict):
+        self.game_stats[game] = stats
+        self.game_players.setdefault(game, {})
+        self.game_rankings.setdefault(game, RankingIndex())
+
+    def has_game(self, game: str) -> bool:
+        return game in self.game_stats
+
+    def get_game_stats(self, game: str) -> Dict:
+        return self.game_stats[game]
+
+    def all_game_stats(self) -> Dict[str, Dict]:
+        return self.game_stats
+
+    def save_game_stats(self, game: str, stats: Dict):
+        pass
+
+    def get_game_entry(self, game: str, player_id: str) -> Optional[Dict]:
+        return self.game_players[game].get(player_id)
+
+    def add_game_entry(self, game: str, entry: Dict):
+        self.game_players[game][entry["playerId"]] = entry
+        self.player_games.setdefault(entry["playerId"], {})[game] = entry
+        self.save_game_entry(game, entry)
+
+    def save_game_entry(self, game: str, entry: Dict):
+        if not self.deferred_indexing:
+            self.game_rankings[game].update(entry["playerId"], entry["rating"], entry["gamesPlayed"])
+
+    def game_rank(self, game: str, player_id: str) -> Optional[int]:
+        return self.game_rankings[game].rank(player_id)
+
+    def top_game_entries(self, game: str, offset: int, limit: int) -> List[Dict]:
+        entries = self.game_players[game]
+        return [entries[player_id] for player_id in self.game_rankings[game].range(offset, limit)]
+
+    def game_entries_after(self, game: str, rating: int, games_played: int, player_id: str,
+                           limit: int) -> Tuple[int, List[Dict]]:
+        offset = self.game_rankings[game].position_after(player_id, rating, games_played)
+        return offset, self.top_game_entries(game, offset, limit)
+
+    def game_entries_around(self, game: str, player_id: str, radius: int) -> Optional[Tuple[int, List[Dict]]]:
+        rank = self.game_rankings[game].rank(player_id)
+        if rank is None:
+            return None
+        offset = max(0, rank - 1 - radius)
+        return offset, self.top_game_entries(game, offset, rank - offset + radius)
+
+    def player_game_entries(self, player_id: str) -> Dict[str, Dict]:
+        return self.player_games.get(player_id, {})
+
+    # ===== SNAPSHOT =====
+
+    def export_state(self) -> Dict:
+        return {
+            "players": self.players,
+            "game_stats": self.game_stats,
+            "game_players": self.game_players,
+        }
+
+    def import_state(self, state: Dict):
+        self.players = state["players"]
+        self.game_stats = state["game_stats"]
+        self.game_players = state["game_players"]
+        # O índice reverso jogador -> jogos não é de ranking: a reaplicação do log o
+        # consulta (conquistas), então é reconstruído mesmo com a indexação adiada
+        self.player_games = {}
+        for game, entries in self.game_players.items():
+            for player_id, entry in entries.items():
+                self.player_games.setdefault(player_id, {})[game] = entry
+        if not self.deferred_indexing:
+            self.rebuild_indexes()
+
+    def rebuild_indexes(self):
+        # Índices de ranking são derivados do estado e reconstruídos em lote
+        self.global_ranking.rebuild((p["id"], p["rating"], p["experience"]) for p in self.players.values())
+        for game, entries in self.game_players.items():
+            self.game_rankings[game] = RankingIndex()
+            self.game_rankings[game].rebuild((e["playerId"], e["rating"], e["gamesPlayed"]) for e in entries.values())
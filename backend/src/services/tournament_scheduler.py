@@ -0,0 +1,71 @@
+import heapq
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+# Agenda dos torneios: um min-heap de prazos (startDate dos torneios em inscrição,
+# endDate dos em andamento) e um índice por status com os torneios ordenados por
+# startDate. Avançar o relógio só toca os prazos vencidos (O(log n) cada) e listar os
+# torneios de um status é O(k) nos k torneios daquele status.
+# Entradas do heap viram obsoletas quando o status muda por outro caminho (início
+# manual, final decidido); são descartadas ao sair do heap.
+
+START = "start"
+END = "end"
+# Status cujo prazo está na agenda e a ação correspondente
+DEADLINES = {"registration": ("startDate", START), "active": ("endDate", END)}
+
+
+class TournamentScheduler:
+    def __init__(self):
+        self.heap: List[Tuple[float, str, str]] = []
+        # status -> [(startDate, id)] ordenada
+        self.by_status: Dict[str, List[Tuple[str, str]]] = {}
+        self.tournaments: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _schedule(self, tournament: Dict):
+        deadline = DEADLINES.get(tournament["status"])
+        if deadline is not None:
+            field, action = deadline
+            moment = datetime.fromisoformat(tournament[field]).timestamp()
+            heapq.heappush(self.heap, (moment, tournament["id"], action))
+
+    def add(self, tournament: Dict):
+        with self._lock:
+            self.tournaments[tournament["id"]] = tournament
+            insort(self.by_status.setdefault(tournament["status"], []), (tournament["startDate"], tournament["id"]))
+            self._schedule(tournament)
+
+    def move(self, tournament: Dict, old_status: str):
+        # Chamado depois que tournament["status"] mudou
+        with self._lock:
+            key = (tournament["startDate"], tournament["id"])
+            entries = self.by_status[old_status]
+            del entries[bisect_left(entries, key)]
+            insort(self.by_status.setdefault(tournament["status"], []), key)
+            self._schedule(tournament)
+
+    def rebuild(self, tournaments: Iterable[Dict]):
+        self.__init__()
+        for tournament in tournaments:
+            self.add(tournament)
+
+    def due(self, now: datetime) -> List[Tuple[str, str]]:
+        # Retira os prazos vencidos: [(id, START | END)], cada um entregue uma única vez
+        moment = now.timestamp()
+        due = []
+        with self._lock:
+            while self.heap and self.heap[0][0] <= moment:
+                _, tournament_id, action = heapq.heappop(self.heap)
+                status = self.tournaments[tournament_id]["status"]
+                if DEADLINES.get(status, (None, None))[1] == action:
+                    due.append((tournament_id, action))
+        return due
+
+    def listing(self, statuses: Iterable[str]) -> List[Dict]:
+        # Torneios dos status pedidos, por startDate (merge das listas já ordenadas)
+        with self._lock:
+            lists = [list(self.by_status.get(status, ())) for status in statuses]
+        return [self.tournaments[tournament_id] for _, tournament_id in heapq.merge(*lists)]
@@ -0,0 +1,109 @@
+import base64
+import hashlib
+import hmac
+import itertools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+# Usuários da API (cadastro, login e perfil), indexados pelo nome: as três operações
+# são O(1), e os IDs vêm de um contador atômico (len(users) + 1 repetia IDs com
+# cadastros simultâneos).
+#
+# Senhas guardadas só como hash scrypt (hashlib, memory-hard) com sal aleatório por
+# usuário, no formato scrypt$n$r$p$sal$hash: os parâmetros podem subir depois sem
+# invalidar os hashes antigos. Cada hash custa dezenas de ms e SCRYPT_N * r * 128
+# bytes de memória, então roda num pool limitado (hash_workers threads; o scrypt solta
+# o GIL) com no máximo max_pending na fila (padrão: QUEUE_PER_WORKER por thread). Com
+# a fila cheia (ex.: ataque de credential stuffing), o pedido falha na hora com
+# HashPoolFull em vez de segurar a thread da requisição atrás de centenas de hashes.
+# Nome inexistente também paga um hash (contra um hash fictício), para o tempo de
+# resposta não revelar quais nomes existem.
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+QUEUE_PER_WORKER = 4
+
+
+class HashPoolFull(RuntimeError):
+    pass
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=KEY_BYTES)
+
+
+def hash_password(password: str, n: int = SCRYPT_N, r: int = SCRYPT_R, p: int = SCRYPT_P) -> str:
+    salt = os.urandom(SALT_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def verify_password(password: str, stored: str) -> bool:
+    _, n, r, p, salt, key = stored.split("$")
+    derived = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    return hmac.compare_digest(derived, base64.b64decode(key))
+
+
+class UserStore:
+    def __init__(self, hash_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 n: int = SCRYPT_N):
+        self.by_username: Dict[str, Dict] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.n = n
+        self.hash_workers = hash_workers or os.cpu_count() or 1
+        self._executor = ThreadPoolExecutor(self.hash_workers, thread_name_prefix="password-hash")
+        if max_pending is None:
+            max_pending = QUEUE_PER_WORKER * self.hash_workers
+        self._slots = threading.BoundedSemaphore(self.hash_workers + max_pending)
+        self._dummy_hash = hash_password("", n=n)
+        self.rejected = 0
+
+    def _hash_job(self, function, *args):
+        # Ocupa uma vaga do pool (threads + fila) até o hash terminar
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashPoolFull("Muitas tentativas simultâneas; tente novamente em instantes")
+        try:
+            future = self._executor.submit(function, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def register(self, username: str, password: str) -> Dict:
+        if username in self.by_username:
+            raise ValueError("Nome de usuário já existe")
+        password_hash = self._hash_job(hash_password, password, self.n)
+        with self._lock:
+            # Outro cadastro com o mesmo nome pode ter terminado durante o hash
+            if username in self.by_username:
+                raise ValueError("Nome de usuário já existe")
+            user = {"id": next(self._ids), "username": username, "passwordHash": password_hash}
+            self.by_username[username] = user
+        return user
+
+    def authenticate(self, username: str, password: str) -> Optional[Dict]:
+        user = self.by_username.get(username)
+        stored = user["passwordHash"] if user else self._dummy_hash
+        valid = self._hash_job(verify_password, password, stored)
+        return user if valid and user else None
+
+    def get(self, username: str) -> Optional[Dict]:
+        return self.by_username.get(username)
+
+    def stats(self) -> Dict:
+        return {"users": len(self.by_username), "hashWorkers": self.hash_workers, "rejected": self.rejected}
+
+    def close(self):
+        self._executor.shutdown(wait=False)